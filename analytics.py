@@ -0,0 +1,115 @@
+# analytics.py
+# Bulk cohort analytics over stored results: GPA recomputation, percentiles, distributions and trends
+import argparse
+import numpy as np
+from compact_models import CohortColumns, Grade
+from result_store import ResultStore
+
+CGPA_TOLERANCE = 0.05
+
+
+def load_cohort(db_path, latest_only=True):
+    """Load stored results straight into CohortColumns (latest result per account by default)"""
+    with ResultStore(db_path) as store:
+        return CohortColumns.from_results(result for _, _, result in store.iter_results(latest_only))
+
+
+def _weighted_mean(keys, weights, values, size):
+    """Per-key credit-weighted mean; NaN where a key has no credits"""
+    total_weight = np.bincount(keys, weights=weights, minlength=size)
+    total = np.bincount(keys, weights=weights * values, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total_weight > 0, total / total_weight, np.nan)
+
+
+def recompute_cgpa(cohort):
+    """CGPA per student recomputed from StudentGrade.credits and grade_points"""
+    credits = cohort.row_credits.astype(np.float64)
+    return np.round(_weighted_mean(cohort.row_student, credits, cohort.row_points, len(cohort)), 2)
+
+
+def recompute_sgpa(cohort):
+    """
+    SGPA matrix of shape (num_students, num_semesters) and the semester numbers for its columns.
+    Missing semesters are NaN.
+    """
+    semesters, semester_idx = np.unique(cohort.row_semester, return_inverse=True)
+    keys = cohort.row_student.astype(np.int64) * len(semesters) + semester_idx
+    credits = cohort.row_credits.astype(np.float64)
+    sgpa = _weighted_mean(keys, credits, cohort.row_points, len(cohort) * len(semesters))
+    return np.round(sgpa.reshape(len(cohort), len(semesters)), 2), semesters
+
+
+def percentile_ranks(values):
+    """Percentage of the cohort with a value less than or equal to each entry (NaN stays NaN)"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    ranks = np.full(values.shape, np.nan)
+    ordered = np.sort(values[valid])
+    if ordered.size:
+        ranks[valid] = np.searchsorted(ordered, values[valid], side='right') / ordered.size * 100.0
+    return ranks
+
+
+def credit_weighted_trend(cohort):
+    """Cohort-wide credit-weighted GPA per semester number, as (semesters, gpa)"""
+    semesters, semester_idx = np.unique(cohort.row_semester, return_inverse=True)
+    credits = cohort.row_credits.astype(np.float64)
+    return semesters, np.round(_weighted_mean(semester_idx, credits, cohort.row_points, len(semesters)), 2)
+
+
+def subject_grade_distribution(cohort):
+    """subject_code -> {grade label: count}"""
+    histogram = cohort.subject_grade_histogram()
+    labels = [grade.label for grade in Grade]
+    return {
+        subject: {label: int(count) for label, count in zip(labels, row) if count}
+        for subject, row in zip(cohort.subjects, histogram)
+    }
+
+
+def cgpa_mismatches(cohort, tolerance=CGPA_TOLERANCE):
+    """
+    Students whose SLCM-reported CGPA differs from the recomputed one by more than tolerance.
+    These usually point at extraction errors rather than real grade changes.
+    """
+    recomputed = recompute_cgpa(cohort)
+    reported = np.round(cohort.cgpa.astype(np.float64), 2)
+    checkable = ~np.isnan(recomputed) & (reported > 0)
+    bad = np.flatnonzero(checkable & (np.abs(reported - recomputed) > tolerance))
+    return [(cohort.student_ids[i], float(reported[i]), float(recomputed[i])) for i in bad]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort analytics over stored SLCM results")
+    parser.add_argument('--db', default=None, help="Result database (defaults to RESULT_DB_PATH)")
+    parser.add_argument('--tolerance', type=float, default=CGPA_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.db is None:
+        from config import RESULT_DB_PATH
+        args.db = RESULT_DB_PATH
+
+    cohort = load_cohort(args.db)
+    print(f"=== COHORT ANALYTICS: {len(cohort)} students, {cohort.num_rows} grade rows ===")
+    if not len(cohort):
+        return
+
+    counts, edges = cohort.cgpa_distribution(bins=10)
+    print("\nCGPA distribution:")
+    for count, low, high in zip(counts, edges[:-1], edges[1:]):
+        print(f"  {low:4.1f}-{high:4.1f}: {count}")
+
+    semesters, trend = credit_weighted_trend(cohort)
+    print("\nCredit-weighted GPA by semester:")
+    for semester, gpa in zip(semesters, trend):
+        print(f"  Semester {semester}: {gpa:.2f}")
+
+    mismatches = cgpa_mismatches(cohort, args.tolerance)
+    print(f"\nReported vs recomputed CGPA mismatches: {len(mismatches)}")
+    for student_id, reported, recomputed in mismatches:
+        print(f"  {student_id}: reported {reported:.2f}, recomputed {recomputed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
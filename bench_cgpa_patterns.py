@@ -0,0 +1,115 @@
+# bench_cgpa_patterns.py
+# Micro-benchmark: the old per-call pattern lists vs the precompiled single-pass matcher in cgpa_patterns.py
+import os
+import re
+import sys
+import timeit
+import argparse
+from cgpa_patterns import find_cgpa, parse_model_answer
+
+# Grade sheet text as it comes out of Tesseract (noisy) and out of the DOM (element/cell text)
+OCR_SAMPLES = [
+    "MANIPAL INSTITUTE OF TECHNOLOGY\nGRADE SHEET\nSemester IV\nCSE 2201 Data Structures 4 A+\n"
+    "CSE 2202 Operating Systems 4 A\nMAT 2201 Probability 3 B\nSGPA : 8.92\nCGPA : 8.74\n",
+    "Subject Code Subject Name Credits Grade\nPHY 1001 Physics 4 B\nCHM 1001 Chemistry 4 C\n"
+    "Total Credits 24 SGPA 7.45 C G P A 7,88",
+    "Cumulative Grade Point Average 9.12 Semester Grade Point Average 9.40",
+    "Sem I | 21 | 8.10\nSem II | 22 | 8.35\nSem III | 20 | 8.60\nOverall : 8.34",
+    "Reg No 220905123 Name STUDENT NAME Branch CSE Semester VI " * 4 + "C.G.P.A. : 9.05",
+    "Page 1 of 2 Printed on 12.05.2024 Credits Earned 160 Grade Points 1401",  # no CGPA at all
+]
+DOM_SAMPLES = [
+    "CGPA",
+    "CGPA: 8.74",
+    "8.74",
+    "Cumulative GPA 7.95",
+    "SGPA 8.20",
+    "Total Credits Earned : 140",
+    "Grade Point Average 6.80",
+    "CGPA 8.74 SGPA 9.10 Credits 24",
+]
+VISION_ANSWERS = ["8.74", "The CGPA is 9.12.", "CGPA: 7.5", "I can see the value 8.45 in the summary row", "unknown"]
+
+LEGACY_PATTERNS = [
+    r'CGPA[:\s]*(\d+\.\d+)',
+    r'cgpa[:\s]*(\d+\.\d+)',
+    r'Cumulative[:\s]*Grade[:\s]*Point[:\s]*Average[:\s]*(\d+\.\d+)',
+    r'Cumulative[:\s]*(\d+\.\d+)',
+    r'Overall[:\s]*(\d+\.\d+)',
+    r'Grade[:\s]*Point[:\s]*Average[:\s]*(\d+\.\d+)',
+    r'Total[:\s]*CGPA[:\s]*(\d+\.\d+)'
+]
+
+
+def legacy_parse(text):
+    """The old SLCMScraper.parse_cgpa_from_text loop"""
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            cgpa = float(match.group(1))
+            if 0.0 <= cgpa <= 10.0:
+                return cgpa
+    return None
+
+
+def legacy_model_answer(text):
+    match = re.search(r'(\d+\.\d+)', text)
+    if match and 0.0 <= float(match.group(1)) <= 10.0:
+        return float(match.group(1))
+    return None
+
+
+def compiled_parse(text):
+    match = find_cgpa(text)
+    return match.value if match else None
+
+
+def compiled_model_answer(text):
+    match = parse_model_answer(text)
+    return match.value if match else None
+
+
+def load_corpus(directory):
+    """Extra samples: every .txt file in directory is one sample"""
+    samples = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.txt'):
+            with open(os.path.join(directory, filename), 'r', encoding='utf-8', errors='replace') as f:
+                samples.append(f.read())
+    return samples
+
+
+def bench(name, func, samples, number):
+    seconds = min(timeit.repeat(lambda: [func(s) for s in samples], number=number, repeat=5))
+    per_call = seconds / (number * len(samples)) * 1e6
+    print(f"  {name:<10} {per_call:8.2f} µs/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CGPA text matching")
+    parser.add_argument('--corpus', help="directory of .txt samples (saved OCR/DOM text) to add to the built-in set")
+    parser.add_argument('--number', type=int, default=2000, help="iterations per timing run")
+    args = parser.parse_args()
+
+    text_samples = OCR_SAMPLES + DOM_SAMPLES + (load_corpus(args.corpus) if args.corpus else [])
+    suites = [
+        ("OCR + DOM text", text_samples, legacy_parse, compiled_parse),
+        ("Vision answers", VISION_ANSWERS, legacy_model_answer, compiled_model_answer),
+    ]
+
+    for title, samples, legacy, compiled in suites:
+        print(f"{title} ({len(samples)} samples)")
+        before = bench('legacy', legacy, samples, args.number)
+        after = bench('compiled', compiled, samples, args.number)
+        print(f"  speedup    {before / after:8.2f}x")
+        for sample in samples:
+            old, new = legacy(sample), compiled(sample)
+            if old != new:
+                preview = sample.replace('\n', ' ')[:60]
+                print(f"  differs: legacy={old} compiled={new} on '{preview}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+# browser_pool.py
+# Warm browser start: cached chromedriver path, template user-data directory and pre-spawned browsers
+import os
+import json
+import time
+import queue
+import atexit
+import shutil
+import logging
+import tempfile
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from config import (BROWSER_PROFILE, BROWSER_WINDOW_SIZE, HEADLESS_BROWSER, BROWSER_BLOCKED_URLS,
+                    BROWSER_POOL_SIZE, BROWSER_TEMPLATE_DIR, DRIVER_CACHE_FILE, GRADESHEET_NAVIGATION)
+from browser_profile import apply_lean_options, enable_request_blocking, BLOCKED_URL_PATTERNS
+from cdp_navigation import enable_performance_log
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36")
+
+# Per-run and per-user state (caches, locks, cookies, storage, history, open sessions) that must
+# never be copied into or out of the template profile
+_TEMPLATE_IGNORE = shutil.ignore_patterns(
+    'Singleton*', 'lockfile', 'Cache', 'Code Cache', 'GPUCache', 'ShaderCache', 'GrShaderCache', 'Crashpad',
+    '*.log', '*.tmp', 'Cookies*', 'Network', 'History*', 'Visited Links', 'Top Sites*', 'Favicons*',
+    'Shortcuts*', 'Web Data*', 'Login Data*', 'Local Storage', 'Session Storage', 'Sessions',
+    'Current Session', 'Current Tabs', 'Last Session', 'Last Tabs', 'IndexedDB', 'Service Worker',
+    'databases', 'blob_storage', 'File System', 'Network Persistent State', 'TransportSecurity',
+)
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+_template_lock = threading.Lock()
+
+
+def resolve_chromedriver():
+    """
+    Chromedriver path, resolved once per machine: CHROME_DRIVER_PATH if it exists, else the
+    cached Selenium Manager result, else a fresh Selenium Manager lookup (which is then cached).
+    Returns None to let Selenium do its own discovery.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and os.path.exists(_driver_path):
+            return _driver_path
+
+        configured = os.getenv('CHROME_DRIVER_PATH')
+        if configured and os.path.exists(configured):
+            _driver_path = configured
+            return _driver_path
+
+        try:
+            with open(DRIVER_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f).get('driver_path')
+            if cached and os.path.exists(cached):
+                _driver_path = cached
+                return _driver_path
+        except (OSError, json.JSONDecodeError):
+            pass
+
+        try:
+            from selenium.webdriver.common.selenium_manager import SeleniumManager
+            started = time.perf_counter()
+            paths = SeleniumManager().binary_paths(['--browser', 'chrome'])
+            _driver_path = paths.get('driver_path')
+            logger.info(f"Resolved chromedriver in {time.perf_counter() - started:.2f}s: {_driver_path}")
+        except Exception as e:
+            logger.warning(f"Chromedriver discovery failed, leaving it to Selenium: {e}")
+            return None
+
+        try:
+            with open(DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'driver_path': _driver_path, 'resolved_at': time.time()}, f)
+        except OSError as e:
+            logger.warning(f"Could not cache chromedriver path: {e}")
+        return _driver_path
+
+
+def _new_user_data_dir():
+    """Fresh per-browser profile directory, seeded from the template when one exists"""
+    directory = tempfile.mkdtemp(prefix='slcm-chrome-')
+    if BROWSER_TEMPLATE_DIR and os.path.isdir(BROWSER_TEMPLATE_DIR):
+        shutil.copytree(BROWSER_TEMPLATE_DIR, directory, ignore=_TEMPLATE_IGNORE, dirs_exist_ok=True)
+    return directory
+
+
+def ensure_template():
+    """
+    Create the template profile once, from a browser that is started and quit without opening any
+    page, so it holds Chrome's first-run setup and nothing from a portal session.
+    """
+    if not BROWSER_TEMPLATE_DIR or os.path.isdir(BROWSER_TEMPLATE_DIR):
+        return
+    with _template_lock:
+        if os.path.isdir(BROWSER_TEMPLATE_DIR):
+            return
+        directory = tempfile.mkdtemp(prefix='slcm-chrome-template-')
+        staging = f"{BROWSER_TEMPLATE_DIR}.{os.getpid()}.tmp"
+        try:
+            _start_driver(directory).quit()
+            shutil.copytree(directory, staging, ignore=_TEMPLATE_IGNORE)
+            os.rename(staging, BROWSER_TEMPLATE_DIR)  # another process may have finished first
+            logger.info(f"Saved browser template profile to {BROWSER_TEMPLATE_DIR}")
+        except Exception as e:
+            logger.warning(f"Could not create browser template profile: {e}")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def build_chrome_options(user_data_dir=None):
+    chrome_options = Options()
+    if BROWSER_PROFILE == 'lean':
+        apply_lean_options(chrome_options, BROWSER_WINDOW_SIZE, HEADLESS_BROWSER)
+    else:
+        chrome_options.add_argument('--start-maximized')
+    if user_data_dir:
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+    chrome_options.add_argument('--disable-notifications')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    if GRADESHEET_NAVIGATION == 'cdp':
+        enable_performance_log(chrome_options)
+    return chrome_options
+
+
+class Browser:
+    """A launched Chrome instance and the profile directory it owns"""
+
+    def __init__(self, driver, user_data_dir, launch_seconds):
+        self.driver = driver
+        self.user_data_dir = user_data_dir
+        self.launch_seconds = launch_seconds
+        self.created_at = time.time()
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Browser quit failed: {e}")
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+def _start_driver(user_data_dir):
+    options = build_chrome_options(user_data_dir)
+    driver_path = resolve_chromedriver()
+    if driver_path:
+        return webdriver.Chrome(service=Service(driver_path), options=options)
+    return webdriver.Chrome(options=options)
+
+
+def launch_browser():
+    """Start one Chrome with the configured profile; returns a Browser"""
+    started = time.perf_counter()
+    ensure_template()
+    user_data_dir = _new_user_data_dir()
+    try:
+        driver = _start_driver(user_data_dir)
+    except Exception:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+        raise
+
+    if BROWSER_PROFILE == 'lean':
+        enable_request_blocking(driver, BLOCKED_URL_PATTERNS + BROWSER_BLOCKED_URLS)
+    # Applies to every document, unlike execute_script which only touches the current page
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
+    return Browser(driver, user_data_dir, time.perf_counter() - started)
+
+
+class BrowserPool:
+    """
+    Keeps `size` idle browsers launched in the background. acquire() hands one out immediately
+    when available (otherwise launches on demand) and starts a replacement.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.spawning = 0
+        self.closed = False
+        self.refill()
+
+    def refill(self):
+        with self.lock:
+            missing = self.size - self.idle.qsize() - self.spawning
+            if self.closed or missing <= 0:
+                return
+            self.spawning += missing
+        for _ in range(missing):
+            threading.Thread(target=self._spawn, name='browser-prespawn', daemon=True).start()
+
+    def _spawn(self):
+        try:
+            browser = launch_browser()
+            logger.info(f"Pre-spawned browser ready in {browser.launch_seconds:.2f}s")
+        except Exception as e:
+            logger.warning(f"Pre-spawning browser failed: {e}")
+            browser = None
+        with self.lock:
+            self.spawning -= 1
+            closed = self.closed
+        if browser is not None:
+            if closed:
+                browser.close()
+            else:
+                self.idle.put(browser)
+
+    def acquire(self):
+        """An idle browser that is still alive, or a newly launched one"""
+        browser = None
+        while not self.idle.empty():
+            candidate = self.idle.get_nowait()
+            try:
+                candidate.driver.current_url
+                browser = candidate
+                break
+            except Exception:
+                candidate.close()
+        if browser is None:
+            browser = launch_browser()
+        self.refill()
+        return browser
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def acquire_browser():
+    """A Browser from the process-wide pool, or a direct launch when BROWSER_POOL_SIZE is 0"""
+    global _pool
+    if BROWSER_POOL_SIZE <= 0:
+        return launch_browser()
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(BROWSER_POOL_SIZE)
+            atexit.register(shutdown_browser_pool)
+    return _pool.acquire()
+
+
+def shutdown_browser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
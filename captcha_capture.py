@@ -0,0 +1,89 @@
+# captcha_capture.py
+# Reads the original captcha image bytes instead of a rendered, viewport-dependent element screenshot
+import base64
+import logging
+import requests
+from selenium.webdriver.common.by import By
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_MODES = ('canvas', 'fetch', 'cookies', 'screenshot')
+
+# Re-encodes the already-loaded <img> at its natural size; no new request, so the captcha cannot rotate
+_CANVAS_JS = """
+var img = document.getElementById('imgCaptcha');
+if (!img || !img.complete || img.naturalWidth === 0) { return null; }
+var canvas = document.createElement('canvas');
+canvas.width = img.naturalWidth;
+canvas.height = img.naturalHeight;
+canvas.getContext('2d').drawImage(img, 0, 0);
+return canvas.toDataURL('image/png').split(',')[1];
+"""
+
+# Downloads the src with the page's cookies; returns the original bytes as the server encoded them
+_FETCH_JS = """
+var done = arguments[arguments.length - 1];
+var img = document.getElementById('imgCaptcha');
+if (!img) { done(null); return; }
+fetch(img.src, {credentials: 'include', cache: 'force-cache'})
+    .then(function (r) { return r.arrayBuffer(); })
+    .then(function (buf) {
+        var bytes = new Uint8Array(buf), binary = '';
+        for (var i = 0; i < bytes.length; i++) { binary += String.fromCharCode(bytes[i]); }
+        done(btoa(binary));
+    })
+    .catch(function () { done(null); });
+"""
+
+
+def _capture_canvas(driver):
+    data = driver.execute_script(_CANVAS_JS)
+    return base64.b64decode(data) if data else None
+
+
+def _capture_fetch(driver):
+    data = driver.execute_async_script(_FETCH_JS)
+    return base64.b64decode(data) if data else None
+
+
+def _capture_cookies(driver):
+    src = driver.find_element(By.ID, "imgCaptcha").get_attribute('src')
+    session = requests.Session()
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'))
+    user_agent = driver.execute_script("return navigator.userAgent")
+    response = session.get(src, headers={'User-Agent': user_agent, 'Referer': driver.current_url}, timeout=10)
+    response.raise_for_status()
+    return response.content
+
+
+def _capture_screenshot(driver):
+    return driver.find_element(By.ID, "imgCaptcha").screenshot_as_png
+
+
+_CAPTURERS = {
+    'canvas': _capture_canvas,
+    'fetch': _capture_fetch,
+    'cookies': _capture_cookies,
+    'screenshot': _capture_screenshot,
+}
+
+
+def read_captcha_bytes(driver, mode='canvas'):
+    """
+    Return the captcha image bytes using the requested mode, falling back to an element screenshot.
+    'fetch' and 'cookies' issue a new request for the image; use them only if the portal serves
+    the same captcha for repeated requests within a session.
+    """
+    if mode not in _CAPTURERS:
+        raise ValueError(f"Unknown captcha capture mode '{mode}', expected one of {CAPTURE_MODES}")
+
+    if mode != 'screenshot':
+        try:
+            data = _CAPTURERS[mode](driver)
+            if data:
+                return data
+            logger.warning(f"Captcha capture mode '{mode}' returned no data, using element screenshot")
+        except Exception as e:
+            logger.warning(f"Captcha capture mode '{mode}' failed ({e}), using element screenshot")
+    return _capture_screenshot(driver)
@@ -0,0 +1,156 @@
+# captcha_pipeline.py
+# Pipelined captcha solving: capture each new captcha as soon as it loads and solve it on a worker thread
+import os
+import time
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from selenium.webdriver.common.by import By
+from config import CAPTCHA_SOLVE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Cheap identity of the loaded captcha, or null while it loads. A page reload replaces the element
+# (new token) and a refresh reloads it (load count); src and size catch in-place swaps.
+_IMAGE_FINGERPRINT_JS = """
+var img = document.getElementById('imgCaptcha');
+if (!(img && img.complete && img.naturalWidth > 0)) { return null; }
+if (!img.dataset.slcmToken) {
+    img.dataset.slcmToken = Math.random().toString(36).slice(2);
+    img.dataset.slcmLoads = '0';
+    img.addEventListener('load', function () { img.dataset.slcmLoads = String(Number(img.dataset.slcmLoads) + 1); });
+}
+return [img.dataset.slcmToken, img.dataset.slcmLoads, img.src, img.naturalWidth, img.naturalHeight].join('|');
+"""
+
+
+class CaptchaPrefetcher:
+    """
+    WebDriver calls stay on the caller's thread (the driver is not thread-safe); only the
+    solver runs in the background. The caller keeps typing credentials, or waits on the
+    portal's answer to the previous guess, while the current captcha is being solved.
+    The solver thread lives for one login: prefetch() starts it and shutdown() ends it.
+    """
+
+    def __init__(self, capture_fn, solve_fn, poll_interval=0.1, solve_timeout=CAPTCHA_SOLVE_TIMEOUT):
+        self.capture_fn = capture_fn  # driver -> image path
+        self.solve_fn = solve_fn  # image path -> captcha text or None
+        self.poll_interval = poll_interval
+        self.solve_timeout = solve_timeout
+        self.executor = None
+        self.pending = None
+        self.last_fingerprint = None
+        self.last_digest = None
+
+    @staticmethod
+    def _digest(path):
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def _capture_if_new(self, driver):
+        """
+        Path of the captcha if it has loaded and differs from the previously solved one, else None.
+        Only a changed fingerprint triggers a capture, so polling an unchanged page costs one script call.
+        """
+        fingerprint = driver.execute_script(_IMAGE_FINGERPRINT_JS)
+        if fingerprint is None or fingerprint == self.last_fingerprint:
+            return None
+        path = self.capture_fn(driver)
+        self.last_fingerprint = fingerprint
+        digest = self._digest(path)
+        if digest == self.last_digest:
+            os.remove(path)
+            return None
+        self.last_digest = digest
+        return path
+
+    def _capture_new(self, driver, timeout):
+        """Capture the captcha once it has loaded and differs from the previously solved one"""
+        deadline = time.monotonic() + timeout
+        while True:
+            path = self._capture_if_new(driver)
+            if path is not None:
+                return path
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _submit(self, path):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='captcha-solver')
+        print(f"Prefetched captcha: {path} (solving in background)")
+        self.pending = self.executor.submit(self.solve_fn, path)
+        return self.pending
+
+    def prefetch(self, driver, refresh=False, timeout=10):
+        """
+        Start solving the next captcha. With refresh=False the page is expected to already
+        show a new captcha (first load or a rejected postback); if it does not show up within
+        a short grace period, the refresh button is clicked anyway. A solve already started
+        on the current captcha (see start_if_new) is kept.
+        """
+        if self.pending is not None and not refresh:
+            return self.pending
+        self.cancel()
+        path = None
+        if not refresh:
+            path = self._capture_new(driver, timeout=min(2.0, timeout))
+        if path is None:
+            try:
+                driver.find_element(By.ID, "txtRefreshCaptcha").click()
+            except Exception as e:
+                logger.warning(f"Could not refresh captcha: {e}")
+            path = self._capture_new(driver, timeout=timeout)
+        if path is None:
+            logger.warning("No new captcha image appeared")
+            return None
+        return self._submit(path)
+
+    def start_if_new(self, driver):
+        """
+        Non-blocking check, meant to be polled while a guess is being submitted: as soon as the
+        portal's answer shows a new captcha, start solving it, before the answer is even read.
+        Returns True once a solve is pending.
+        """
+        if self.pending is not None:
+            return True
+        try:
+            path = self._capture_if_new(driver)
+        except Exception as e:  # the page is being replaced under us; try again on the next poll
+            logger.debug(f"Captcha not capturable yet: {e}")
+            return False
+        if path is None:
+            return False
+        self._submit(path)
+        return True
+
+    def result(self, timeout=None):
+        """Wait for the background solve started by prefetch(); None if it fails or times out"""
+        if self.pending is None:
+            return None
+        pending, self.pending = self.pending, None
+        timeout = self.solve_timeout if timeout is None else timeout
+        try:
+            return pending.result(timeout=timeout)
+        except FutureTimeout:
+            pending.cancel()
+            logger.warning(f"Captcha solve did not finish within {timeout}s")
+            return None
+
+    def cancel(self):
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+    def reset(self):
+        """Forget the last captcha, e.g. after reloading the login page"""
+        self.cancel()
+        self.last_fingerprint = None
+        self.last_digest = None
+
+    def shutdown(self):
+        """End the solver thread (a later prefetch() starts a new one); a hung solve is abandoned"""
+        self.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,164 @@
+# cdp_navigation.py
+# Event-driven grade sheet navigation: new-target detection, load/network-idle readiness and
+# response body capture from Chrome's DevTools event stream (the chromedriver performance log)
+import json
+import time
+import base64
+import logging
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.05
+
+# The grade table is ready once a table mentions the cumulative GPA
+GRADE_TABLE_READY_JS = """
+var tables = document.getElementsByTagName('table');
+for (var i = 0; i < tables.length; i++) {
+    if (/C\\.?\\s*G\\.?\\s*P\\.?\\s*A/i.test(tables[i].innerText)) { return true; }
+}
+return false;
+"""
+
+
+def enable_performance_log(chrome_options):
+    """Ask chromedriver to record Network and Page events for every tab"""
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': True})
+    return chrome_options
+
+
+class _TargetState:
+    __slots__ = ('inflight', 'last_activity', 'loaded', 'responses')
+
+    def __init__(self):
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        self.loaded = False
+        self.responses = []  # (url, requestId, status) in arrival order
+
+
+class CDPNavigator:
+    """
+    Follows DevTools events for all tabs of one driver.
+
+    Selenium's CDP bridge is request/response only, so events are read from the performance log
+    (which chromedriver fills from every attached target) and new targets are found with
+    Target.getTargets; both are polled at POLL_INTERVAL instead of fixed sleeps.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.targets = {}
+
+    def _state(self, target_id):
+        if target_id not in self.targets:
+            self.targets[target_id] = _TargetState()
+        return self.targets[target_id]
+
+    def drain(self):
+        """Consume pending performance log entries and update per-target state"""
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])
+            except (KeyError, ValueError):
+                continue
+            event = message.get('message', {})
+            self._handle(message.get('webview'), event.get('method', ''), event.get('params', {}))
+
+    def _handle(self, target_id, method, params):
+        state = self._state(target_id)
+        if method == 'Network.requestWillBeSent':
+            state.inflight.add(params.get('requestId'))
+        elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+            state.inflight.discard(params.get('requestId'))
+        elif method == 'Network.responseReceived':
+            response = params.get('response', {})
+            state.responses.append((response.get('url', ''), params.get('requestId'), response.get('status')))
+        elif method == 'Page.loadEventFired':
+            state.loaded = True
+        elif method == 'Page.frameStartedLoading':
+            state.loaded = False
+        else:
+            return
+        state.last_activity = time.monotonic()
+
+    def reset(self):
+        """Forget earlier events, e.g. right before the click that opens a new tab"""
+        self.drain()
+        self.targets = {}
+
+    def wait_for_new_target(self, known_handles, timeout=15):
+        """targetId (== window handle) of the first new page target, or None on timeout"""
+        known = set(known_handles)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                infos = self.driver.execute_cdp_cmd('Target.getTargets', {}).get('targetInfos', [])
+                for info in infos:
+                    if info.get('type') == 'page' and info.get('targetId') not in known:
+                        return info['targetId']
+            except Exception as e:
+                logger.debug(f"Target.getTargets failed ({e}), falling back to window handles")
+                new_handles = [h for h in self.driver.window_handles if h not in known]
+                if new_handles:
+                    return new_handles[0]
+            time.sleep(POLL_INTERVAL)
+        return None
+
+    def is_quiet(self, target_id, idle_seconds=0.5):
+        """Load event seen and no request in flight for idle_seconds (from events only, no tab switch)"""
+        state = self._state(target_id)
+        return state.loaded and not state.inflight and time.monotonic() - state.last_activity >= idle_seconds
+
+    def check_ready(self, target_id, ready_js=GRADE_TABLE_READY_JS, idle_seconds=0.5):
+        """
+        One readiness check of the target the driver is switched to: 'table' when ready_js holds,
+        'idle' once loaded with the network quiet for idle_seconds, otherwise None.
+        """
+        state = self._state(target_id)
+        try:
+            if ready_js and self.driver.execute_script(ready_js):
+                return 'table'
+            # The load event can fire before chromedriver attaches to a brand-new tab
+            if not state.loaded:
+                state.loaded = self.driver.execute_script("return document.readyState") == 'complete'
+        except Exception:
+            pass  # document not ready for scripts yet
+        return 'idle' if self.is_quiet(target_id, idle_seconds) else None
+
+    def wait_until_ready(self, target_id, timeout=20, idle_seconds=0.5, ready_js=GRADE_TABLE_READY_JS):
+        """
+        Block until the target's grade table exists, or its load event fired and the network has
+        been idle for idle_seconds. The driver must already be switched to the target.
+        Returns the reason ('table', 'idle') or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.drain()
+            reason = self.check_ready(target_id, ready_js, idle_seconds)
+            if reason:
+                return reason
+            time.sleep(POLL_INTERVAL)
+        return None
+
+    def response_body(self, target_id, url_fragment):
+        """Body of the latest matching document response seen in the target, or None"""
+        self.drain()
+        fragment = url_fragment.lower()
+        matches = [r for r in self._state(target_id).responses if fragment in r[0].lower()]
+        if not matches:
+            return None
+        _, request_id, status = matches[-1]
+        try:
+            body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            logger.warning(f"Could not read response body for {url_fragment} (status {status}): {e}")
+            return None
+        if body.get('base64Encoded'):
+            return base64.b64decode(body['body']).decode('utf-8', errors='replace')
+        return body.get('body')
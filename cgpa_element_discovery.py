@@ -2,9 +2,12 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
+import argparse
 import time
 import re
 from dotenv import load_dotenv
+from config import LOGIN_URL
+from selector_cache import CGPA_LOCATORS, cgpa_from_element, no_implicit_wait
 
 # Load environment variables
 load_dotenv()
@@ -351,5 +354,64 @@ def discover_cgpa_comprehensive(driver):
         import traceback
         traceback.print_exc()
 
+def profile_cgpa_selectors(driver, cache):
+    """
+    Non-interactive: evaluate every CGPA locator on the open grade sheet and cache the best one.
+    A locator whose element itself mentions CGPA beats a context-only match; among those the
+    locator matching the fewest elements (the most specific) wins.
+    """
+    hits = []
+    with no_implicit_wait(driver):
+        for label, by, value in CGPA_LOCATORS:
+            try:
+                elements = driver.find_elements(by, value)
+            except Exception as e:
+                print(f"  {label}: failed ({e})")
+                continue
+            for index, element in enumerate(elements):
+                try:
+                    cgpa = cgpa_from_element(element)
+                except Exception:
+                    continue
+                if cgpa is not None:
+                    labelled = 'cgpa' in element.text.lower()
+                    hits.append((not labelled, len(elements), label, by, value, index, cgpa))
+                    print(f"  {label}: CGPA {cgpa} at index {index} of {len(elements)}")
+                    break
+
+    if not hits:
+        print("  No locator found the CGPA")
+        return None
+    values = {hit[-1] for hit in hits}
+    if len(values) > 1:
+        print(f"  Warning: locators disagree on the CGPA: {sorted(values)}")
+    _, _, label, by, value, index, cgpa = min(hits, key=lambda hit: hit[:2])
+    cache.record('gradesheet', 'cgpa', label, by, value, index, source='profiler')
+    print(f"✓ Cached '{label}' for CGPA {cgpa}")
+    return cgpa
+
+
+def run_cgpa_profiler():
+    """Log in with the configured credentials, open the grade sheet and profile the CGPA selectors"""
+    from scraper import SLCMScraper
+
+    scraper = SLCMScraper()
+    try:
+        scraper.driver.get(LOGIN_URL)
+        scraper.login()
+        scraper.navigate_to_gradesheet()
+        print("Profiling grade sheet CGPA selectors...")
+        profile_cgpa_selectors(scraper.driver, scraper.selectors)
+    finally:
+        scraper.close_browser()
+
+
 if __name__ == "__main__":
-    discover_cgpa_elements_only()
+    parser = argparse.ArgumentParser(description="SLCM grade sheet CGPA element discovery")
+    parser.add_argument('--profile', action='store_true',
+                        help="non-interactive: log in, find the working CGPA selector and cache it")
+    args = parser.parse_args()
+    if args.profile:
+        run_cgpa_profiler()
+    else:
+        discover_cgpa_elements_only()
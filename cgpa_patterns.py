@@ -0,0 +1,112 @@
+# cgpa_patterns.py
+# Precompiled CGPA matcher shared by the DOM, table, OCR and vision extraction paths
+import re
+from typing import NamedTuple
+
+CGPA_MIN = 0.0
+CGPA_MAX = 10.0
+
+# One pass over the lower-cased text: a label alternative (named group per label kind) followed by
+# the value. OCR output often has stray punctuation or a comma for the decimal point, so both are
+# tolerated. Matching lower-cased text without IGNORECASE, behind a first-character lookahead, lets
+# the engine skip most positions cheaply.
+_LABELLED = re.compile(r"""
+    (?=[cgo])
+    (?:
+        (?P<cgpa>\bc\.?\s?g\.?\s?p\.?\s?a\b)
+      | (?P<cumulative>\bcumulative(?:[\s:]*grade[\s:]*point[\s:]*average)?)
+      | (?P<gpa>\bgrade[\s:]*point[\s:]*average|\bgpa\b)
+      | (?P<overall>\boverall)
+    )
+    [\s:=\-|().]*(?:is\s+)?
+    (?P<value>\d{1,2}[.,]\d{1,2})(?!\d)
+""", re.VERBOSE)
+
+_DECIMAL = re.compile(r'(?<![\d.])(\d{1,2}\.\d{1,2})(?![\d.])')
+
+LABEL_CONFIDENCE = {
+    'cgpa': 0.95,
+    'cumulative': 0.85,
+    'gpa': 0.6,
+    'overall': 0.5,
+}
+BARE_DECIMAL_CONFIDENCE = 0.3
+_TOP_CONFIDENCE = max(LABEL_CONFIDENCE.values())
+
+# Keyword tests used to judge an element, cell or row by its surrounding text
+CGPA_LABEL = re.compile(r'C\.?\s*G\.?\s*P\.?\s*A', re.IGNORECASE)
+CGPA_CONTEXT = re.compile(r'cgpa|cumulative|gpa|grade point', re.IGNORECASE)
+MARKUP_CONTEXT = re.compile(r'cgpa|cumulative|total', re.IGNORECASE)
+NOT_CGPA_CONTEXT = re.compile(r'sgpa|semester|credit', re.IGNORECASE)
+SUMMARY_ROW = re.compile(r'total|summary|overall|cgpa', re.IGNORECASE)
+GRADE_TABLE = re.compile(r'cgpa|gpa|cumulative|grade|total', re.IGNORECASE)
+
+
+class CGPAMatch(NamedTuple):
+    value: float
+    confidence: float
+    label: str  # cgpa | cumulative | gpa | overall | decimal
+    start: int
+    end: int
+
+
+def _in_range(value):
+    return CGPA_MIN <= value <= CGPA_MAX
+
+
+def _scan(text):
+    """(value, confidence, label, start, end) for every labelled candidate, in order"""
+    for match in _LABELLED.finditer(text.lower()):
+        raw = match.group('value')
+        value = float(raw.replace(',', '.'))
+        if not _in_range(value):
+            continue
+        label = next(name for name in LABEL_CONFIDENCE if match.start(name) != -1)
+        confidence = LABEL_CONFIDENCE[label]
+        if '.' not in raw:
+            confidence = round(confidence - 0.05, 2)  # comma decimal point: probably an OCR slip
+        yield value, confidence, label, match.start(), match.end()
+
+
+def iter_cgpa_matches(text):
+    """Every labelled CGPA candidate in text, in order, with out-of-range values dropped"""
+    return [CGPAMatch._make(candidate) for candidate in _scan(text or '')]
+
+
+def find_cgpa(text):
+    """Highest-confidence labelled CGPA in text (earliest on ties), or None"""
+    best = None
+    for candidate in _scan(text or ''):
+        if best is None or candidate[1] > best[1]:
+            best = candidate
+            if best[1] >= _TOP_CONFIDENCE:
+                break
+    return CGPAMatch._make(best) if best else None
+
+
+def decimals_in_range(text):
+    """Decimal numbers in text that could be a CGPA, in order"""
+    return [float(m) for m in _DECIMAL.findall(text or '') if _in_range(float(m))]
+
+
+def parse_model_answer(text):
+    """
+    CGPA from a vision model answer: a labelled value if there is one, otherwise the first
+    decimal in range (models are asked to answer with the bare number).
+    """
+    text = (text or '').strip()
+    if _DECIMAL.fullmatch(text):
+        value = float(text)
+        return CGPAMatch(value, BARE_DECIMAL_CONFIDENCE, 'decimal', 0, len(text)) if _in_range(value) else None
+    labelled = find_cgpa(text)
+    if labelled:
+        return labelled
+    for match in _DECIMAL.finditer(text):
+        value = float(match.group(1))
+        if _in_range(value):
+            return CGPAMatch(value, BARE_DECIMAL_CONFIDENCE, 'decimal', match.start(), match.end())
+    return None
+
+
+def has_cgpa_context(text):
+    return bool(text) and CGPA_CONTEXT.search(text) is not None
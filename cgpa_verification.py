@@ -0,0 +1,127 @@
+# cgpa_verification.py
+# Cross-checks CGPA candidates from several extraction strategies before one is accepted
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+from analytics import CGPA_TOLERANCE
+from gradesheet_parser import compute_gpa
+
+logger = logging.getLogger(__name__)
+
+# Prior trust in each strategy; a candidate's own confidence overrides it when given
+SOURCE_CONFIDENCE = {
+    'parsed': 0.9,    # summary row of the parsed grade sheet HTML
+    'targeted': 0.7,  # cached/broad locator scan
+    'table': 0.7,     # table cell next to a CGPA label
+    'ocr': 0.6,
+    'vision': 0.5,
+    'llm': 0.4,
+}
+# Sources reading the same evidence: the DOM strategies all see the one summary figure on the page,
+# so their agreement is a single reading, not independent confirmation
+SOURCE_GROUP = {'parsed': 'dom', 'targeted': 'dom', 'table': 'dom'}
+RECOMPUTED_WEIGHT = 0.5
+
+
+@dataclass
+class Candidate:
+    source: str
+    value: float
+    confidence: float
+
+
+@dataclass
+class Verdict:
+    value: float
+    confidence: float
+    verified: bool
+    reason: str  # agreement | recomputed | disagreement | single-source
+    sources: List[str] = field(default_factory=list)
+
+
+def _group(source):
+    return SOURCE_GROUP.get(source, source)
+
+
+def recompute_cgpa(result):
+    """Credit-weighted CGPA over every parsed subject row, or None without rows"""
+    grades = [grade for semester in result.semesters for grade in semester.grades] if result else []
+    if not grades:
+        return None
+    return compute_gpa(grades)
+
+
+class CGPAVerifier:
+    """
+    Collects candidates tier by tier. A value is verified when strategies reading independent
+    evidence (see SOURCE_GROUP) agree on it and nothing else was found, or when it matches the CGPA
+    recomputed from the semester rows. Within a group only the most trusted candidate counts.
+    """
+
+    def __init__(self, recomputed: Optional[float] = None, tolerance=CGPA_TOLERANCE):
+        self.recomputed = recomputed
+        self.tolerance = tolerance
+        self.candidates: List[Candidate] = []
+
+    def add(self, source, value, confidence=None):
+        if value is None:
+            return
+        confidence = SOURCE_CONFIDENCE.get(source, 0.5) if confidence is None else confidence
+        self.candidates.append(Candidate(source, round(float(value), 2), confidence))
+
+    def _clusters(self):
+        """value -> candidates reporting it (values are compared at two decimals)"""
+        clusters = {}
+        for candidate in self.candidates:
+            clusters.setdefault(candidate.value, []).append(candidate)
+        return clusters
+
+    def _matches_recomputed(self, value):
+        return self.recomputed is not None and abs(value - self.recomputed) <= self.tolerance
+
+    @staticmethod
+    def _votes(candidates):
+        """Confidence of each independent group backing a value"""
+        votes = {}
+        for c in candidates:
+            votes[_group(c.source)] = max(votes.get(_group(c.source), 0.0), c.confidence)
+        return votes
+
+    def _score(self, value, candidates):
+        score = sum(self._votes(candidates).values())
+        return score + RECOMPUTED_WEIGHT if self._matches_recomputed(value) else score
+
+    def verdict(self):
+        """Best supported value so far, or None without candidates"""
+        clusters = self._clusters()
+        if not clusters:
+            return None
+
+        scores = {value: self._score(value, candidates) for value, candidates in clusters.items()}
+        value = max(scores, key=scores.get)
+        supporters = clusters[value]
+        sources = sorted({c.source for c in supporters})
+        votes = self._votes(supporters)
+
+        unsupported = 1.0
+        for confidence in votes.values():
+            unsupported *= 1.0 - confidence
+        if self._matches_recomputed(value):
+            unsupported *= 1.0 - RECOMPUTED_WEIGHT
+        confidence = (1.0 - unsupported) * scores[value] / sum(scores.values())
+
+        recomputed_matches = [v for v in clusters if self._matches_recomputed(v)]
+        if len(clusters) == 1 and len(votes) >= 2:
+            reason, verified = 'agreement', True
+        elif recomputed_matches == [value]:
+            reason, verified = 'recomputed', True
+        elif len(clusters) > 1:
+            reason, verified = 'disagreement', False
+        else:
+            reason, verified = 'single-source', False
+        return Verdict(value, round(confidence, 3), verified, reason, sources)
+
+    def summary(self):
+        listed = ', '.join(f"{c.source}={c.value}" for c in self.candidates) or 'none'
+        recomputed = f", recomputed={self.recomputed}" if self.recomputed is not None else ''
+        return f"candidates: {listed}{recomputed}"
@@ -0,0 +1,179 @@
+# change_detection.py
+# Fingerprints grade sheets per account and reports only what changed since the previous run
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional, List
+
+logger = logging.getLogger(__name__)
+
+# ASP.NET re-renders these on every request, so they must not take part in the page hash
+_VOLATILE_MARKUP = [
+    re.compile(r'<script\b.*?</script>', re.IGNORECASE | re.DOTALL),
+    re.compile(r'<input[^>]*type=["\']?hidden["\']?[^>]*>', re.IGNORECASE),
+    re.compile(r'<!--.*?-->', re.DOTALL),
+]
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def page_fingerprint(page_source):
+    """Hash of the grade sheet page with per-request noise (scripts, viewstate, comments) removed"""
+    for pattern in _VOLATILE_MARKUP:
+        page_source = pattern.sub('', page_source)
+    return _sha256(_WHITESPACE.sub(' ', page_source).strip())
+
+
+def subject_fingerprint(grade):
+    return _sha256(f"{grade.subject_code}|{grade.credits}|{grade.grade}|{grade.grade_points}")
+
+
+def semester_fingerprint(semester):
+    subject_hashes = sorted(subject_fingerprint(g) for g in semester.grades)
+    return _sha256(f"{semester.semester}|{semester.sgpa}|{semester.credits}|{'|'.join(subject_hashes)}")
+
+
+def build_snapshot(page_hash, result):
+    """Snapshot dict stored per account: page hash, CGPA and per-semester/per-subject fingerprints"""
+    return {
+        'page_hash': page_hash,
+        'cgpa': result.cgpa,
+        'updated_at': time.time(),
+        'semesters': {
+            str(sem.semester): {
+                'hash': semester_fingerprint(sem),
+                'sgpa': sem.sgpa,
+                'subjects': {
+                    g.subject_code: {
+                        'hash': subject_fingerprint(g),
+                        'grade': g.grade,
+                        'grade_points': g.grade_points,
+                        'credits': g.credits,
+                    }
+                    for g in sem.grades
+                },
+            }
+            for sem in result.semesters
+        },
+    }
+
+
+@dataclass
+class GradeChange:
+    kind: str  # new_semester | new_subject | grade_changed | cgpa_changed
+    semester: Optional[int] = None
+    subject_code: Optional[str] = None
+    old: Optional[str] = None
+    new: Optional[str] = None
+
+    def __str__(self):
+        if self.kind == 'cgpa_changed':
+            return f"CGPA changed: {self.old} -> {self.new}"
+        if self.kind == 'new_semester':
+            return f"New semester {self.semester} (SGPA {self.new})"
+        if self.kind == 'new_subject':
+            return f"Semester {self.semester}: new subject {self.subject_code} ({self.new})"
+        return f"Semester {self.semester}: {self.subject_code} grade {self.old} -> {self.new}"
+
+
+def diff_snapshots(previous, current):
+    """List the GradeChange entries between two snapshots (previous may be None)"""
+    changes = []
+    previous = previous or {'cgpa': None, 'semesters': {}}
+
+    for sem_key, sem in current['semesters'].items():
+        old_sem = previous['semesters'].get(sem_key)
+        if old_sem is None:
+            changes.append(GradeChange('new_semester', semester=int(sem_key), new=str(sem['sgpa'])))
+            continue
+        if old_sem['hash'] == sem['hash']:
+            continue
+        for code, subject in sem['subjects'].items():
+            old_subject = old_sem['subjects'].get(code)
+            if old_subject is None:
+                changes.append(GradeChange('new_subject', int(sem_key), code, new=subject['grade']))
+            elif old_subject['hash'] != subject['hash']:
+                changes.append(GradeChange('grade_changed', int(sem_key), code,
+                                           old=old_subject['grade'], new=subject['grade']))
+
+    if previous['cgpa'] != current['cgpa']:
+        changes.append(GradeChange('cgpa_changed', old=str(previous['cgpa']), new=str(current['cgpa'])))
+    return changes
+
+
+class SnapshotStore:
+    """One JSON snapshot file per account in a local directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, account):
+        return os.path.join(self.directory, f"{_sha256(account)[:16]}.json")
+
+    def load(self, account):
+        try:
+            with open(self._path(account), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable snapshot for {account[:3]}***: {e}")
+            return None
+
+    def save(self, account, snapshot):
+        path = self._path(account)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+class ChangeDetector:
+    """
+    Two-phase change detection for a grade sheet:
+    is_unchanged() runs on the raw page_source before any extraction, record() runs after parsing.
+    is_unchanged() reads the stored snapshot; previous_cgpa() and record() reuse that copy.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.snapshots = {}  # account -> snapshot read by the latest is_unchanged() or written by record()
+
+    def _previous(self, account):
+        if account not in self.snapshots:
+            self.snapshots[account] = self.store.load(account)
+        return self.snapshots[account]
+
+    def is_unchanged(self, account, page_source):
+        """True when the page hash matches the stored snapshot, so extraction can be skipped"""
+        self.snapshots.pop(account, None)  # another worker may have recorded a newer snapshot
+        previous = self._previous(account)
+        return previous is not None and previous.get('page_hash') == page_fingerprint(page_source)
+
+    def previous_cgpa(self, account):
+        previous = self._previous(account)
+        return previous.get('cgpa') if previous else None
+
+    def record(self, account, page_source, result) -> List[GradeChange]:
+        """Store the new snapshot for the account and return the changes against the previous one"""
+        previous = self._previous(account)
+        current = build_snapshot(page_fingerprint(page_source), result)
+        changes = diff_snapshots(previous, current)
+        self.store.save(account, current)
+        self.snapshots[account] = current
+
+        for change in changes:
+            logger.info(f"Grade sheet change: {change}")
+        return changes
+
+    @staticmethod
+    def changes_as_dicts(changes):
+        return [asdict(c) for c in changes]
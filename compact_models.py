@@ -0,0 +1,187 @@
+# compact_models.py
+# Memory-compact, immutable variants of the data_models classes and an array-backed cohort container
+import sys
+from array import array
+from enum import IntEnum
+from dataclasses import dataclass
+from typing import Tuple
+import numpy as np
+from data_models import StudentGrade, SemesterResult, StudentResult
+from gradesheet_parser import GRADE_POINTS
+
+
+class Grade(IntEnum):
+    """Letter grades as small integers, so they fit in a uint8 column"""
+    A_PLUS = 0
+    A = 1
+    B = 2
+    C = 3
+    D = 4
+    E = 5
+    F = 6
+    I = 7
+    DT = 8
+
+    @property
+    def label(self):
+        return _GRADE_LABELS[self]
+
+    @property
+    def points(self):
+        return GRADE_POINTS[self.label]
+
+    @classmethod
+    def from_label(cls, label):
+        return _LABEL_TO_GRADE[label.strip().upper()]
+
+
+_GRADE_LABELS = {grade: grade.name.replace('_PLUS', '+') for grade in Grade}
+_LABEL_TO_GRADE = {label: grade for grade, label in _GRADE_LABELS.items()}
+# Indexed by Grade value, for vectorized grade -> points lookups
+GRADE_POINTS_TABLE = np.array([GRADE_POINTS[_GRADE_LABELS[g]] for g in Grade], dtype=np.float32)
+
+
+@dataclass(slots=True, frozen=True)
+class CompactGrade:
+    subject_code: str
+    subject_name: str
+    credits: int
+    grade: Grade
+    grade_points: float
+
+    @classmethod
+    def from_grade(cls, grade: StudentGrade):
+        return cls(
+            subject_code=sys.intern(grade.subject_code),
+            subject_name=sys.intern(grade.subject_name),
+            credits=grade.credits,
+            grade=Grade.from_label(grade.grade),
+            grade_points=grade.grade_points,
+        )
+
+    def to_grade(self):
+        return StudentGrade(self.subject_code, self.subject_name, self.credits, self.grade.label, self.grade_points)
+
+
+@dataclass(slots=True, frozen=True)
+class CompactSemester:
+    semester: int
+    sgpa: float
+    credits: int
+    grades: Tuple[CompactGrade, ...]
+
+    @classmethod
+    def from_semester(cls, semester: SemesterResult):
+        return cls(semester.semester, semester.sgpa, semester.credits,
+                   tuple(CompactGrade.from_grade(g) for g in semester.grades))
+
+    def to_semester(self):
+        return SemesterResult(self.semester, self.sgpa, self.credits, [g.to_grade() for g in self.grades])
+
+
+@dataclass(slots=True, frozen=True)
+class CompactResult:
+    student_id: str
+    name: str
+    cgpa: float
+    semesters: Tuple[CompactSemester, ...]
+
+    @classmethod
+    def from_result(cls, result: StudentResult):
+        return cls(result.student_id, result.name, result.cgpa,
+                   tuple(CompactSemester.from_semester(s) for s in result.semesters))
+
+    def to_result(self):
+        return StudentResult(self.student_id, self.name, self.cgpa, [s.to_semester() for s in self.semesters])
+
+
+class CohortColumns:
+    """
+    Column-oriented storage for a whole cohort: one entry per student plus one entry per grade row.
+    Subject codes are dictionary-encoded into `subjects`; grades are Grade values.
+    """
+
+    def __init__(self, student_ids, cgpa, row_student, row_semester, row_subject,
+                 row_credits, row_grade, row_points, subjects):
+        self.student_ids = student_ids
+        self.cgpa = cgpa
+        self.row_student = row_student
+        self.row_semester = row_semester
+        self.row_subject = row_subject
+        self.row_credits = row_credits
+        self.row_grade = row_grade
+        self.row_points = row_points
+        self.subjects = subjects
+
+    @classmethod
+    def from_results(cls, results):
+        """Build from any iterable of StudentResult/CompactResult without materializing the objects"""
+        student_ids = []
+        cgpa = array('f')
+        row_student = array('i')
+        row_semester = array('h')
+        row_subject = array('i')
+        row_credits = array('b')
+        row_grade = array('B')
+        row_points = array('f')
+        subjects = []
+        subject_index = {}
+
+        for result in results:
+            student = len(student_ids)
+            student_ids.append(result.student_id)
+            cgpa.append(result.cgpa)
+            for sem in result.semesters:
+                for g in sem.grades:
+                    code = subject_index.get(g.subject_code)
+                    if code is None:
+                        code = subject_index[g.subject_code] = len(subjects)
+                        subjects.append(sys.intern(g.subject_code))
+                    grade = g.grade if isinstance(g.grade, Grade) else Grade.from_label(g.grade)
+                    row_student.append(student)
+                    row_semester.append(sem.semester)
+                    row_subject.append(code)
+                    row_credits.append(g.credits)
+                    row_grade.append(grade)
+                    row_points.append(g.grade_points)
+
+        return cls(
+            student_ids=student_ids,
+            cgpa=np.frombuffer(cgpa, dtype=np.float32),
+            row_student=np.frombuffer(row_student, dtype=np.int32),
+            row_semester=np.frombuffer(row_semester, dtype=np.int16),
+            row_subject=np.frombuffer(row_subject, dtype=np.int32),
+            row_credits=np.frombuffer(row_credits, dtype=np.int8),
+            row_grade=np.frombuffer(row_grade, dtype=np.uint8),
+            row_points=np.frombuffer(row_points, dtype=np.float32),
+            subjects=subjects,
+        )
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    @property
+    def num_rows(self):
+        return len(self.row_student)
+
+    @property
+    def nbytes(self):
+        arrays = [self.cgpa, self.row_student, self.row_semester, self.row_subject,
+                  self.row_credits, self.row_grade, self.row_points]
+        return sum(a.nbytes for a in arrays)
+
+    def cgpa_distribution(self, bins=20, value_range=(0.0, 10.0)):
+        """Histogram of reported CGPA as (counts, bin_edges)"""
+        return np.histogram(self.cgpa, bins=bins, range=value_range)
+
+    def subject_grade_histogram(self):
+        """(num_subjects, num_grades) matrix of grade counts per subject"""
+        num_grades = len(Grade)
+        flat = self.row_subject.astype(np.int64) * num_grades + self.row_grade
+        counts = np.bincount(flat, minlength=len(self.subjects) * num_grades)
+        return counts.reshape(len(self.subjects), num_grades)
+
+    def subject_histogram(self, subject_code):
+        """Grade label -> count for one subject"""
+        row = self.subject_grade_histogram()[self.subjects.index(subject_code)]
+        return {grade.label: int(count) for grade, count in zip(Grade, row) if count}
@@ -22,4 +22,107 @@ TESSERACT_CONFIG = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789.CGPA:
 
 # Selenium Settings
 IMPLICIT_WAIT = 10
-PAGE_LOAD_TIMEOUT = 30 
\ No newline at end of file
+PAGE_LOAD_TIMEOUT = 30
+
+# Change Detection
+CHANGE_DETECTION_ENABLED = os.getenv('CHANGE_DETECTION_ENABLED', 'true').lower() == 'true'
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', './snapshots')
+
+# Result Store
+RESULT_STORE_ENABLED = os.getenv('RESULT_STORE_ENABLED', 'true').lower() == 'true'
+RESULT_DB_PATH = os.getenv('RESULT_DB_PATH', './results.db')
+
+# Retry Policy
+LOGIN_MAX_ATTEMPTS = int(os.getenv('LOGIN_MAX_ATTEMPTS', '3'))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '1.0'))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '20.0'))
+RETRY_BUDGET_SECONDS = float(os.getenv('RETRY_BUDGET_SECONDS', '180'))
+
+# Captcha Pipeline
+CAPTCHA_PIPELINE_ENABLED = os.getenv('CAPTCHA_PIPELINE_ENABLED', 'true').lower() == 'true'
+# A background solve still running after this many seconds counts as a failed guess
+CAPTCHA_SOLVE_TIMEOUT = float(os.getenv('CAPTCHA_SOLVE_TIMEOUT', '60'))
+# canvas | fetch | cookies | screenshot - see captcha_capture.py
+CAPTCHA_CAPTURE_MODE = os.getenv('CAPTCHA_CAPTURE_MODE', 'canvas')
+
+# OCR Service: worker processes for captcha and grade sheet OCR (0 = run OCR in the calling thread)
+OCR_WORKERS = int(os.getenv('OCR_WORKERS', '0'))
+
+# Image Variant Store (preprocessed captcha variants shared by the vision and OCR solvers)
+VARIANT_STORE_MAX_MB = float(os.getenv('VARIANT_STORE_MAX_MB', '32'))
+
+# Vision Model Batching (multi-image requests only for models whose profile supports them)
+VISION_BATCH_MAX_IMAGES = int(os.getenv('VISION_BATCH_MAX_IMAGES', '4'))
+VISION_BATCH_MAX_WAIT_MS = int(os.getenv('VISION_BATCH_MAX_WAIT_MS', '50'))
+# Every Nth batch (and the first) re-asks one image on its own; batching is switched off for a model
+# whose batched answers agree with its single-image answers less often than VISION_BATCH_MIN_AGREEMENT
+VISION_BATCH_VERIFY_EVERY = int(os.getenv('VISION_BATCH_VERIFY_EVERY', '5'))
+VISION_BATCH_MIN_AGREEMENT = float(os.getenv('VISION_BATCH_MIN_AGREEMENT', '0.9'))
+
+# Vision Backend
+VISION_MODEL = os.getenv('VISION_MODEL')  # force one model for every task
+CAPTCHA_VISION_MODEL = os.getenv('CAPTCHA_VISION_MODEL')
+CGPA_VISION_MODEL = os.getenv('CGPA_VISION_MODEL')
+VISION_MODEL_CANDIDATES = os.getenv(
+    'VISION_MODEL_CANDIDATES', 'moondream,llava-phi3,llama3.2-vision,llava:7b,llava:13b,llava'
+).split(',')
+VISION_BENCHMARK_DIR = os.getenv('VISION_BENCHMARK_DIR', './vision_benchmark')
+VISION_SELECTION_CACHE = os.getenv('VISION_SELECTION_CACHE', './vision_models.json')
+VISION_LATENCY_WEIGHT = float(os.getenv('VISION_LATENCY_WEIGHT', '0.05'))  # score penalty per second
+
+# Browser Profile
+BROWSER_PROFILE = os.getenv('BROWSER_PROFILE', 'lean')  # lean | full
+HEADLESS_BROWSER = os.getenv('HEADLESS_BROWSER', 'false').lower() == 'true'
+BROWSER_WINDOW_SIZE = os.getenv('BROWSER_WINDOW_SIZE', '1024,768')
+# Extra comma-separated URL patterns to block on top of browser_profile.BLOCKED_URL_PATTERNS
+BROWSER_BLOCKED_URLS = [p for p in os.getenv('BROWSER_BLOCKED_URLS', '').split(',') if p]
+
+# Warm Start
+BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '0'))  # idle browsers kept pre-spawned
+BROWSER_TEMPLATE_DIR = os.getenv('BROWSER_TEMPLATE_DIR', './browser_template')
+DRIVER_CACHE_FILE = os.getenv('DRIVER_CACHE_FILE', './chromedriver_path.json')
+
+# Grade Sheet Navigation
+GRADESHEET_NAVIGATION = os.getenv('GRADESHEET_NAVIGATION', 'cdp')  # cdp | poll
+
+# Extra Pages (page_extractors.py names, e.g. attendance,timetable,marks,fees), collected after login
+EXTRA_PAGES = [p.strip() for p in os.getenv('SLCM_EXTRA_PAGES', '').split(',') if p.strip()]
+
+# Selector Cache (see selector_cache.py; refresh with `python element_discovery.py --profile`)
+SELECTOR_CACHE_PATH = os.getenv('SELECTOR_CACHE_PATH', './selector_cache.json')
+
+# Job Queue (see job_queue.py)
+JOB_DB_PATH = os.getenv('JOB_DB_PATH', './jobs.db')
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '120'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2.0'))
+# Seconds a job stays reserved for the worker holding the account's browser before others may take it
+JOB_AFFINITY_GRACE = float(os.getenv('JOB_AFFINITY_GRACE', '15'))
+# JSON object of account -> password, read only on browser nodes
+ACCOUNTS_FILE = os.getenv('SLCM_ACCOUNTS_FILE', './accounts.json')
+
+# Portal Politeness (see rate_limiter.py; limits are per process, divide them across nodes)
+PORTAL_LOGINS_PER_MINUTE = float(os.getenv('PORTAL_LOGINS_PER_MINUTE', '6'))
+PORTAL_LOGIN_BURST = int(os.getenv('PORTAL_LOGIN_BURST', '2'))
+PORTAL_MAX_SESSIONS = int(os.getenv('PORTAL_MAX_SESSIONS', '3'))
+PORTAL_REQUESTS_PER_SECOND = float(os.getenv('PORTAL_REQUESTS_PER_SECOND', '2.0'))
+# Requests are paced down proportionally once the smoothed page load time exceeds this
+PORTAL_TARGET_RESPONSE_SECONDS = float(os.getenv('PORTAL_TARGET_RESPONSE_SECONDS', '2.0'))
+PORTAL_MAX_SLOWDOWN = float(os.getenv('PORTAL_MAX_SLOWDOWN', '8.0'))
+PORTAL_BACKOFF_BASE = float(os.getenv('PORTAL_BACKOFF_BASE', '5.0'))
+PORTAL_BACKOFF_MAX = float(os.getenv('PORTAL_BACKOFF_MAX', '120.0'))
+
+# Profiling (see profiling.py): off | cprofile | sample | both
+PROFILE_MODE = os.getenv('PROFILE_MODE', 'off').lower()
+PROFILE_DIR = os.getenv('PROFILE_DIR', './profiles')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+
+# Session Recording (see session_recorder.py; bundles contain grade data, keep them private)
+SESSION_RECORD = os.getenv('SESSION_RECORD', 'false').lower() == 'true'
+SESSION_DIR = os.getenv('SESSION_DIR', './sessions')
+
+# Vision Screenshots (see screenshot_capture.py): jpeg | webp | png, quality 0-100 for jpeg/webp
+SCREENSHOT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'jpeg').lower()
+SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '85'))
+# CSS pixels kept around the grade table so its border and labels are not cut off
+SCREENSHOT_PADDING = int(os.getenv('SCREENSHOT_PADDING', '8'))
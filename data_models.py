@@ -1,6 +1,6 @@
 # data_models.py
 # Data models for structured results from the SLCM scraper
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import Optional, List
 
 @dataclass
@@ -24,3 +24,57 @@ class StudentResult:
     name: str
     cgpa: float
     semesters: List[SemesterResult]
+
+
+def result_to_dict(result: StudentResult) -> dict:
+    """Plain dict form of a StudentResult, suitable for JSON"""
+    return asdict(result)
+
+
+def result_from_dict(data: dict) -> StudentResult:
+    """Rebuild a StudentResult (with nested semesters and grades) from result_to_dict output"""
+    semesters = [
+        SemesterResult(
+            semester=sem['semester'],
+            sgpa=sem['sgpa'],
+            credits=sem['credits'],
+            grades=[StudentGrade(**grade) for grade in sem['grades']],
+        )
+        for sem in data.get('semesters', [])
+    ]
+    return StudentResult(
+        student_id=data['student_id'],
+        name=data.get('name', ''),
+        cgpa=data['cgpa'],
+        semesters=semesters,
+    )
+
+
+@dataclass
+class AttendanceRecord:
+    subject_code: str
+    subject_name: str
+    classes_held: int
+    classes_attended: int
+    percentage: float
+
+@dataclass
+class TimetableEntry:
+    day: str
+    time: str
+    subject: str
+    venue: str = ''
+
+@dataclass
+class MarksRecord:
+    subject_code: str
+    component: str
+    marks: float
+    max_marks: float = 0.0
+
+@dataclass
+class FeeRecord:
+    description: str
+    amount: float
+    paid: float = 0.0
+    due: float = 0.0
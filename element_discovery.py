@@ -2,7 +2,12 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support.ui import WebDriverWait
+import argparse
 import time
+from config import LOGIN_URL, PAGE_LOAD_TIMEOUT, SELECTOR_CACHE_PATH
+from browser_pool import launch_browser
+from selector_cache import SelectorCache, LOGIN_LOCATORS, no_implicit_wait
 
 def discover_all_elements():
     """Comprehensive element discovery script for SLCM login page - FIXED VERSION"""
@@ -136,3 +141,46 @@ def discover_all_elements():
                 print(f"Iframe {i+1}: Error reading iframe: {e}")
     except Exception as e:
         print(f"Error in main try block: {e}")
+
+def profile_login_selectors(driver, cache):
+    """Non-interactive: record which locator finds each login field on the current page"""
+    found = {}
+    with no_implicit_wait(driver):
+        for name, candidates in LOGIN_LOCATORS.items():
+            for label, by, value in candidates:
+                elements = driver.find_elements(by, value)
+                if elements:
+                    cache.record('login', name, label, by, value, 0, source='profiler')
+                    found[name] = label
+                    print(f"  ✓ {name}: {label} ({by}={value})")
+                    break
+            else:
+                print(f"  ✗ {name}: no candidate matched")
+    return found
+
+
+def run_login_profiler():
+    """Open the login page, profile the login fields and save them to the selector cache"""
+    browser = launch_browser()
+    try:
+        browser.driver.get(LOGIN_URL)
+        WebDriverWait(browser.driver, PAGE_LOAD_TIMEOUT).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+        print("Profiling login page selectors...")
+        cache = SelectorCache(SELECTOR_CACHE_PATH)
+        found = profile_login_selectors(browser.driver, cache)
+        print(f"Saved {len(found)}/{len(LOGIN_LOCATORS)} login selectors to {SELECTOR_CACHE_PATH}")
+    finally:
+        browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SLCM login page element discovery")
+    parser.add_argument('--profile', action='store_true',
+                        help="non-interactive: record the working login selectors in the selector cache")
+    args = parser.parse_args()
+    if args.profile:
+        run_login_profiler()
+    else:
+        discover_all_elements()
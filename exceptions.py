@@ -0,0 +1,38 @@
+# exceptions.py
+# Exception types raised by the SLCM scraper
+
+
+class ScraperError(Exception):
+    """Base class for scraper failures"""
+
+
+class LoginError(ScraperError):
+    """Login did not reach the student homepage"""
+
+
+class CaptchaError(LoginError):
+    """The portal rejected the captcha (or none of the guesses could be solved)"""
+
+
+class InvalidCredentialsError(LoginError):
+    """The portal rejected the username or password - retrying cannot help"""
+
+
+class SessionLostError(LoginError):
+    """The browser session disconnected or the portal session expired"""
+
+
+class TokenExtractionError(ScraperError):
+    """A required page token or element could not be read"""
+
+
+class CGPAExtractionError(ScraperError):
+    """No extraction strategy produced a valid CGPA"""
+
+
+class ModelUnavailableError(ScraperError):
+    """The vision model or OCR engine could not be reached"""
+
+
+class PortalError(ScraperError):
+    """The portal answered with an error or throttling page, or no session slot was free"""
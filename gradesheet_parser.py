@@ -0,0 +1,139 @@
+# gradesheet_parser.py
+# Parses the GradeSheet.aspx page source into the structured models from data_models.py
+import re
+import logging
+from bs4 import BeautifulSoup
+from data_models import StudentGrade, SemesterResult, StudentResult
+
+logger = logging.getLogger(__name__)
+
+# Manipal 10-point grading scale
+GRADE_POINTS = {
+    'A+': 10.0,
+    'A': 9.0,
+    'B': 8.0,
+    'C': 7.0,
+    'D': 6.0,
+    'E': 5.0,
+    'F': 0.0,
+    'I': 0.0,
+    'DT': 0.0,
+}
+
+SUBJECT_CODE_RE = re.compile(r'^[A-Z]{2,5}\s?-?\s?\d{3,4}[A-Z]?$')
+SEMESTER_RE = re.compile(r'\bsem(?:ester)?\s*[-:.]?\s*([IVX]{1,4}|\d{1,2})\b', re.IGNORECASE)
+DECIMAL_RE = re.compile(r'(\d{1,2}\.\d{1,3})')
+ROMAN_NUMERALS = {'I': 1, 'V': 5, 'X': 10}
+
+
+def roman_to_int(value):
+    """Convert a small roman numeral (semester labels) to an int"""
+    total = 0
+    previous = 0
+    for char in reversed(value.upper()):
+        current = ROMAN_NUMERALS[char]
+        total = total - current if current < previous else total + current
+        previous = max(previous, current)
+    return total
+
+
+def parse_semester_label(text):
+    """Return the semester number mentioned in text, or None"""
+    match = SEMESTER_RE.search(text or '')
+    if not match:
+        return None
+    label = match.group(1)
+    return int(label) if label.isdigit() else roman_to_int(label)
+
+
+def compute_gpa(grades):
+    """Credit-weighted grade point average over a list of StudentGrade rows"""
+    total_credits = sum(g.credits for g in grades)
+    if total_credits <= 0:
+        return 0.0
+    return round(sum(g.credits * g.grade_points for g in grades) / total_credits, 2)
+
+
+def _parse_grade_row(cells):
+    """Parse one table row into a StudentGrade, or None if it is not a subject row"""
+    code_idx = next((i for i, c in enumerate(cells) if SUBJECT_CODE_RE.match(c)), None)
+    if code_idx is None:
+        return None
+
+    name = ''
+    credits = None
+    grade = None
+    grade_points = None
+    for cell in cells[code_idx + 1:]:
+        upper = cell.upper()
+        if grade is None and upper in GRADE_POINTS:
+            grade = upper
+        elif credits is None and re.fullmatch(r'\d{1,2}(\.0)?', cell):
+            credits = int(float(cell))
+        elif grade is not None and grade_points is None and re.fullmatch(r'\d{1,2}(\.\d+)?', cell):
+            grade_points = float(cell)
+        elif not name and re.search(r'[A-Za-z]{2,}', cell):
+            name = cell
+
+    if grade is None or credits is None:
+        return None
+    if grade_points is None or grade_points > 10.0:
+        grade_points = GRADE_POINTS[grade]
+
+    return StudentGrade(
+        subject_code=re.sub(r'[\s-]', '', cells[code_idx]),
+        subject_name=name,
+        credits=credits,
+        grade=grade,
+        grade_points=grade_points,
+    )
+
+
+def parse_gradesheet(page_source, student_id='', name=''):
+    """
+    Parse the grade sheet HTML into a StudentResult.
+    Semester numbers come from the nearest preceding "Semester N" label, SGPA/CGPA from summary rows.
+    The returned cgpa is the reported value when present, otherwise 0.0.
+    """
+    soup = BeautifulSoup(page_source, 'html.parser')
+    semesters = {}
+    reported_sgpa = {}
+    cgpa = 0.0
+
+    for row in soup.find_all('tr'):
+        cells = [c.get_text(' ', strip=True) for c in row.find_all(['td', 'th'], recursive=False)]
+        cells = [c for c in cells if c]
+        if not cells:
+            continue
+
+        row_text = ' '.join(cells)
+        label = row.find_previous(string=SEMESTER_RE)
+        semester = parse_semester_label(row_text) or parse_semester_label(str(label or '')) or 0
+
+        grade = _parse_grade_row(cells)
+        if grade:
+            semesters.setdefault(semester, []).append(grade)
+            continue
+
+        lowered = row_text.lower()
+        values = [float(v) for v in DECIMAL_RE.findall(row_text) if 0.0 <= float(v) <= 10.0]
+        if not values:
+            continue
+        if 'cgpa' in lowered or 'cumulative' in lowered:
+            cgpa = values[-1]
+        elif 'sgpa' in lowered or 'gpa' in lowered:
+            reported_sgpa[semester] = values[-1]
+
+    semester_results = []
+    for number in sorted(semesters):
+        grades = semesters[number]
+        semester_results.append(SemesterResult(
+            semester=number,
+            sgpa=reported_sgpa.get(number, compute_gpa(grades)),
+            credits=sum(g.credits for g in grades),
+            grades=grades,
+        ))
+
+    logger.info(f"Parsed grade sheet: {len(semester_results)} semesters, "
+                f"{sum(len(s.grades) for s in semester_results)} subjects")
+    return StudentResult(student_id=student_id, name=name, cgpa=cgpa, semesters=semester_results)
@@ -0,0 +1,572 @@
+# job_queue.py
+# Staged work queue for scraping many accounts across nodes: login -> extract -> post_process
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
+from typing import Optional
+from config import (USERNAME, PASSWORD, LOGIN_URL, ACCOUNTS_FILE, JOB_DB_PATH, JOB_LEASE_SECONDS,
+                    JOB_MAX_ATTEMPTS, JOB_POLL_INTERVAL, JOB_AFFINITY_GRACE, LOGIN_MAX_ATTEMPTS,
+                    RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_BUDGET_SECONDS, CHANGE_DETECTION_ENABLED,
+                    SNAPSHOT_DIR, RESULT_STORE_ENABLED, RESULT_DB_PATH)
+from exceptions import InvalidCredentialsError, CGPAExtractionError
+from retry_policy import RetryPolicy, classify_failure, RETRYABLE_FAILURES, credential_guard
+from change_detection import ChangeDetector, SnapshotStore
+from gradesheet_parser import parse_gradesheet
+from result_store import ResultStore
+from rate_limiter import get_portal_scheduler
+from profiling import profile_run
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('login', 'extract', 'post_process')
+NEXT_STAGE = {'login': 'extract', 'extract': 'post_process', 'post_process': None}
+BROWSER_STAGES = ('login', 'extract')
+
+
+@dataclass
+class Job:
+    id: int
+    account: str
+    stage: str
+    status: str  # queued | leased | done | dead
+    payload: dict = field(default_factory=dict)
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    affinity: Optional[str] = None  # worker that holds this account's live browser session
+    available_at: float = 0.0
+    error: Optional[str] = None
+
+
+def _eligible(job, stages, worker_id, now):
+    """Queued, due, for one of the stages, and not reserved for another worker's live session"""
+    return (job.status == 'queued' and job.stage in stages and job.available_at <= now
+            and (job.affinity in (None, worker_id) or job.available_at <= now - JOB_AFFINITY_GRACE))
+
+
+class MemoryBroker:
+    """In-process broker with the same semantics as SQLiteBroker (single-node runs and tests)"""
+
+    def __init__(self, max_attempts=JOB_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.jobs = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def enqueue(self, account, payload=None, stage='login'):
+        with self.lock:
+            job = Job(self.next_id, account, stage, 'queued', dict(payload or {}),
+                      max_attempts=self.max_attempts, available_at=time.time())
+            self.jobs[job.id] = job
+            self.next_id += 1
+            return job.id
+
+    def lease(self, stages, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        now = time.time()
+        with self.lock:
+            ready = [j for j in self.jobs.values() if _eligible(j, stages, worker_id, now)]
+            if not ready:
+                return None
+            job = min(ready, key=lambda j: (j.affinity != worker_id, j.available_at, j.id))
+            job.status, job.lease_owner, job.lease_expires = 'leased', worker_id, now + lease_seconds
+            return replace(job, payload=dict(job.payload))
+
+    def _owned(self, job_id, worker_id):
+        job = self.jobs.get(job_id)
+        return job if job and job.status == 'leased' and job.lease_owner == worker_id else None
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        with self.lock:
+            job = self._owned(job_id, worker_id)
+            if job:
+                job.lease_expires = time.time() + lease_seconds
+            return job is not None
+
+    def advance(self, job_id, worker_id, payload, affinity=None):
+        with self.lock:
+            job = self._owned(job_id, worker_id)
+            if not job:
+                return False
+            next_stage = NEXT_STAGE[job.stage]
+            job.payload = dict(payload)
+            job.lease_owner = job.lease_expires = job.error = None
+            job.attempts = 0
+            job.affinity = affinity
+            job.available_at = time.time()
+            if next_stage:
+                job.stage, job.status = next_stage, 'queued'
+            else:
+                job.status = 'done'
+            return True
+
+    def fail(self, job_id, worker_id, error, retryable=True, delay=0.0):
+        with self.lock:
+            job = self._owned(job_id, worker_id)
+            if not job:
+                return False
+            job.attempts += 1
+            job.error = str(error)[:500]
+            job.lease_owner = job.lease_expires = job.affinity = None
+            job.available_at = time.time() + delay
+            job.status = 'queued' if retryable and job.attempts < job.max_attempts else 'dead'
+            return True
+
+    def recover_expired(self):
+        """Requeue jobs whose lease ran out (their worker died); returns (requeued, dead)"""
+        now, requeued, dead = time.time(), 0, 0
+        with self.lock:
+            for job in self.jobs.values():
+                if job.status == 'leased' and job.lease_expires < now:
+                    job.attempts += 1
+                    job.error = f"lease expired (worker {job.lease_owner})"
+                    job.lease_owner = job.lease_expires = job.affinity = None
+                    job.available_at = now
+                    job.status = 'queued' if job.attempts < job.max_attempts else 'dead'
+                    requeued, dead = (requeued + 1, dead) if job.status == 'queued' else (requeued, dead + 1)
+        return requeued, dead
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return replace(job, payload=dict(job.payload)) if job else None
+
+    def counts(self):
+        with self.lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[(job.stage, job.status)] = counts.get((job.stage, job.status), 0) + 1
+            return counts
+
+
+class SQLiteBroker:
+    """
+    Broker in a SQLite file. Every node pointing at the same file (local disk or a shared volume
+    with working locks) shares the queue; leases are taken inside BEGIN IMMEDIATE transactions.
+    """
+
+    def __init__(self, path=JOB_DB_PATH, max_attempts=JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    account TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    affinity TEXT,
+                    available_at REAL NOT NULL,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, stage, available_at);
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _job(row):
+        return Job(row['id'], row['account'], row['stage'], row['status'], json.loads(row['payload']),
+                   row['attempts'], row['max_attempts'], row['lease_owner'], row['lease_expires'],
+                   row['affinity'], row['available_at'], row['error'])
+
+    def _write(self, sql, params):
+        """Single UPDATE in its own transaction; returns the affected row count"""
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).rowcount
+        finally:
+            conn.close()
+
+    def enqueue(self, account, payload=None, stage='login'):
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO jobs (account, stage, status, payload, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (account, stage, json.dumps(payload or {}), self.max_attempts, now, now, now))
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def lease(self, stages, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        now = time.time()
+        marks = ','.join('?' * len(stages))
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE status = 'queued' AND stage IN ({marks}) AND available_at <= ? "
+                f"AND (affinity IS NULL OR affinity = ? OR available_at <= ?) "
+                f"ORDER BY CASE WHEN affinity = ? THEN 0 ELSE 1 END, available_at, id LIMIT 1",
+                (*stages, now, worker_id, now - JOB_AFFINITY_GRACE, worker_id)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute("UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, updated_at = ? "
+                         "WHERE id = ?", (worker_id, now + lease_seconds, now, row['id']))
+            conn.execute("COMMIT")
+            return replace(self._job(row), status='leased', lease_owner=worker_id,
+                           lease_expires=now + lease_seconds)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        now = time.time()
+        return self._write("UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                           "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                           (now + lease_seconds, now, job_id, worker_id)) == 1
+
+    def advance(self, job_id, worker_id, payload, affinity=None):
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET "
+            "status = CASE stage WHEN 'login' THEN 'queued' WHEN 'extract' THEN 'queued' ELSE 'done' END, "
+            "stage = CASE stage WHEN 'login' THEN 'extract' WHEN 'extract' THEN 'post_process' ELSE stage END, "
+            "payload = ?, attempts = 0, lease_owner = NULL, lease_expires = NULL, affinity = ?, "
+            "available_at = ?, error = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (json.dumps(payload), affinity, now, now, job_id, worker_id)) == 1
+
+    def fail(self, job_id, worker_id, error, retryable=True, delay=0.0):
+        now = time.time()
+        return self._write(
+            "UPDATE jobs SET attempts = attempts + 1, error = ?, lease_owner = NULL, lease_expires = NULL, "
+            "affinity = NULL, available_at = ?, updated_at = ?, "
+            "status = CASE WHEN ? AND attempts + 1 < max_attempts THEN 'queued' ELSE 'dead' END "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (str(error)[:500], now + delay, now, int(retryable), job_id, worker_id)) == 1
+
+    def recover_expired(self):
+        """Requeue jobs whose lease ran out (their worker died); returns (requeued, dead)"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute("SELECT id, attempts, max_attempts, lease_owner FROM jobs "
+                                   "WHERE status = 'leased' AND lease_expires < ?", (now,)).fetchall()
+            requeued = dead = 0
+            for row in expired:
+                status = 'queued' if row['attempts'] + 1 < row['max_attempts'] else 'dead'
+                conn.execute("UPDATE jobs SET status = ?, attempts = attempts + 1, error = ?, lease_owner = NULL, "
+                             "lease_expires = NULL, affinity = NULL, available_at = ?, updated_at = ? WHERE id = ?",
+                             (status, f"lease expired (worker {row['lease_owner']})", now, now, row['id']))
+                requeued, dead = (requeued + 1, dead) if status == 'queued' else (requeued, dead + 1)
+            conn.execute("COMMIT")
+            return requeued, dead
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return self._job(row) if row else None
+        finally:
+            conn.close()
+
+    def counts(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT stage, status, COUNT(*) AS n FROM jobs GROUP BY stage, status").fetchall()
+            return {(row['stage'], row['status']): row['n'] for row in rows}
+        finally:
+            conn.close()
+
+
+def load_credentials(path=ACCOUNTS_FILE):
+    """account -> password from a JSON file kept on the browser nodes (never in the queue)"""
+    credentials = {}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            credentials.update(json.load(f))
+    if USERNAME and PASSWORD:
+        credentials.setdefault(USERNAME, PASSWORD)
+    return credentials
+
+
+class _Heartbeat:
+    """Renews a job's lease in the background while its handler runs"""
+
+    def __init__(self, broker, job, worker_id, lease_seconds):
+        self.stop = threading.Event()
+        self.lost = False
+        self.thread = threading.Thread(target=self._run, args=(broker, job.id, worker_id, lease_seconds),
+                                       name=f"heartbeat-{job.id}", daemon=True)
+
+    def _run(self, broker, job_id, worker_id, lease_seconds):
+        while not self.stop.wait(lease_seconds / 3):
+            if not broker.heartbeat(job_id, worker_id, lease_seconds):
+                logger.warning(f"Lost lease on job {job_id}")
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+
+class StageWorker:
+    """
+    Leases jobs for the given stages and runs the matching SLCMScraper steps. Browser nodes run
+    login/extract, and keep each account's browser between the two so extract usually lands on the
+    same worker (affinity). The session never leaves that worker's memory: a worker that picks up
+    the extract job after the affinity grace logs in again. post_process needs no browser.
+    """
+
+    def __init__(self, broker, stages=STAGES, worker_id=None, lease_seconds=JOB_LEASE_SECONDS,
+                 credentials=None):
+        self.broker = broker
+        self.stages = tuple(stages)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.credentials = credentials if credentials is not None else load_credentials()
+        self.sessions = {}  # account -> SLCMScraper with a live, logged-in browser
+        self.parked = {}  # account -> when its logged-in browser started waiting for the extract job
+        self.portal = get_portal_scheduler()
+        self.retry = RetryPolicy(base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY)
+        self.change_detector = ChangeDetector(SnapshotStore(SNAPSHOT_DIR)) if CHANGE_DETECTION_ENABLED else None
+        self.result_store = None  # opened by the thread running post_process (sqlite3 connections are per thread)
+        self.handlers = {'login': self.run_login, 'extract': self.run_extract, 'post_process': self.run_post_process}
+
+    # Stages
+
+    def _slot(self, account):
+        """Portal session slot key: per worker, so releasing ours never frees another worker's browser"""
+        return f"{self.worker_id}/{account}"
+
+    def _new_scraper(self, account):
+        from scraper import SLCMScraper  # browser nodes only
+        if account not in self.credentials:
+            raise InvalidCredentialsError(f"No credentials for {account[:3]}*** on this node")
+        # The slot is held until close_session, across login and extract
+        self.portal.open_session(self._slot(account))
+        try:
+            # This worker's change detector and result store handle persistence in post_process
+            return SLCMScraper(username=account, password=self.credentials[account], interactive=False, persist=False)
+        except Exception:
+            self.portal.close_session(self._slot(account))
+            raise
+
+    def _login(self, account):
+        """Fresh browser logged in as account, kept in self.sessions until close_session"""
+        if credential_guard.is_blocked(account):
+            raise InvalidCredentialsError(f"Credentials for {account[:3]}*** were rejected earlier")
+        self.close_session(account)
+        scraper = self.sessions[account] = self._new_scraper(account)
+        scraper.open_portal_page(LOGIN_URL)
+        policy = RetryPolicy(max_attempts=LOGIN_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                             max_delay=RETRY_MAX_DELAY, budget_seconds=RETRY_BUDGET_SECONDS)
+        try:
+            policy.run(scraper.login, on_retry=scraper.recover_for_retry)
+        except InvalidCredentialsError as e:
+            credential_guard.mark_bad(account, str(e))
+            raise
+        return scraper
+
+    def run_login(self, job):
+        self._login(job.account)
+        return dict(job.payload), self.worker_id
+
+    def _resume_session(self, job):
+        self.parked.pop(job.account, None)
+        scraper = self.sessions.get(job.account)
+        if scraper and scraper.is_session_valid():
+            return scraper
+        # Logged in on another worker, or our browser died: session cookies are never shared
+        return self._login(job.account)
+
+    def run_extract(self, job):
+        scraper = self._resume_session(job)
+        try:
+            scraper.navigate_to_gradesheet()
+            page_source = scraper.gradesheet_source()
+            payload = dict(job.payload)
+
+            if self.change_detector and self.change_detector.is_unchanged(job.account, page_source):
+                payload.update(unchanged=True, cgpa=self.change_detector.previous_cgpa(job.account))
+                return payload, None
+
+            parsed = parse_gradesheet(page_source, student_id=job.account)
+            cgpa = scraper.extract_cgpa_from_gradesheet_tab(parsed=parsed)
+            if not cgpa:
+                raise CGPAExtractionError("Failed to extract CGPA from grade sheet tab")
+            payload.update(unchanged=False, cgpa=cgpa, page_source=page_source,
+                           verdict=asdict(scraper.cgpa_verdict) if scraper.cgpa_verdict else None)
+            return payload, None
+        finally:
+            self.close_session(job.account)
+
+    def run_post_process(self, job):
+        payload = dict(job.payload)
+        if payload.get('unchanged'):
+            payload['changes'] = []
+            return payload, None
+
+        page_source = payload.pop('page_source', '')
+        result = parse_gradesheet(page_source, student_id=job.account)
+        result.cgpa = payload['cgpa']
+        changes = self.change_detector.record(job.account, page_source, result) if self.change_detector else []
+        if RESULT_STORE_ENABLED:
+            if self.result_store is None:
+                self.result_store = ResultStore(RESULT_DB_PATH)
+            self.result_store.write(result)
+        payload['changes'] = ChangeDetector.changes_as_dicts(changes) if changes else []
+        return payload, None
+
+    # Loop
+
+    def run_once(self):
+        """Lease and process one job; False when nothing was available"""
+        job = self.broker.lease(self.stages, self.worker_id, self.lease_seconds)
+        if job is None:
+            return False
+
+        logger.info(f"Worker {self.worker_id} running {job.stage} for job {job.id} ({job.account[:3]}***)")
+        with _Heartbeat(self.broker, job, self.worker_id, self.lease_seconds) as heartbeat:
+            try:
+                with profile_run(f"job{job.id}-{job.stage}"):
+                    payload, affinity = self.handlers[job.stage](job)
+            except Exception as e:
+                kind = classify_failure(e)
+                retryable = kind in RETRYABLE_FAILURES
+                logger.warning(f"Job {job.id} {job.stage} failed ({kind.value}, "
+                               f"{'will retry' if retryable else 'giving up'}): {e}")
+                self.close_session(job.account)
+                self.broker.fail(job.id, self.worker_id, e, retryable, self.retry.delay_for(job.attempts + 1))
+                return True
+
+        if heartbeat.lost or not self.broker.advance(job.id, self.worker_id, payload, affinity):
+            logger.warning(f"Job {job.id} was recovered by another worker; discarding this result")
+            self.close_session(job.account)
+        elif affinity:
+            self.parked[job.account] = time.time()
+        return True
+
+    def close_stale_sessions(self):
+        """
+        Close browsers parked longer than the affinity grace: after it any worker may take the
+        extract job (logging in again), so keeping ours would only hold a portal slot.
+        """
+        cutoff = time.time() - JOB_AFFINITY_GRACE
+        for account, parked_at in list(self.parked.items()):
+            if parked_at < cutoff:
+                logger.info(f"Closing idle session for {account[:3]}*** (extract job not picked up here)")
+                self.close_session(account)
+
+    def run(self, max_jobs=None, exit_when_idle=False, stop_event=None):
+        processed = 0
+        try:
+            while not (stop_event and stop_event.is_set()):
+                self.broker.recover_expired()
+                self.close_stale_sessions()
+                if self.run_once():
+                    processed += 1
+                    if max_jobs and processed >= max_jobs:
+                        break
+                elif exit_when_idle:
+                    break
+                else:
+                    time.sleep(JOB_POLL_INTERVAL)
+        finally:
+            for account in list(self.sessions):
+                self.close_session(account)
+            if self.result_store:
+                self.result_store.close()
+                self.result_store = None
+        return processed
+
+    def close_session(self, account):
+        scraper = self.sessions.pop(account, None)
+        self.parked.pop(account, None)
+        self.portal.close_session(self._slot(account))
+        if scraper:
+            try:
+                if scraper.captcha_prefetcher:
+                    scraper.captcha_prefetcher.shutdown()
+                scraper.close_browser()
+            except Exception as e:
+                logger.warning(f"Closing browser for {account[:3]}*** failed: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Staged SLCM scrape queue")
+    parser.add_argument('--db', default=JOB_DB_PATH, help="SQLite queue file shared by all nodes")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="queue accounts for scraping")
+    enqueue.add_argument('accounts', nargs='*', help="account ids (default: every account in the accounts file)")
+
+    work = commands.add_parser('work', help="process jobs")
+    work.add_argument('--stages', default=','.join(STAGES),
+                      help="comma-separated stages this node handles, e.g. login,extract or post_process")
+    work.add_argument('--max-jobs', type=int, default=None)
+    work.add_argument('--exit-when-idle', action='store_true')
+    work.add_argument('--workers', type=int, default=1,
+                      help="worker threads in this process; they share one portal rate limiter")
+
+    commands.add_parser('status', help="job counts per stage and status")
+    commands.add_parser('recover', help="requeue jobs whose lease expired")
+
+    args = parser.parse_args(argv)
+    broker = SQLiteBroker(args.db)
+
+    if args.command == 'enqueue':
+        accounts = args.accounts or sorted(load_credentials())
+        for account in accounts:
+            print(f"Queued job {broker.enqueue(account)} for {account[:3]}***")
+    elif args.command == 'work':
+        stages = [s for s in args.stages.split(',') if s]
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+        workers = [StageWorker(broker, stages) for _ in range(max(1, args.workers))]
+        with ThreadPoolExecutor(max_workers=len(workers), thread_name_prefix='job-worker') as pool:
+            runs = [pool.submit(w.run, max_jobs=args.max_jobs, exit_when_idle=args.exit_when_idle) for w in workers]
+            for worker, run in zip(workers, runs):
+                print(f"Worker {worker.worker_id} processed {run.result()} jobs")
+        print(f"Portal: {get_portal_scheduler().stats()}")
+    elif args.command == 'status':
+        for (stage, status), count in sorted(broker.counts().items()):
+            print(f"{stage:<13} {status:<7} {count}")
+    elif args.command == 'recover':
+        requeued, dead = broker.recover_expired()
+        print(f"Requeued {requeued} jobs, marked {dead} dead")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+# ocr_backend.py
+# In-process Tesseract engines (one per worker thread) with pytesseract as the fallback
+import os
+import re
+import shlex
+import ctypes
+import ctypes.util
+import logging
+import threading
+import numpy as np
+import pytesseract
+from PIL import Image
+from config import TESSERACT_PATH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OEM = 3
+DEFAULT_PSM = 3
+DEFAULT_LANG = 'eng'
+
+
+def parse_config(config):
+    """Split a pytesseract-style config string into (oem, psm, lang, variables)"""
+    oem, psm, lang, variables = DEFAULT_OEM, DEFAULT_PSM, DEFAULT_LANG, {}
+    tokens = shlex.split(config or '')
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = tokens[i + 1] if i + 1 < len(tokens) else ''
+        if token == '--oem':
+            oem = int(value)
+        elif token == '--psm':
+            psm = int(value)
+        elif token == '-l':
+            lang = value
+        elif token == '-c' and '=' in value:
+            key, _, val = value.partition('=')
+            variables[key] = val
+        else:
+            i += 1
+            continue
+        i += 2
+    return oem, psm, lang, variables
+
+
+def _as_gray_array(image):
+    """PIL image or ndarray -> contiguous 8-bit grayscale ndarray"""
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert('L'))
+    elif image.ndim == 3:
+        image = np.asarray(Image.fromarray(image).convert('L'))
+    return np.ascontiguousarray(image, dtype=np.uint8)
+
+
+def _tessdata_dir():
+    if os.getenv('TESSDATA_PREFIX'):
+        return os.getenv('TESSDATA_PREFIX')
+    if TESSERACT_PATH:
+        candidate = os.path.join(os.path.dirname(TESSERACT_PATH), 'tessdata')
+        if os.path.isdir(candidate):
+            return candidate
+    return None
+
+
+def _find_libtesseract():
+    names = [ctypes.util.find_library('tesseract')]
+    if TESSERACT_PATH:
+        install_dir = os.path.dirname(TESSERACT_PATH)
+        if os.path.isdir(install_dir):
+            names += [os.path.join(install_dir, f) for f in os.listdir(install_dir)
+                      if re.match(r'libtesseract.*\.(dll|so|dylib)', f)]
+    names += ['libtesseract.so.5', 'libtesseract.so.4', 'libtesseract.dylib']
+    for name in names:
+        if not name:
+            continue
+        try:
+            return ctypes.CDLL(name)
+        except OSError:
+            continue
+    return None
+
+
+class _CApiEngine:
+    """Thin ctypes wrapper over the Tesseract C API (capi.h)"""
+    _lib = None
+    _lib_lock = threading.Lock()
+
+    @classmethod
+    def library(cls):
+        with cls._lib_lock:
+            if cls._lib is None:
+                lib = _find_libtesseract()
+                if lib is None:
+                    raise OSError("libtesseract not found")
+                lib.TessBaseAPICreate.restype = ctypes.c_void_p
+                lib.TessBaseAPIInit2.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+                lib.TessBaseAPISetVariable.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+                lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+                lib.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int,
+                                                    ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+                lib.TessBaseAPIGetUTF8Text.restype = ctypes.POINTER(ctypes.c_char)
+                lib.TessDeleteText.argtypes = [ctypes.POINTER(ctypes.c_char)]
+                lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+                lib.TessBaseAPIEnd.argtypes = [ctypes.c_void_p]
+                lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+                cls._lib = lib
+            return cls._lib
+
+    def __init__(self, oem, lang):
+        self.lib = self.library()
+        self.handle = self.lib.TessBaseAPICreate()
+        datapath = _tessdata_dir()
+        if self.lib.TessBaseAPIInit2(self.handle, datapath.encode() if datapath else None,
+                                     lang.encode(), oem) != 0:
+            self.lib.TessBaseAPIDelete(self.handle)
+            raise OSError(f"Tesseract init failed (lang={lang}, oem={oem})")
+        self.variables = {}
+
+    def recognize(self, gray, psm, variables):
+        # Reset variables set by a previous call so whitelists do not leak between configs
+        for key in set(self.variables) - set(variables):
+            self.lib.TessBaseAPISetVariable(self.handle, key.encode(), b'')
+        for key, value in variables.items():
+            self.lib.TessBaseAPISetVariable(self.handle, key.encode(), value.encode())
+        self.variables = dict(variables)
+
+        self.lib.TessBaseAPISetPageSegMode(self.handle, psm)
+        height, width = gray.shape
+        self.lib.TessBaseAPISetImage(self.handle, gray.ctypes.data, width, height, 1, gray.strides[0])
+        text_ptr = self.lib.TessBaseAPIGetUTF8Text(self.handle)
+        try:
+            return ctypes.string_at(text_ptr).decode('utf-8', errors='replace') if text_ptr else ''
+        finally:
+            if text_ptr:
+                self.lib.TessDeleteText(text_ptr)
+            self.lib.TessBaseAPIClear(self.handle)
+
+    def close(self):
+        self.lib.TessBaseAPIEnd(self.handle)
+        self.lib.TessBaseAPIDelete(self.handle)
+
+
+class _TesserocrEngine:
+    """Engine backed by the tesserocr binding, when it is installed"""
+
+    def __init__(self, oem, lang):
+        import tesserocr
+        datapath = _tessdata_dir()
+        kwargs = {'path': datapath} if datapath else {}
+        self.api = tesserocr.PyTessBaseAPI(lang=lang, oem=tesserocr.OEM(oem), **kwargs)
+        self.variables = {}
+
+    def recognize(self, gray, psm, variables):
+        for key in set(self.variables) - set(variables):
+            self.api.SetVariable(key, '')
+        for key, value in variables.items():
+            self.api.SetVariable(key, value)
+        self.variables = dict(variables)
+
+        self.api.SetPageSegMode(psm)
+        self.api.SetImage(Image.fromarray(gray))
+        try:
+            return self.api.GetUTF8Text()
+        finally:
+            self.api.Clear()
+
+    def close(self):
+        self.api.End()
+
+
+_local = threading.local()
+_unavailable = set()  # engine classes that failed to load in this process
+
+
+def _engine(oem, lang):
+    """Per-thread engine for (oem, lang), or None if no in-process binding is available"""
+    engines = getattr(_local, 'engines', None)
+    if engines is None:
+        engines = _local.engines = {}
+    key = (oem, lang)
+    if key in engines:
+        return engines[key]
+
+    engine = None
+    for engine_cls in (_TesserocrEngine, _CApiEngine):
+        if engine_cls in _unavailable:
+            continue
+        try:
+            engine = engine_cls(oem, lang)
+            logger.info(f"OCR backend: {engine_cls.__name__} (oem={oem}, lang={lang})")
+            break
+        except ImportError:
+            _unavailable.add(engine_cls)
+        except (OSError, RuntimeError) as e:
+            logger.info(f"{engine_cls.__name__} unavailable: {e}")
+            if 'not found' in str(e):
+                _unavailable.add(engine_cls)
+    engines[key] = engine
+    return engine
+
+
+def image_to_string(image, config=''):
+    """
+    Drop-in replacement for pytesseract.image_to_string.
+    Uses a persistent in-process engine for the calling thread; falls back to pytesseract.
+    """
+    oem, psm, lang, variables = parse_config(config)
+    engine = _engine(oem, lang)
+    if engine is not None:
+        try:
+            return engine.recognize(_as_gray_array(image), psm, variables)
+        except Exception as e:
+            logger.warning(f"In-process OCR failed ({e}), falling back to pytesseract")
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    return pytesseract.image_to_string(image, config=config)
+
+
+def close_thread_engines():
+    """Release the engines owned by the calling thread"""
+    for engine in getattr(_local, 'engines', {}).values():
+        if engine is not None:
+            engine.close()
+    _local.engines = {}
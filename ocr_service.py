@@ -0,0 +1,169 @@
+# ocr_service.py
+# Shared process-pool OCR service: images travel through shared memory, results come back as futures
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+import pytesseract
+import ocr_backend
+from config import OCR_WORKERS, TESSERACT_PATH
+from exceptions import ModelUnavailableError
+
+logger = logging.getLogger(__name__)
+
+CAPTCHA_CLAHE_LIMITS = [2.0, 3.0, 4.0, 5.0]
+CAPTCHA_OCR_CONFIGS = [
+    r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789',
+    r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789',
+    r'--oem 1 --psm 8 -c tessedit_char_whitelist=0123456789',
+    r'--psm 13 --oem 3 -c tessedit_char_whitelist=0123456789'
+]
+
+
+def run_captcha_strategy(image, clip_limit, configs=CAPTCHA_OCR_CONFIGS):
+    """
+    CLAHE + Otsu binarization at one clip limit, then every OCR config on the result.
+    Returns [(config_idx, digits)] for readings with at least 3 digits. A missing Tesseract raises
+    ModelUnavailableError rather than reading as "no digits".
+    """
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(4, 4))
+    _, thresh = cv2.threshold(clahe.apply(image), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    hits = []
+    for config_idx, config in enumerate(configs):
+        try:
+            text = ocr_backend.image_to_string(thresh, config=config).strip()
+        except pytesseract.TesseractNotFoundError as e:
+            # Every config would fail the same way; not picklable, so it cannot cross the pool as is
+            raise ModelUnavailableError(f"Tesseract not found: {e}") from None
+        except Exception as e:
+            logger.debug(f"OCR config {config_idx} failed: {e}")
+            continue
+        digits = ''.join(c for c in text if c.isdigit())
+        if len(digits) >= 3:
+            hits.append((config_idx, digits))
+    return hits
+
+
+def _attach(spec):
+    """Copy an array out of a shared memory block described by (name, shape, dtype)"""
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+    finally:
+        block.close()
+
+
+def _captcha_job(spec, clip_limit, configs):
+    return run_captcha_strategy(_attach(spec), clip_limit, configs)
+
+
+def _text_job(spec, config):
+    try:
+        return ocr_backend.image_to_string(_attach(spec), config=config)
+    except Exception as e:
+        # Some pytesseract errors cannot be unpickled and would break the whole pool
+        raise ModelUnavailableError(f"OCR failed: {e}") from None
+
+
+def _init_worker(tesseract_cmd):
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _mp_context():
+    """forkserver where available, else spawn: a forked worker would inherit the scraper's threads and locks"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class OCRService:
+    """
+    Process pool for CPU-bound OpenCV preprocessing and Tesseract recognition.
+    Any scraper (or thread) in the process can submit jobs; each worker keeps its own
+    in-process Tesseract engines between jobs.
+    """
+
+    def __init__(self, workers, tesseract_cmd=None):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context(),
+                                            initializer=_init_worker, initargs=(tesseract_cmd,))
+        logger.info(f"OCR service started with {workers} worker processes")
+
+    @staticmethod
+    def _share(image):
+        """Place an array in a new shared memory block; returns (block, spec for _attach)"""
+        image = np.ascontiguousarray(image)
+        block = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+        np.ndarray(image.shape, dtype=image.dtype, buffer=block.buf)[...] = image
+        return block, (block.name, image.shape, image.dtype.str)
+
+    def _submit(self, fn, image, calls):
+        """
+        fn(spec, *args) for each args in calls, all reading one shared copy of image. The block is
+        unlinked once the last of them finishes (or is cancelled).
+        """
+        block, spec = self._share(image)
+        remaining = [len(calls)]
+        lock = threading.Lock()
+
+        def release(count=1):
+            with lock:
+                remaining[0] -= count
+                if remaining[0]:
+                    return
+            block.close()
+            block.unlink()
+
+        futures = []
+        try:
+            for args in calls:
+                future = self.executor.submit(fn, spec, *args)
+                future.add_done_callback(lambda _: release())
+                futures.append(future)
+        except Exception:
+            release(len(calls) - len(futures))  # the calls that never reached the pool
+            raise
+        return futures
+
+    def submit_captcha(self, gray_image, clip_limits=CAPTCHA_CLAHE_LIMITS, configs=CAPTCHA_OCR_CONFIGS):
+        """One future per CLAHE strategy, each resolving to [(config_idx, digits)]"""
+        clip_limits = list(clip_limits)
+        futures = self._submit(_captcha_job, gray_image, [(clip_limit, configs) for clip_limit in clip_limits])
+        return dict(zip(clip_limits, futures))
+
+    def submit_text(self, image, config=r'--oem 3 --psm 6'):
+        """Future resolving to the OCR text of a (grade sheet) image"""
+        return self._submit(_text_job, np.asarray(image), [(config,)])[0]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_ocr_service():
+    """The process-wide OCR service, or None when OCR_WORKERS is 0 (in-thread OCR)"""
+    global _service
+    if OCR_WORKERS <= 0:
+        return None
+    with _service_lock:
+        if _service is None:
+            _service = OCRService(OCR_WORKERS, TESSERACT_PATH)
+            atexit.register(shutdown_ocr_service)
+        return _service
+
+
+def shutdown_ocr_service():
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
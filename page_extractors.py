@@ -0,0 +1,258 @@
+# page_extractors.py
+# Registry of SLCM page handlers (grade sheet, attendance, timetable, marks, fees) and a
+# single-login pass that opens several pages in tabs of the same session and parses each
+import time
+import json
+import logging
+from dataclasses import dataclass, fields, asdict, MISSING
+from functools import partial
+from typing import Callable, Optional, Tuple
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+from config import PAGE_LOAD_TIMEOUT
+from cdp_navigation import CDPNavigator, GRADE_TABLE_READY_JS
+from data_models import AttendanceRecord, TimetableEntry, MarksRecord, FeeRecord
+from gradesheet_parser import parse_gradesheet
+from tab_manager import TabManager
+
+logger = logging.getLogger(__name__)
+
+ACADEMICS_MENU = (By.ID, "rtpchkMenu_lnkbtn2_1")
+
+# A data page is ready once a table whose header names every required column has a data row.
+# Matching on the header, as parse_table_rows does, skips the portal's layout tables.
+_DATA_TABLE_READY_JS = """
+var groups = %s;
+var tables = document.getElementsByTagName('table');
+for (var i = 0; i < tables.length; i++) {
+    var rows = tables[i].rows;
+    if (rows.length < 2 || rows[1].cells.length === 0) { continue; }
+    var header = rows[0].innerText.toLowerCase();
+    if (groups.every(function (keywords) {
+        return keywords.some(function (k) { return header.indexOf(k) >= 0; });
+    })) { return true; }
+}
+return false;
+"""
+
+
+@dataclass
+class PageExtractor:
+    name: str
+    menu: Tuple[Tuple[str, str], ...]  # clicks from the student homepage; the last one opens the page
+    url_fragment: str  # lower-case part of the page URL, used to recognise it
+    parse: Callable[[str], object]  # page source -> structured data
+    ready_js: str  # true once the page's data is on screen
+
+
+@dataclass
+class PageResult:
+    name: str
+    data: object = None
+    url: str = ''
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+PAGE_EXTRACTORS = {}
+
+
+def register_page(extractor):
+    PAGE_EXTRACTORS[extractor.name] = extractor
+    return extractor
+
+
+def _convert(value, kind):
+    text = value.replace('%', '').replace(',', '').strip()
+    if kind is int:
+        return int(float(text))
+    if kind is float:
+        return float(text)
+    return value
+
+
+def _resolve_columns(headers, columns):
+    """field -> column index. Fields claim columns in `columns` order, each keyword tried in turn"""
+    resolved, used = {}, set()
+    for name, keywords in columns.items():
+        for keyword in keywords:
+            index = next((i for i, h in enumerate(headers) if i not in used and keyword in h), None)
+            if index is not None:
+                resolved[name] = index
+                used.add(index)
+                break
+    return resolved
+
+
+def parse_table_rows(page_source, model, columns):
+    """
+    Rows of every table whose header names all required fields of `model`, as model instances.
+    columns maps field -> lower-case header keywords; numbers are converted by the field's type
+    and rows that do not convert are skipped.
+    """
+    soup = BeautifulSoup(page_source or '', 'html.parser')
+    model_fields = {f.name: f for f in fields(model)}
+    required = {name for name, f in model_fields.items() if f.default is MISSING}
+    records = []
+
+    for table in soup.find_all('table'):
+        rows = [tr for tr in table.find_all('tr') if tr.find_parent('table') is table]
+        if len(rows) < 2:
+            continue
+        headers = [cell.get_text(' ', strip=True).lower() for cell in rows[0].find_all(['th', 'td'])]
+        resolved = _resolve_columns(headers, columns)
+        if not required <= resolved.keys():
+            continue
+
+        for row in rows[1:]:
+            cells = [cell.get_text(' ', strip=True) for cell in row.find_all(['th', 'td'])]
+            if len(cells) <= max(resolved.values()):
+                continue
+            try:
+                values = {name: _convert(cells[index], model_fields[name].type) for name, index in resolved.items()}
+            except ValueError:
+                continue
+            records.append(model(**values))
+    return records
+
+
+def data_table_ready_js(model, columns):
+    """ready_js for pages parsed by parse_table_rows with the same model and columns"""
+    required = [f.name for f in fields(model) if f.default is MISSING]
+    return _DATA_TABLE_READY_JS % json.dumps([list(columns[name]) for name in required])
+
+
+def table_page(name, menu, url_fragment, model, columns):
+    return PageExtractor(name, menu, url_fragment, partial(parse_table_rows, model=model, columns=columns),
+                         data_table_ready_js(model, columns))
+
+
+register_page(PageExtractor(
+    'gradesheet',
+    (ACADEMICS_MENU, (By.PARTIAL_LINK_TEXT, "Grade Sheet/Mark Sheet")),
+    'gradesheet.aspx',
+    parse_gradesheet,
+    GRADE_TABLE_READY_JS,
+))
+register_page(table_page(
+    'attendance',
+    (ACADEMICS_MENU, (By.PARTIAL_LINK_TEXT, "Attendance")),
+    'attendance',
+    AttendanceRecord, {
+        'subject_code': ('subject code', 'course code', 'code'),
+        'subject_name': ('subject name', 'course name', 'subject', 'course'),
+        'classes_attended': ('attended', 'present'),
+        'classes_held': ('held', 'conducted', 'total'),
+        'percentage': ('%', 'percent'),
+    },
+))
+register_page(table_page(
+    'timetable',
+    ((By.PARTIAL_LINK_TEXT, "Time Table"),),
+    'timetable',
+    TimetableEntry, {
+        'day': ('day', 'date'),
+        'time': ('time', 'slot', 'period'),
+        'subject': ('subject', 'course'),
+        'venue': ('room', 'venue'),
+    },
+))
+register_page(table_page(
+    'marks',
+    (ACADEMICS_MENU, (By.PARTIAL_LINK_TEXT, "Internal Marks")),
+    'marks',
+    MarksRecord, {
+        'subject_code': ('subject code', 'course code', 'subject', 'course'),
+        'component': ('component', 'assessment', 'exam', 'test'),
+        'max_marks': ('max', 'out of'),
+        'marks': ('obtained', 'marks', 'score'),
+    },
+))
+register_page(table_page(
+    'fees',
+    ((By.PARTIAL_LINK_TEXT, "Fee"),),
+    'fee',
+    FeeRecord, {
+        'paid': ('paid',),
+        'due': ('due', 'balance', 'outstanding'),
+        'description': ('description', 'fee head', 'particular', 'head'),
+        'amount': ('amount', 'fee'),
+    },
+))
+
+
+def _parse(scraper, extractor, seconds):
+    """PageResult for the page the driver is switched to"""
+    driver = scraper.driver
+    try:
+        scraper.portal.record_response(seconds)
+        page_source = driver.page_source
+        # The grade sheet is recorded by scraper.gradesheet_source, as the source extraction used
+        if scraper.recorder and extractor.name != 'gradesheet':
+            scraper.recorder.page(extractor.name, page_source, driver.current_url)
+        data = extractor.parse(page_source)
+        return PageResult(extractor.name, data, driver.current_url, round(seconds, 2))
+    except Exception as e:
+        logger.warning(f"Extracting {extractor.name} failed: {e}")
+        return PageResult(extractor.name, url=driver.current_url, seconds=round(seconds, 2), error=str(e))
+
+
+def collect_pages(scraper, names=None, keep_open=()):
+    """
+    One pass over several pages in the scraper's logged-in session, starting from the homepage.
+    Every page is opened in its own tab before any is waited on, and each is parsed as soon as it
+    is ready, so the pass takes about as long as the slowest page. Pages that replace the home tab
+    instead of opening a tab are handled on the spot. Tabs named in keep_open stay open in
+    scraper.tabs. Returns name -> PageResult in the order asked for.
+    """
+    names = list(names or PAGE_EXTRACTORS)
+    unknown = [name for name in names if name not in PAGE_EXTRACTORS]
+    if unknown:
+        raise ValueError(f"Unknown pages: {', '.join(unknown)} (known: {', '.join(PAGE_EXTRACTORS)})")
+
+    driver = scraper.driver
+    home_url = driver.current_url
+    navigator = CDPNavigator(driver)
+    navigator.reset()
+    tabs = scraper.tabs = TabManager(driver, navigator)
+    results = {}
+
+    for name in names:
+        extractor = PAGE_EXTRACTORS[name]
+        started = time.monotonic()
+        try:
+            windows_before = driver.window_handles
+            scraper.portal.pace()
+            scraper.menu_link(extractor.menu).click()
+            target_id, new_tab = scraper.find_page_target(navigator, windows_before, extractor.url_fragment)
+        except Exception as e:
+            logger.warning(f"Opening {name} failed: {e}")
+            results[name] = PageResult(name, error=str(e))
+            continue
+        if new_tab:
+            tabs.add(name, target_id, extractor.ready_js, started)
+        else:
+            scraper.wait_for_page(navigator, target_id, extractor.ready_js)
+            results[name] = _parse(scraper, extractor, time.monotonic() - started)
+            scraper.open_portal_page(home_url)
+
+    for tab in tabs.as_ready(timeout=PAGE_LOAD_TIMEOUT):
+        print(f"Page {tab.name} ready ({tab.reason or 'timeout'}) after {tab.seconds:.2f}s")
+        results[tab.name] = _parse(scraper, PAGE_EXTRACTORS[tab.name], tab.seconds)
+    tabs.close_all(keep=keep_open)
+    tabs.switch_home()
+
+    for name in names:
+        result = results[name]
+        status = f"error: {result.error}" if result.error else f"{_count(result.data)} in {result.seconds:.2f}s"
+        print(f"  {name:<11} {status}")
+    return {name: results[name] for name in names}
+
+
+def _count(data):
+    return f"{len(data)} rows" if isinstance(data, list) else "parsed"
+
+
+def pages_as_dicts(results):
+    """JSON-friendly form of collect_pages output"""
+    return {name: asdict(result) for name, result in results.items()}
@@ -0,0 +1,335 @@
+# profiling.py
+# Opt-in profiling (PROFILE_MODE): cProfile per stage and/or a low-overhead stack sampler tagged by
+# stage, written per run as pstats, folded stacks (flamegraph.pl / speedscope) and a JSON summary
+import os
+import sys
+import json
+import time
+import uuid
+import cProfile
+import pstats
+import logging
+import argparse
+import functools
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from config import PROFILE_MODE, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL_MS
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('off', 'cprofile', 'sample', 'both')
+
+# Where a sample's time goes, decided by the innermost frame that matches (C extensions such as
+# OpenCV have no frames of their own, so their time shows up under the calling stage)
+CATEGORY_MARKERS = [
+    ('webdriver', ('/selenium/', '\\selenium\\', 'urllib3')),
+    ('ollama', ('/ollama/', '\\ollama\\', 'httpx', 'vision_batcher.py', 'vision_backend.py')),
+    ('ocr', ('pytesseract', 'ocr_backend.py', 'ocr_service.py')),
+    ('image', ('/PIL/', '\\PIL\\', '/cv2/', '\\cv2\\', '/numpy/', '\\numpy\\', 'variant_store.py')),
+]
+WAIT_FILES = ('threading.py', 'queue.py', 'selectors.py', '_base.py')
+
+
+def _category(frames):
+    """frames: innermost first, as (filename, function)"""
+    for filename, _ in frames:
+        for category, markers in CATEGORY_MARKERS:
+            if any(marker in filename for marker in markers):
+                return category
+    if frames and frames[0][0].endswith(WAIT_FILES):
+        return 'wait'
+    return 'python'
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval from a background thread"""
+
+    def __init__(self, interval, stage_path):
+        self.interval = interval
+        self.stage_path = stage_path  # thread ident -> tuple of stage names
+        self.stacks = Counter()
+        self.categories = defaultdict(Counter)  # stage -> category -> samples
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append((frame.f_code.co_filename, frame.f_code.co_name))
+                    frame = frame.f_back
+                stages = self.stage_path(ident) or (f"thread:{names.get(ident, ident)}",)
+                folded = ';'.join(stages + tuple(f"{os.path.basename(f)}:{fn}" for f, fn in reversed(frames)))
+                self.stacks[folded] += 1
+                self.categories[stages[-1]][_category(frames)] += 1
+                self.samples += 1
+
+
+class RunProfiler:
+    """One profiled run: per-stage wall time plus cProfile stats and/or stack samples"""
+
+    def __init__(self, run_id, mode=PROFILE_MODE, directory=PROFILE_DIR,
+                 interval=PROFILE_SAMPLE_INTERVAL_MS / 1000.0):
+        self.run_id = run_id
+        self.mode = mode
+        self.directory = os.path.join(directory, run_id)
+        self.owner = threading.get_ident()
+        self.lock = threading.Lock()
+        self.stage_stacks = {}  # thread ident -> [stage, ...]
+        self.stage_times = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+        self.profiles = {}  # stage -> cProfile.Profile (run thread only)
+        self.active_profile = None
+        self.sampler = StackSampler(interval, self._stage_path) if mode in ('sample', 'both') else None
+        self.started = time.perf_counter()
+
+    def _stage_path(self, ident):
+        with self.lock:
+            return tuple(self.stage_stacks.get(ident, ()))
+
+    def _switch_profile(self, stage):
+        """
+        Move cProfile collection to `stage`. From Python 3.12 cProfile sees every thread, so calls
+        made by other threads are counted in whichever stage the run thread is in.
+        """
+        if self.active_profile is not None:
+            self.active_profile.disable()
+            self.active_profile = None
+        if stage is None:
+            return
+        profile = self.profiles.setdefault(stage, cProfile.Profile())
+        try:
+            profile.enable()
+            self.active_profile = profile
+        except ValueError as e:  # another profiler is active (e.g. a debugger)
+            logger.debug(f"cProfile not enabled for {stage}: {e}")
+
+    def start(self):
+        if self.sampler:
+            self.sampler.start()
+        self.enter('run')
+
+    @contextmanager
+    def stage(self, name):
+        self.enter(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.exit(name, time.perf_counter() - started)
+
+    def enter(self, name):
+        ident = threading.get_ident()
+        with self.lock:
+            self.stage_stacks.setdefault(ident, []).append(name)
+        if self.mode in ('cprofile', 'both') and ident == self.owner:
+            self._switch_profile(name)
+
+    def exit(self, name, seconds):
+        ident = threading.get_ident()
+        with self.lock:
+            stack = self.stage_stacks.get(ident, [])
+            if stack and stack[-1] == name:
+                stack.pop()
+            times = self.stage_times[name]
+            times['calls'] += 1
+            times['seconds'] += seconds
+            outer = stack[-1] if stack else None
+        if self.mode in ('cprofile', 'both') and ident == self.owner:
+            self._switch_profile(outer)
+
+    def finish(self):
+        """Stop collecting and write the run's files; returns the run directory"""
+        self.exit('run', time.perf_counter() - self.started)
+        self._switch_profile(None)
+        if self.sampler:
+            self.sampler.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        summary = {'run_id': self.run_id, 'mode': self.mode, 'stages': dict(self.stage_times)}
+
+        if self.profiles:
+            for stage, profile in self.profiles.items():
+                profile.dump_stats(os.path.join(self.directory, f"{stage}.pstats"))
+            combined = pstats.Stats(*self.profiles.values())
+            combined.dump_stats(os.path.join(self.directory, 'run.pstats'))
+
+        if self.sampler:
+            write_folded(os.path.join(self.directory, 'stacks.folded'), self.sampler.stacks)
+            summary['samples'] = self.sampler.samples
+            summary['sample_interval_ms'] = round(self.sampler.interval * 1000, 2)
+            summary['categories'] = {stage: dict(counts) for stage, counts in self.sampler.categories.items()}
+
+        with open(os.path.join(self.directory, 'summary.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Profile written to {self.directory}")
+        return self.directory
+
+
+_active = None
+_active_lock = threading.Lock()
+
+
+@contextmanager
+def profile_run(name):
+    """Profile the enclosed block as one run when PROFILE_MODE is on (one run at a time per process)"""
+    global _active
+    if PROFILE_MODE not in PROFILE_MODES or PROFILE_MODE == 'off':
+        if PROFILE_MODE not in PROFILE_MODES:
+            logger.warning(f"Unknown PROFILE_MODE '{PROFILE_MODE}' (expected one of {', '.join(PROFILE_MODES)})")
+        yield None
+        return
+    with _active_lock:
+        if _active is not None:
+            profiler = None
+        else:
+            # The random suffix keeps runs started within the same second apart
+            run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:6]}-{name}"
+            profiler = _active = RunProfiler(run_id, mode=PROFILE_MODE)
+    if profiler is None:
+        yield None  # another run is being profiled; its sampler still tags this thread's stages
+        return
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        with _active_lock:
+            _active = None
+        try:
+            directory = profiler.finish()
+            print(f"[PROFILE] {directory}")
+        except Exception as e:
+            logger.warning(f"Could not write profile: {e}")
+
+
+def profiled_run(name):
+    """Decorator form of profile_run"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_run(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def profile_stage(name):
+    """Tag the decorated call as a stage of the active run; a no-op when nothing is profiled"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def write_folded(path, stacks):
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+
+def read_folded(path):
+    stacks = Counter()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+def merge_runs(directories, output):
+    """Merge the runs' pstats, folded stacks and summaries into output.{pstats,folded,json}"""
+    stats_files, stacks = [], Counter()
+    stages = defaultdict(lambda: {'calls': 0, 'seconds': 0.0})
+    categories = defaultdict(Counter)
+    runs = 0
+    for directory in directories:
+        if os.path.exists(os.path.join(directory, 'run.pstats')):
+            stats_files.append(os.path.join(directory, 'run.pstats'))
+        if os.path.exists(os.path.join(directory, 'stacks.folded')):
+            stacks.update(read_folded(os.path.join(directory, 'stacks.folded')))
+        summary_path = os.path.join(directory, 'summary.json')
+        if not os.path.exists(summary_path):
+            continue
+        runs += 1
+        with open(summary_path, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        for stage, times in summary.get('stages', {}).items():
+            stages[stage]['calls'] += times['calls']
+            stages[stage]['seconds'] += times['seconds']
+        for stage, counts in summary.get('categories', {}).items():
+            categories[stage].update(counts)
+
+    if stats_files:
+        pstats.Stats(*stats_files).dump_stats(f"{output}.pstats")
+    if stacks:
+        write_folded(f"{output}.folded", stacks)
+    merged = {'runs': runs, 'stages': dict(stages), 'categories': {s: dict(c) for s, c in categories.items()}}
+    with open(f"{output}.json", 'w', encoding='utf-8') as f:
+        json.dump(merged, f, indent=2)
+    return merged
+
+
+def print_summary(summary):
+    print(f"{'stage':<20} {'calls':>6} {'seconds':>9}   where the samples went")
+    categories = summary.get('categories', {})
+    stages = dict(summary['stages'])
+    for stage in categories:
+        stages.setdefault(stage, {'calls': 0, 'seconds': 0.0})  # untagged threads, e.g. thread:vision-batcher-llava
+    for stage, times in sorted(stages.items(), key=lambda item: -item[1]['seconds']):
+        counts = categories.get(stage, {})
+        total = sum(counts.values())
+        split = ', '.join(f"{c} {n / total:.0%}" for c, n in sorted(counts.items(), key=lambda i: -i[1])) if total else ''
+        print(f"{stage:<20} {times['calls']:>6} {times['seconds']:>9.2f}   {split}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge and summarise profiles written with PROFILE_MODE")
+    commands = parser.add_subparsers(dest='command', required=True)
+    merge = commands.add_parser('merge', help="merge every run under a directory (or the given run directories)")
+    merge.add_argument('runs', nargs='*', default=[PROFILE_DIR])
+    merge.add_argument('-o', '--output', default=os.path.join(PROFILE_DIR, 'batch'),
+                       help="output path prefix for .pstats, .folded and .json")
+    merge.add_argument('--top', type=int, default=25, help="functions to list by cumulative time")
+    args = parser.parse_args()
+
+    directories = []
+    for path in args.runs:
+        if os.path.exists(os.path.join(path, 'summary.json')):
+            directories.append(path)
+        elif os.path.isdir(path):
+            directories += sorted(os.path.join(path, d) for d in os.listdir(path)
+                                  if os.path.exists(os.path.join(path, d, 'summary.json')))
+    if not directories:
+        print("No profiled runs found")
+        return 1
+
+    summary = merge_runs(directories, args.output)
+    print(f"Merged {summary['runs']} runs into {args.output}.*")
+    print_summary(summary)
+    if os.path.exists(f"{args.output}.pstats") and args.top:
+        pstats.Stats(f"{args.output}.pstats").sort_stats('cumulative').print_stats(args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# rate_limiter.py
+# Politeness scheduler shared by every scraper and job worker in the process: login rate,
+# concurrent sessions, request pacing that follows the portal's response times, and backoff
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from config import (PORTAL_LOGINS_PER_MINUTE, PORTAL_LOGIN_BURST, PORTAL_MAX_SESSIONS, PORTAL_REQUESTS_PER_SECOND,
+                    PORTAL_TARGET_RESPONSE_SECONDS, PORTAL_MAX_SLOWDOWN, PORTAL_BACKOFF_BASE, PORTAL_BACKOFF_MAX)
+from exceptions import PortalError
+from retry_policy import FailureKind, classify_failure
+
+logger = logging.getLogger(__name__)
+
+# Text of the portal's (IIS/ASP.NET) error and throttling pages
+PORTAL_ERROR_MARKERS = ['server error in', 'service unavailable', 'too many requests', 'bad gateway',
+                        'gateway timeout', 'runtime error', 'http error 50']
+# Failures that mean the portal itself is struggling (a rejected captcha does not)
+PORTAL_FAILURES = frozenset({FailureKind.PORTAL, FailureKind.TIMEOUT})
+EWMA_ALPHA = 0.3
+
+
+def looks_like_portal_error(page_source):
+    head = (page_source or '')[:3000].lower()
+    return any(marker in head for marker in PORTAL_ERROR_MARKERS)
+
+
+def raise_for_error_page(page_source):
+    """Inside PortalScheduler.request() or watch(), turns an error page into PortalError (and so a backoff)"""
+    if looks_like_portal_error(page_source):
+        raise PortalError("Portal returned an error page")
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def try_acquire(self):
+        """Take a token; returns 0 on success, otherwise the seconds until one is available"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class PortalScheduler:
+    """
+    Every portal request goes through request() and every login submission through before_login().
+    Request pacing slows down as the smoothed response time rises above the target, and portal
+    errors pause all callers with exponential backoff until a request succeeds again.
+    """
+
+    def __init__(self, logins_per_minute=PORTAL_LOGINS_PER_MINUTE, login_burst=PORTAL_LOGIN_BURST,
+                 max_sessions=PORTAL_MAX_SESSIONS, requests_per_second=PORTAL_REQUESTS_PER_SECOND,
+                 target_response=PORTAL_TARGET_RESPONSE_SECONDS, max_slowdown=PORTAL_MAX_SLOWDOWN,
+                 backoff_base=PORTAL_BACKOFF_BASE, backoff_max=PORTAL_BACKOFF_MAX):
+        self.logins = TokenBucket(logins_per_minute / 60.0, login_burst)
+        self.requests = TokenBucket(requests_per_second, max(1, int(requests_per_second)))
+        self.base_request_rate = requests_per_second
+        self.max_sessions = max_sessions
+        self.target_response = target_response
+        self.max_slowdown = max_slowdown
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.lock = threading.Condition()
+        self.sessions = set()
+        self.response_ewma = None
+        self.slowdown = 1.0
+        self.errors_in_a_row = 0
+        self.paused_until = 0.0
+        self.counters = {'logins': 0, 'requests': 0, 'errors': 0, 'waited_seconds': 0.0}
+
+    # Sessions
+
+    def open_session(self, account, timeout=None):
+        """Reserve one of max_sessions slots for account (idempotent); False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while account not in self.sessions and len(self.sessions) >= self.max_sessions:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.lock.wait(remaining)
+            self.sessions.add(account)
+            return True
+
+    def close_session(self, account):
+        with self.lock:
+            if account in self.sessions:
+                self.sessions.discard(account)
+                self.lock.notify_all()
+
+    @contextmanager
+    def session(self, account, timeout=None):
+        if not self.open_session(account, timeout):
+            raise PortalError(f"No portal session slot free within {timeout}s")
+        try:
+            yield
+        finally:
+            self.close_session(account)
+
+    # Pacing
+
+    def _wait_out_backoff(self):
+        with self.lock:
+            pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            logger.info(f"Portal backoff: waiting {pause:.1f}s")
+            time.sleep(pause)
+
+    def _take(self, bucket, counter):
+        started = time.monotonic()
+        self._wait_out_backoff()
+        bucket.acquire()
+        with self.lock:
+            self.counters[counter] += 1
+            self.counters['waited_seconds'] += time.monotonic() - started
+
+    def before_login(self):
+        """Block until a login submission is allowed"""
+        self._take(self.logins, 'logins')
+
+    def pace(self):
+        """Wait for a request slot; the caller reports the page's load time via record_response"""
+        self._take(self.requests, 'requests')
+
+    @contextmanager
+    def request(self):
+        """Pace one portal round trip and feed its timing (or failure) back into the scheduler"""
+        self._take(self.requests, 'requests')
+        started = time.monotonic()
+        with self.watch():
+            yield
+        self.record_response(time.monotonic() - started)
+
+    @contextmanager
+    def watch(self):
+        """Back off on portal failures raised in the block, without pacing it or timing it as a response"""
+        try:
+            yield
+        except Exception as e:
+            if classify_failure(e) in PORTAL_FAILURES:
+                self.record_error(e)
+            raise
+
+    # Feedback
+
+    def record_response(self, seconds):
+        with self.lock:
+            previous = self.response_ewma
+            self.response_ewma = seconds if previous is None else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * previous
+            self.slowdown = min(self.max_slowdown, max(1.0, self.response_ewma / self.target_response))
+            self.errors_in_a_row = 0
+            self.paused_until = 0.0
+            rate = self.base_request_rate / self.slowdown
+        self.requests.set_rate(rate)
+
+    def record_error(self, error=None):
+        """A portal error or throttling page: pause every caller with exponential backoff"""
+        with self.lock:
+            self.errors_in_a_row += 1
+            self.counters['errors'] += 1
+            ceiling = min(self.backoff_max, self.backoff_base * 2 ** (self.errors_in_a_row - 1))
+            pause = random.uniform(ceiling / 2, ceiling)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.warning(f"Portal error #{self.errors_in_a_row} ({error}), backing off {pause:.1f}s")
+
+    def stats(self):
+        with self.lock:
+            return {
+                **self.counters,
+                'active_sessions': len(self.sessions),
+                'response_ewma': round(self.response_ewma, 3) if self.response_ewma is not None else None,
+                'slowdown': round(self.slowdown, 2),
+                'errors_in_a_row': self.errors_in_a_row,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_portal_scheduler():
+    """The process-wide scheduler shared by all scrapers and job workers"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PortalScheduler()
+        return _scheduler
@@ -0,0 +1,221 @@
+# result_store.py
+# Local SQLite store for StudentResult records with streaming JSONL/CSV/Parquet export
+import csv
+import json
+import time
+import sqlite3
+import logging
+import argparse
+from itertools import islice
+from data_models import result_to_dict, result_from_dict
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    cgpa REAL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_account_time ON results (account, scraped_at);
+"""
+
+# One row per subject in flat exports
+FLAT_COLUMNS = [
+    'account', 'scraped_at', 'name', 'cgpa', 'semester', 'sgpa', 'semester_credits',
+    'subject_code', 'subject_name', 'credits', 'grade', 'grade_points',
+]
+
+
+def flatten_result(account, scraped_at, result):
+    """Yield one flat dict per subject row (one row per semester-less result if it has no grades)"""
+    base = {'account': account, 'scraped_at': scraped_at, 'name': result.name, 'cgpa': result.cgpa}
+    empty = True
+    for sem in result.semesters:
+        for grade in sem.grades:
+            empty = False
+            yield {
+                **base,
+                'semester': sem.semester, 'sgpa': sem.sgpa, 'semester_credits': sem.credits,
+                'subject_code': grade.subject_code, 'subject_name': grade.subject_name,
+                'credits': grade.credits, 'grade': grade.grade, 'grade_points': grade.grade_points,
+            }
+    if empty:
+        yield {**base, **{column: None for column in FLAT_COLUMNS if column not in base}}
+
+
+class ResultStore:
+    """Append-only result history per account, backed by a single SQLite file"""
+
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _row(result, scraped_at=None):
+        return (
+            result.student_id,
+            scraped_at if scraped_at is not None else time.time(),
+            result.cgpa,
+            json.dumps(result_to_dict(result), separators=(',', ':')),
+        )
+
+    def write(self, result, scraped_at=None):
+        """Store a single StudentResult"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO results (account, scraped_at, cgpa, payload) VALUES (?, ?, ?, ?)",
+                self._row(result, scraped_at),
+            )
+
+    def write_many(self, results):
+        """
+        Store results from any iterable (a generator is fine) in batches of batch_size.
+        Only one batch is held in memory at a time. Returns the number of rows written.
+        """
+        iterator = iter(results)
+        written = 0
+        while True:
+            batch = [self._row(r) for r in islice(iterator, self.batch_size)]
+            if not batch:
+                break
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO results (account, scraped_at, cgpa, payload) VALUES (?, ?, ?, ?)",
+                    batch,
+                )
+            written += len(batch)
+        logger.info(f"Stored {written} results in {self.path}")
+        return written
+
+    def _stream(self, query, params=()):
+        cursor = self.conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                break
+            for account, scraped_at, payload in rows:
+                yield account, scraped_at, result_from_dict(json.loads(payload))
+
+    def history(self, account):
+        """All stored results for one account, oldest first, as (scraped_at, StudentResult)"""
+        for _, scraped_at, result in self._stream(
+            "SELECT account, scraped_at, payload FROM results WHERE account = ? ORDER BY scraped_at",
+            (account,),
+        ):
+            yield scraped_at, result
+
+    def latest(self, account):
+        row = self.conn.execute(
+            "SELECT payload FROM results WHERE account = ? ORDER BY scraped_at DESC LIMIT 1",
+            (account,),
+        ).fetchone()
+        return result_from_dict(json.loads(row[0])) if row else None
+
+    def accounts(self):
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT account FROM results ORDER BY account")]
+
+    def iter_results(self, latest_only=False):
+        """Stream (account, scraped_at, StudentResult) for every stored record"""
+        if latest_only:
+            query = """
+                SELECT account, scraped_at, payload FROM results r
+                WHERE scraped_at = (SELECT MAX(scraped_at) FROM results WHERE account = r.account)
+                ORDER BY account
+            """
+        else:
+            query = "SELECT account, scraped_at, payload FROM results ORDER BY account, scraped_at"
+        return self._stream(query)
+
+    def export_jsonl(self, path, latest_only=False):
+        """One JSON object per stored result"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for account, scraped_at, result in self.iter_results(latest_only):
+                record = {'account': account, 'scraped_at': scraped_at, **result_to_dict(result)}
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+                count += 1
+        return count
+
+    def export_csv(self, path, latest_only=False):
+        """One CSV row per subject (see FLAT_COLUMNS)"""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FLAT_COLUMNS)
+            writer.writeheader()
+            for account, scraped_at, result in self.iter_results(latest_only):
+                for row in flatten_result(account, scraped_at, result):
+                    writer.writerow(row)
+                    count += 1
+        return count
+
+    def export_parquet(self, path, latest_only=False):
+        """Columnar export with one row group per batch. Requires pyarrow."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+        schema = pa.schema([
+            ('account', pa.string()), ('scraped_at', pa.float64()), ('name', pa.string()),
+            ('cgpa', pa.float32()), ('semester', pa.int16()), ('sgpa', pa.float32()),
+            ('semester_credits', pa.int16()), ('subject_code', pa.dictionary(pa.int32(), pa.string())),
+            ('subject_name', pa.string()), ('credits', pa.int8()),
+            ('grade', pa.dictionary(pa.int8(), pa.string())), ('grade_points', pa.float32()),
+        ])
+        count = 0
+        columns = {column: [] for column in FLAT_COLUMNS}
+
+        with pq.ParquetWriter(path, schema) as writer:
+            def flush():
+                if columns['account']:
+                    writer.write_table(pa.table(columns, schema=schema))
+                    for values in columns.values():
+                        values.clear()
+
+            for account, scraped_at, result in self.iter_results(latest_only):
+                for row in flatten_result(account, scraped_at, result):
+                    for column in FLAT_COLUMNS:
+                        columns[column].append(row[column])
+                    count += 1
+                if len(columns['account']) >= self.batch_size:
+                    flush()
+            flush()
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored SLCM results")
+    parser.add_argument('output', help="Output file path")
+    parser.add_argument('--db', default=None, help="Result database (defaults to RESULT_DB_PATH)")
+    parser.add_argument('--format', choices=['jsonl', 'csv', 'parquet'], default='jsonl')
+    parser.add_argument('--latest', action='store_true', help="Only the latest result per account")
+    args = parser.parse_args()
+
+    if args.db is None:
+        from config import RESULT_DB_PATH
+        args.db = RESULT_DB_PATH
+
+    with ResultStore(args.db) as store:
+        exporter = {'jsonl': store.export_jsonl, 'csv': store.export_csv, 'parquet': store.export_parquet}
+        count = exporter[args.format](args.output, latest_only=args.latest)
+    print(f"✓ Exported {count} {args.format} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# retry_policy.py
+# Unified retry engine: failure classification, exponential backoff with jitter and a total time budget
+import re
+import time
+import random
+import logging
+import threading
+from enum import Enum
+from dataclasses import dataclass, field
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from exceptions import (CaptchaError, InvalidCredentialsError, SessionLostError,
+                        ModelUnavailableError, PortalError)
+
+logger = logging.getLogger(__name__)
+
+
+class FailureKind(Enum):
+    CAPTCHA = 'captcha'
+    CREDENTIALS = 'credentials'
+    SESSION_LOST = 'session_lost'
+    TIMEOUT = 'timeout'
+    MODEL_UNAVAILABLE = 'model_unavailable'
+    PORTAL = 'portal'
+    UNKNOWN = 'unknown'
+
+
+RETRYABLE_FAILURES = frozenset({
+    FailureKind.CAPTCHA,
+    FailureKind.SESSION_LOST,
+    FailureKind.TIMEOUT,
+    FailureKind.MODEL_UNAVAILABLE,
+    FailureKind.PORTAL,
+    FailureKind.UNKNOWN,
+})
+
+_SESSION_LOST_MARKERS = ['invalid session id', 'disconnected', 'no such window', 'session deleted',
+                         'chrome not reachable', 'session expired']
+# The portal's bad-credential and lockout messages ("Invalid Username or Password", "Your account has
+# been locked", ...); generic words like 'user' or 'invalid' alone also appear in unrelated errors
+CREDENTIAL_REJECTION = re.compile(
+    r"invalid\s+(?:user\s*(?:name|id)?|login\s*id|registration\s*(?:no|number))\s*(?:or|and|/|&)\s*password"
+    r"|(?:incorrect|invalid|wrong)\s+password"
+    r"|(?:user\s*name|password)\s+(?:is\s+)?(?:incorrect|invalid|wrong)"
+    r"|invalid\s+credentials"
+    r"|account\s+(?:is\s+|has\s+been\s+)?(?:locked|blocked|disabled)",
+    re.IGNORECASE,
+)
+_MODEL_MARKERS = ['ollama', 'connection refused', 'model not found', 'tesseract']
+
+
+def is_credential_rejection(text):
+    """True for the portal's wrong-username/password or locked-account messages"""
+    return bool(CREDENTIAL_REJECTION.search(text or ''))
+
+
+def classify_failure(exc):
+    """Map an exception (or the exception it was raised from) to a FailureKind"""
+    for error in (exc, exc.__cause__):
+        if error is None:
+            continue
+        if isinstance(error, InvalidCredentialsError):
+            return FailureKind.CREDENTIALS
+        if isinstance(error, CaptchaError):
+            return FailureKind.CAPTCHA
+        if isinstance(error, SessionLostError):
+            return FailureKind.SESSION_LOST
+        if isinstance(error, ModelUnavailableError):
+            return FailureKind.MODEL_UNAVAILABLE
+        if isinstance(error, PortalError):
+            return FailureKind.PORTAL
+        if isinstance(error, TimeoutException):
+            return FailureKind.TIMEOUT
+
+    message = str(exc).lower()
+    if is_credential_rejection(message):
+        return FailureKind.CREDENTIALS
+    if 'captcha' in message:
+        return FailureKind.CAPTCHA
+    if any(marker in message for marker in _SESSION_LOST_MARKERS):
+        return FailureKind.SESSION_LOST
+    if 'timed out' in message or 'timeout' in message:
+        return FailureKind.TIMEOUT
+    if any(marker in message for marker in _MODEL_MARKERS):
+        return FailureKind.MODEL_UNAVAILABLE
+    if isinstance(exc, WebDriverException):
+        return FailureKind.SESSION_LOST
+    return FailureKind.UNKNOWN
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with jitter, bounded by both an attempt count and a time budget"""
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    multiplier: float = 2.0
+    budget_seconds: float = 180.0
+    retry_on: frozenset = field(default_factory=lambda: RETRYABLE_FAILURES)
+
+    def delay_for(self, attempt):
+        """Sleep before retry number `attempt` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(self.base_delay / 2, max(ceiling, self.base_delay / 2))
+
+    def run(self, func, *args, on_retry=None, **kwargs):
+        """
+        Call func until it succeeds. Non-retryable failures, the last attempt and an exhausted
+        budget re-raise the original exception. on_retry(kind, exc, attempt) runs after each
+        backoff sleep, before the next call, and is where callers recover state (e.g. reload the
+        page, restart the driver). A failing recovery counts as a failed attempt and is classified
+        and retried the same way.
+        """
+        started = time.monotonic()
+        failure = None  # (kind, exception, attempt) awaiting recovery
+        for attempt in range(1, self.max_attempts + 1):
+            step = func.__name__
+            try:
+                if failure and on_retry:
+                    step = f"recovery before {func.__name__}"
+                    on_retry(*failure)
+                    step = func.__name__
+                return func(*args, **kwargs)
+            except Exception as e:
+                kind = classify_failure(e)
+                if kind not in self.retry_on:
+                    logger.warning(f"Not retrying {step}: {kind.value} failure ({e})")
+                    raise
+                if attempt == self.max_attempts:
+                    raise
+
+                delay = self.delay_for(attempt)
+                elapsed = time.monotonic() - started
+                if elapsed + delay > self.budget_seconds:
+                    logger.warning(f"Retry budget of {self.budget_seconds}s exhausted for {func.__name__}")
+                    raise
+
+                logger.info(f"{step} failed ({kind.value}), retry {attempt}/{self.max_attempts - 1} "
+                            f"in {delay:.1f}s")
+                failure = (kind, e, attempt)
+                time.sleep(delay)
+
+
+class CredentialGuard:
+    """Remembers accounts whose credentials were rejected so batch runs stop retrying them"""
+
+    def __init__(self):
+        self._blocked = {}
+        self._lock = threading.Lock()
+
+    def mark_bad(self, account, reason=''):
+        with self._lock:
+            self._blocked[account] = reason
+
+    def is_blocked(self, account):
+        with self._lock:
+            return account in self._blocked
+
+    def clear(self, account):
+        with self._lock:
+            self._blocked.pop(account, None)
+
+
+credential_guard = CredentialGuard()
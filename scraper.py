@@ -16,15 +16,39 @@ import time
 import os
 import sys
 import logging
+import threading
 from config import *
-from utils import setup_logging, retry_on_failure
-from exceptions import LoginError, TokenExtractionError, CGPAExtractionError
+from utils import setup_logging
+from exceptions import (LoginError, TokenExtractionError, CGPAExtractionError, CaptchaError,
+                        InvalidCredentialsError, SessionLostError)
+from retry_policy import RetryPolicy, FailureKind, credential_guard, is_credential_rejection
+from change_detection import ChangeDetector, SnapshotStore
+from gradesheet_parser import parse_gradesheet
+from result_store import ResultStore
+from captcha_pipeline import CaptchaPrefetcher
+from captcha_capture import read_captcha_bytes
+import ocr_backend
+from ocr_service import get_ocr_service, run_captcha_strategy, CAPTCHA_CLAHE_LIMITS
+from vision_backend import get_vision_service
+from browser_pool import acquire_browser
+from cdp_navigation import CDPNavigator, GRADE_TABLE_READY_JS
+from page_extractors import PAGE_EXTRACTORS, collect_pages
+from cgpa_patterns import (find_cgpa, parse_model_answer, decimals_in_range, has_cgpa_context,
+                           CGPA_LABEL, GRADE_TABLE, SUMMARY_ROW)
+from cgpa_verification import CGPAVerifier, recompute_cgpa
+from rate_limiter import get_portal_scheduler, raise_for_error_page
+from variant_store import get_variant_store, read_image
+from profiling import profiled_run, profile_stage
+from screenshot_capture import capture_grade_table, save_capture
+from session_recorder import SessionRecorder, RecordingVision, recorded_step
+from selector_cache import (SelectorCache, find_with_cache, cgpa_from_element, present, clickable,
+                            no_implicit_wait, LOGIN_LOCATORS, BROAD_CGPA_LOCATORS)
 from dotenv import load_dotenv
-import ollama
 import base64
 import io
 import json
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -37,59 +61,103 @@ print("[DEBUG] Logger configured")
 print("[DEBUG] scraper.py started")
 
 class SLCMScraper:
-    def __init__(self):
+    def __init__(self, username=None, password=None, interactive=True, offline=False, persist=True):
         print("[DEBUG] SLCMScraper.__init__ started")
         try:
-        self.driver = None
+            self.driver = None
+            # Defaults to the .env account; job workers pass per-account credentials
+            self.username = username or USERNAME
+            self.password = password or PASSWORD
+            self.interactive = interactive  # False for unattended runs: no manual login or Enter prompts
+            self.offline = offline  # no browser, Ollama or Tesseract checks (session replay, see session_recorder.py)
+            # False for job workers: post_process keeps the snapshots and results (see job_queue.py)
+            persist = persist and not offline
             self.ollama_available = False
+            self.vision = None
+            self.vision_model = None
+            self.cgpa_vision_model = None
             self.captcha_attempts = []
+            self.captcha_lock = threading.Lock()  # captcha_attempts is extended by the prefetcher's solver thread
             self.captcha_failure_analysis = []
             self.login_attempts = 0
             self.current_window = None  # Track current window
             self.gradesheet_window = None  # Track gradesheet window
-            print("[DEBUG] About to setup driver")
-        self.setup_driver()
-            print("[DEBUG] Driver setup completed")
-            
-            # Test Ollama availability
-            self.check_ollama_availability()
-            
-        if TESSERACT_PATH:
-            pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
-                if not os.path.exists(TESSERACT_PATH):
-                    logger.error(f"Tesseract not found at {TESSERACT_PATH}")
-                    print("[WARNING] Tesseract not found - OCR fallback may not work")
+            self.gradesheet_response = None  # GradeSheet.aspx body captured from the network log
+            self.selectors = SelectorCache(SELECTOR_CACHE_PATH)
+            self.cgpa_verdict = None  # how the last CGPA was verified (see cgpa_verification.py)
+            self.pages = {}  # name -> PageResult from the latest extract_pages pass
+            self.tabs = None  # TabManager of that pass (tabs kept open, e.g. the grade sheet)
+            self.change_detector = (
+                ChangeDetector(SnapshotStore(SNAPSHOT_DIR)) if CHANGE_DETECTION_ENABLED and persist else None
+            )
+            self.last_changes = []  # Grade sheet diffs from the latest run
+            self.result_store = ResultStore(RESULT_DB_PATH) if RESULT_STORE_ENABLED and persist else None
+            self.captcha_prefetcher = (
+                CaptchaPrefetcher(self.capture_captcha_image, self.solve_captcha_image)
+                if CAPTCHA_PIPELINE_ENABLED else None
+            )
+            self.browser = None
+            self.variants = get_variant_store()  # preprocessed captcha images shared by all solvers
+            self.portal = get_portal_scheduler()  # login rate, session slots and backoff shared across scrapers
+            self.recorder = SessionRecorder(self.username) if SESSION_RECORD and persist else None  # see session_recorder.py
+            self.startup_started = time.perf_counter()
+            self.startup_timings = {}
+            self.startup_reported = False
+            
+            if offline:
+                return
+            
+            # Ollama and Tesseract checks run while the browser launches
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix='startup-check') as checks:
+                ollama_check = checks.submit(self._timed, 'ollama_check', self.check_ollama_availability)
+                tesseract_check = checks.submit(self._timed, 'tesseract_check', self.check_tesseract)
+                print("[DEBUG] About to setup driver")
+                self._timed('browser_launch', self.setup_driver)
+                print("[DEBUG] Driver setup completed")
+                ollama_check.result()
+                tesseract_check.result()
+            if self.recorder and self.vision:
+                self.vision = RecordingVision(self.vision, self.recorder)
+            self.startup_timings['constructed'] = time.perf_counter() - self.startup_started
         except Exception as e:
             logger.error(f"Failed to initialize scraper: {e}")
             raise
     
+    def _timed(self, name, func):
+        started = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.startup_timings[name] = time.perf_counter() - started
+    
+    def check_tesseract(self):
+        if TESSERACT_PATH:
+            pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+            if not os.path.exists(TESSERACT_PATH):
+                logger.error(f"Tesseract not found at {TESSERACT_PATH}")
+                print("[WARNING] Tesseract not found - OCR fallback may not work")
+    
+    def report_startup(self):
+        """Print time from construction to the first page load, once per scraper"""
+        if self.startup_reported:
+            return
+        self.startup_reported = True
+        self.startup_timings['first_page_load'] = time.perf_counter() - self.startup_started
+        details = ', '.join(f"{name}={seconds:.2f}s" for name, seconds in self.startup_timings.items())
+        print(f"[TIMING] Startup: {details}")
+        logger.info(f"Startup timings: {details}")
+    
     def check_ollama_availability(self):
-        """Check if Ollama is available and has vision models"""
+        """Check if a vision backend is available and pick a model per task (see vision_backend.py)"""
         try:
-            models = ollama.list()
-            vision_models = []
-            
-            for model in models.get('models', []):
-                model_name = model['name']
-                if any(vm in model_name.lower() for vm in ['llava', 'vision', 'llama3.2-vision']):
-                    vision_models.append(model_name)
-            
-            if vision_models:
+            self.vision = get_vision_service()
+            if self.vision.available:
                 self.ollama_available = True
-                # Prefer llava:13b if available
-                preferred_models = ['llava:13b', 'llava:latest', 'llama3.2-vision']
-                self.vision_model = None
-                
-                for preferred in preferred_models:
-                    if any(preferred in vm for vm in vision_models):
-                        self.vision_model = preferred
-                        break
+                self.vision_model = self.vision.model_for('captcha')
+                self.cgpa_vision_model = self.vision.model_for('cgpa')
                 
-                if not self.vision_model:
-                    self.vision_model = vision_models[0]
-                
-                print(f"✓ Ollama available with vision model: {self.vision_model}")
-                logger.info(f"Ollama initialized with model: {self.vision_model}")
+                print(f"✓ Ollama available with vision models: captcha={self.vision_model}, cgpa={self.cgpa_vision_model}")
+                logger.info(f"Ollama initialized with models: captcha={self.vision_model}, cgpa={self.cgpa_vision_model}")
             else:
                 print("✗ No vision models found in Ollama")
                 self.ollama_available = False
@@ -102,50 +170,46 @@ class SLCMScraper:
         """Verify that all required configuration is loaded"""
         print("=== CONFIGURATION VERIFICATION ===")
         
-        if not USERNAME:
+        if not self.username:
             raise ValueError("USERNAME not found in environment variables")
-        if not PASSWORD:
+        if not self.password:
             raise ValueError("PASSWORD not found in environment variables")
         
-        print(f"✓ Username loaded: {USERNAME[:3]}***")
-        print(f"✓ Password loaded: {'*' * len(PASSWORD)}")
+        print(f"✓ Username loaded: {self.username[:3]}***")
+        print(f"✓ Password loaded: {'*' * len(self.password)}")
         print(f"✓ Ollama available: {self.ollama_available}")
         if self.ollama_available:
-            print(f"✓ Vision model: {self.vision_model}")
+            print(f"✓ Vision models: captcha={self.vision_model}, cgpa={self.cgpa_vision_model}")
         print("✓ All credentials configured")
     
     def setup_driver(self):
-        """Setup Chrome driver with enhanced options for captcha solving"""
+        """Get a Chrome driver from the warm-start pool (see browser_pool.py)"""
         try:
-        chrome_options = Options()
-            chrome_options.add_argument('--start-maximized')
-            chrome_options.add_argument('--disable-notifications')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36")
-            
-            chrome_driver_path = os.getenv('CHROME_DRIVER_PATH')
-            
-            if chrome_driver_path and os.path.exists(chrome_driver_path):
-                service = Service(chrome_driver_path)
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            else:
-                self.driver = webdriver.Chrome(options=chrome_options)
-            
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        self.driver.implicitly_wait(IMPLICIT_WAIT)
-        self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-            logger.info("Enhanced Chrome driver setup successful")
+            self.browser = acquire_browser()
+            self.driver = self.browser.driver
+            self.driver.implicitly_wait(IMPLICIT_WAIT)
+            self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            logger.info(f"Enhanced Chrome driver setup successful ({BROWSER_PROFILE} profile, "
+                        f"launched in {self.browser.launch_seconds:.2f}s)")
             
         except Exception as e:
             logger.error(f"Failed to setup Chrome driver: {e}")
             raise
     
+    def close_browser(self):
+        if self.browser:
+            self.browser.close()
+        elif self.driver:
+            self.driver.quit()
+        self.browser = None
+        self.driver = None
+    
+    def open_portal_page(self, url):
+        """driver.get paced by the portal scheduler; an error page raises PortalError"""
+        with self.portal.request():
+            self.driver.get(url)
+            raise_for_error_page(self.driver.page_source)
+    
     def is_session_valid(self):
         """Check if the WebDriver session is still valid"""
         try:
@@ -155,106 +219,96 @@ class SLCMScraper:
             return False
     
     # [ENHANCED CAPTCHA SOLVING METHODS - Keep existing enhanced captcha code]
+    @profile_stage('captcha_preprocess')
     def ultra_preprocess_captcha_image(self, image_path):
-        """Ultra-aggressive preprocessing for 3-digit captchas with multiple techniques"""
+        """
+        Ultra-aggressive preprocessing for 3-digit captchas with multiple techniques. Returns
+        [(version_name, png_bytes)]; each version is computed and encoded once per captcha image
+        and reused by later passes (see variant_store.py).
+        """
         try:
-            image = cv2.imread(image_path)
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            key, image_bytes = read_image(image_path)
             
-            height, width = image_rgb.shape[:2]
-            scale_factor = max(200/height, 600/width)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image_rgb = cv2.resize(image_rgb, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+            def resized_rgb():
+                image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                height, width = image_rgb.shape[:2]
+                scale_factor = max(200/height, 600/width)
+                new_width = int(width * scale_factor)
+                new_height = int(height * scale_factor)
+                return cv2.resize(image_rgb, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
             
-            pil_image = Image.fromarray(image_rgb)
-            enhanced_versions = []
+            def base():
+                return Image.fromarray(self.variants.get(key, 'captcha_rgb', (200, 600), resized_rgb).array)
             
             # Version 1: Maximum contrast and sharpness
-            enhancer = ImageEnhance.Contrast(pil_image)
-            max_contrast = enhancer.enhance(4.0)
-            enhancer = ImageEnhance.Sharpness(max_contrast)
-            max_sharp = enhancer.enhance(3.0)
-            enhancer = ImageEnhance.Brightness(max_sharp)
-            max_bright = enhancer.enhance(1.1)
-            enhanced_versions.append(("max_enhance", max_bright))
+            def max_enhance():
+                max_contrast = ImageEnhance.Contrast(base()).enhance(4.0)
+                max_sharp = ImageEnhance.Sharpness(max_contrast).enhance(3.0)
+                return ImageEnhance.Brightness(max_sharp).enhance(1.1)
             
             # Version 2: Noise reduction focused
-            enhancer = ImageEnhance.Contrast(pil_image)
-            clean_contrast = enhancer.enhance(2.5)
-            clean_filtered = clean_contrast.filter(ImageFilter.MedianFilter(size=3))
-            enhancer = ImageEnhance.Sharpness(clean_filtered)
-            clean_sharp = enhancer.enhance(2.0)
-            enhanced_versions.append(("noise_reduced", clean_sharp))
+            def noise_reduced():
+                clean_contrast = ImageEnhance.Contrast(base()).enhance(2.5)
+                clean_filtered = clean_contrast.filter(ImageFilter.MedianFilter(size=3))
+                return ImageEnhance.Sharpness(clean_filtered).enhance(2.0)
             
             # Version 3: Edge enhancement
-            edge_enhanced = pil_image.filter(ImageFilter.EDGE_ENHANCE_MORE)
-            enhancer = ImageEnhance.Contrast(edge_enhanced)
-            edge_contrast = enhancer.enhance(2.8)
-            enhanced_versions.append(("edge_enhanced", edge_contrast))
+            def edge_enhanced():
+                return ImageEnhance.Contrast(base().filter(ImageFilter.EDGE_ENHANCE_MORE)).enhance(2.8)
             
-            return enhanced_versions
+            versions = [
+                ("max_enhance", (4.0, 3.0, 1.1), max_enhance),
+                ("noise_reduced", (2.5, 3, 2.0), noise_reduced),
+                ("edge_enhanced", (2.8,), edge_enhanced),
+            ]
+            return [(name, self.variants.png(key, name, params, compute)) for name, params, compute in versions]
             
         except Exception as e:
             print(f"Ultra image preprocessing failed: {e}")
-            return [("original", Image.open(image_path))]
+            with open(image_path, 'rb') as f:
+                return [("original", f.read())]
     
+    @profile_stage('captcha_vision')
     def solve_captcha_with_ollama_enhanced(self, image_path):
         """Enhanced Ollama captcha solving with improved prompts"""
         try:
-            if not self.ollama_available:
+            if not (self.ollama_available and self.vision.available):  # the background model benchmark may find no working model
                 return []
             
             print(f"Solving 3-digit captcha with enhanced Ollama {self.vision_model}...")
             enhanced_versions = self.ultra_preprocess_captcha_image(image_path)
             
-            enhanced_prompts = [
-                "This image shows a 3-digit security code. Look carefully at each digit from left to right. The digits are numbers 0-9. Respond with exactly 3 digits, like 123 or 456 or 789.",
-                "Extract the 3-digit verification code from this captcha. Focus on the numbers only. Ignore any background noise. Return just the 3 consecutive numbers.",
-                "I need the 3-digit captcha code from this image. Each position contains one digit (0-9). Read from left to right and give me the 3-digit number.",
-                "This security image contains exactly 3 numerical digits. Identify each digit carefully. Respond with only the 3-digit code.",
-                "Look at this 3-digit captcha. What numbers do you see? Give me the complete 3-digit code as one number."
-            ]
+            enhanced_prompts = self.vision.prompts('captcha')
             
             ollama_results = []
             
-            for version_name, enhanced_image in enhanced_versions:
-                enhanced_path = image_path.replace('.png', f'_{version_name}.png')
-                enhanced_image.save(enhanced_path)
-                
-                for i, prompt in enumerate(enhanced_prompts):
-                    try:
-                        response = ollama.chat(
-                            model=self.vision_model,
-                            messages=[{
-                                'role': 'user',
-                                'content': prompt,
-                                'images': [enhanced_path]
-                            }],
-                            options={'temperature': 0.1, 'top_p': 0.9}
-                        )
-                        
-                        result = response['message']['content'].strip()
-                        numeric_result = ''.join(c for c in result if c.isdigit())
-                        
-                        if len(numeric_result) == 3:
-                            ollama_results.append(numeric_result)
-                            print(f"✓ Enhanced Ollama ({version_name}, prompt {i+1}): {numeric_result}")
-                        elif len(numeric_result) > 3:
-                            truncated = numeric_result[:3]
-                            ollama_results.append(truncated)
-                            print(f"✓ Enhanced Ollama ({version_name}, prompt {i+1}) truncated: {truncated}")
-                        else:
-                            print(f"Enhanced Ollama ({version_name}, prompt {i+1}) invalid: '{result}' -> '{numeric_result}'")
-                            
-                    except Exception as e:
-                        print(f"Enhanced Ollama ({version_name}, prompt {i+1}) failed: {e}")
-                        continue
-                
+            # Queue every (variant, prompt) pair up front: variants sharing a prompt go out as one multi-image request.
+            # The PNG bytes go to the model directly, no temporary files.
+            pending = [
+                (version_name, i, self.vision.submit('captcha', prompt, enhanced_png))
+                for i, prompt in enumerate(enhanced_prompts)
+                for version_name, enhanced_png in enhanced_versions
+            ]
+            
+            for version_name, i, future in pending:
                 try:
-                    os.remove(enhanced_path)
-                except:
-                    pass
+                    result = future.result()
+                    numeric_result = ''.join(c for c in result if c.isdigit())
+                    
+                    if len(numeric_result) == 3:
+                        ollama_results.append(numeric_result)
+                        print(f"✓ Enhanced Ollama ({version_name}, prompt {i+1}): {numeric_result}")
+                    elif len(numeric_result) > 3:
+                        truncated = numeric_result[:3]
+                        ollama_results.append(truncated)
+                        print(f"✓ Enhanced Ollama ({version_name}, prompt {i+1}) truncated: {truncated}")
+                    else:
+                        print(f"Enhanced Ollama ({version_name}, prompt {i+1}) invalid: '{result}' -> '{numeric_result}'")
+                        
+                except Exception as e:
+                    print(f"Enhanced Ollama ({version_name}, prompt {i+1}) failed: {e}")
+                    continue
             
             return ollama_results
             
@@ -262,52 +316,43 @@ class SLCMScraper:
             print(f"Enhanced Ollama captcha solving failed: {e}")
             return []
     
+    @profile_stage('captcha_ocr')
     def solve_captcha_with_ocr_advanced(self, image_path):
         """Advanced OCR with multiple preprocessing strategies"""
         try:
             print("Solving 3-digit captcha with advanced OCR...")
-            image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+            key, image_bytes = read_image(image_path)
+            
+            def resized_gray():
+                image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+                height, width = image.shape
+                scale_factor = max(150/height, 450/width)
+                new_size = (int(width * scale_factor * 2.5), int(height * scale_factor * 2.5))
+                return cv2.resize(image, new_size, interpolation=cv2.INTER_CUBIC)
             
-            height, width = image.shape
-            scale_factor = max(150/height, 450/width)
-            new_size = (int(width * scale_factor * 2.5), int(height * scale_factor * 2.5))
-            image = cv2.resize(image, new_size, interpolation=cv2.INTER_CUBIC)
+            image = self.variants.get(key, 'ocr_gray', (150, 450, 2.5), resized_gray).array
             
             ocr_results = []
-            strategies = []
-            
-            # Multiple CLAHE settings
-            for clip_limit in [2.0, 3.0, 4.0, 5.0]:
-                clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(4,4))
-                clahe_enhanced = clahe.apply(image)
-                _, thresh = cv2.threshold(clahe_enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-                strategies.append((f"clahe_{clip_limit}", thresh))
-            
-            # Enhanced OCR configurations
-            configs = [
-                r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789',
-                r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789',
-                r'--oem 1 --psm 8 -c tessedit_char_whitelist=0123456789',
-                r'--psm 13 --oem 3 -c tessedit_char_whitelist=0123456789'
-            ]
             
-            for strategy_name, processed_image in strategies:
-                for config_idx, config in enumerate(configs):
-                    try:
-                        pil_image = Image.fromarray(processed_image)
-                        text = pytesseract.image_to_string(pil_image, config=config).strip()
-                        numeric_text = ''.join(c for c in text if c.isdigit())
-                        
-                        if len(numeric_text) == 3:
-                            ocr_results.append(numeric_text)
-                            print(f"✓ Advanced OCR ({strategy_name}, config {config_idx+1}): {numeric_text}")
-                        elif len(numeric_text) > 3:
-                            truncated = numeric_text[:3]
-                            ocr_results.append(truncated)
-                            print(f"✓ Advanced OCR ({strategy_name}, config {config_idx+1}) truncated: {truncated}")
-                            
-                    except Exception as e:
-                        continue
+            # CLAHE strategies x OCR configs, spread over the shared OCR process pool when enabled
+            ocr_service = get_ocr_service()
+            if ocr_service:
+                futures = ocr_service.submit_captcha(image)
+                strategy_hits = [(clip_limit, future.result()) for clip_limit, future in futures.items()]
+            else:
+                strategy_hits = [(clip_limit, run_captcha_strategy(image, clip_limit))
+                                 for clip_limit in CAPTCHA_CLAHE_LIMITS]
+            
+            for clip_limit, hits in strategy_hits:
+                strategy_name = f"clahe_{clip_limit}"
+                for config_idx, numeric_text in hits:
+                    if len(numeric_text) == 3:
+                        ocr_results.append(numeric_text)
+                        print(f"✓ Advanced OCR ({strategy_name}, config {config_idx+1}): {numeric_text}")
+                    else:
+                        truncated = numeric_text[:3]
+                        ocr_results.append(truncated)
+                        print(f"✓ Advanced OCR ({strategy_name}, config {config_idx+1}) truncated: {truncated}")
             
             return ocr_results
             
@@ -379,16 +424,35 @@ class SLCMScraper:
             print(f"Enhanced consensus calculation failed: {e}")
             return valid_attempts[0] if valid_attempts else None
     
+    def capture_captcha_image(self, driver=None):
+        """Save the current captcha image (original bytes, see CAPTCHA_CAPTURE_MODE) and return its path"""
+        driver = driver or self.driver
+        image_bytes = read_captcha_bytes(driver, CAPTCHA_CAPTURE_MODE)
+        if self.recorder:
+            self.recorder.captcha(image_bytes)
+        img_path = f"captcha_enhanced_{time.time_ns()}.png"
+        with open(img_path, 'wb') as f:
+            f.write(image_bytes)
+        print(f"Captured captcha: {img_path} ({len(image_bytes)} bytes, mode: {CAPTCHA_CAPTURE_MODE})")
+        return img_path
+    
     def solve_captcha_comprehensive_enhanced(self):
         """Comprehensive enhanced 3-digit captcha solving"""
         try:
             print(f"\n=== ENHANCED 3-DIGIT CAPTCHA SOLVING ===")
-            
-            captcha_img = self.driver.find_element(By.ID, "imgCaptcha")
-            img_path = f"captcha_enhanced_{int(time.time())}.png"
-            captcha_img.screenshot(img_path)
-            print(f"Captured captcha: {img_path}")
-            
+            img_path = self.capture_captcha_image()
+            return self.solve_captcha_image(img_path)
+        except Exception as e:
+            print(f"Enhanced captcha solving failed: {e}")
+            return None
+    
+    @profile_stage('captcha')
+    def solve_captcha_image(self, img_path):
+        """Solve a captured captcha image (no WebDriver calls, safe to run on a worker thread)"""
+        try:
+            started = time.perf_counter()
+            with self.captcha_lock:
+                attempts_before = list(self.captcha_attempts)
             current_attempts = []
             
             # Enhanced Ollama results (multiple attempts)
@@ -406,8 +470,12 @@ class SLCMScraper:
             
             print(f"Current round total results: {current_attempts}")
             
-            self.captcha_attempts.extend(current_attempts)
-            consensus_result = self.calculate_weighted_consensus(self.captcha_attempts)
+            with self.captcha_lock:
+                self.captcha_attempts.extend(current_attempts)
+                all_attempts = list(self.captcha_attempts)
+            consensus_result = self.calculate_weighted_consensus(all_attempts)
+            if self.recorder:
+                self.recorder.captcha_solved(img_path, attempts_before, consensus_result, time.perf_counter() - started)
             
             try:
                 os.remove(img_path)
@@ -420,23 +488,24 @@ class SLCMScraper:
             print(f"Enhanced captcha solving failed: {e}")
             return None
     
-    @retry_on_failure(max_attempts=1, delay=1)
+    @profile_stage('login')
+    @recorded_step('login')
     def login(self):
         """Perform automated login with enhanced 3-digit captcha consensus strategy"""
-        if not USERNAME or not PASSWORD:
+        if not self.username or not self.password:
             logger.error("Username or password not configured in .env file")
-            raise LoginError("Username or password not configured in .env file")
+            raise InvalidCredentialsError("Username or password not configured in .env file")
         
         try:
             self.login_attempts += 1
-            logger.info(f"Starting automated login process (attempt {self.login_attempts}/3)...")
-            print(f"=== AUTOMATED LOGIN PROCESS (ATTEMPT {self.login_attempts}/3) ===")
+            logger.info(f"Starting automated login process (attempt {self.login_attempts}/{LOGIN_MAX_ATTEMPTS})...")
+            print(f"=== AUTOMATED LOGIN PROCESS (ATTEMPT {self.login_attempts}/{LOGIN_MAX_ATTEMPTS}) ===")
             
             self.verify_config()
             
             if not self.is_session_valid():
                 logger.error("Browser session lost")
-                raise LoginError("Browser session disconnected")
+                raise SessionLostError("Browser session disconnected")
             
             WebDriverWait(self.driver, 20).until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
@@ -444,23 +513,24 @@ class SLCMScraper:
             
             print("✓ No iframes detected - accessing elements directly")
             
+            # Pipelined mode: solve the captcha in the background while the credentials are typed
+            if self.captcha_prefetcher:
+                self.captcha_prefetcher.reset()
+                self.captcha_prefetcher.prefetch(self.driver)
+            
             # Fill username
             print("Entering username...")
-            username_field = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "txtUserid"))
-            )
+            username_field = self.wait_for_login_element('username')
             username_field.clear()
-            username_field.send_keys(USERNAME)
+            username_field.send_keys(self.username)
             print("✓ Username entered successfully")
             time.sleep(1)
             
             # Fill password
             print("Entering password...")
-            password_field = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "txtpassword"))
-            )
+            password_field = self.wait_for_login_element('password')
             password_field.clear()
-            password_field.send_keys(PASSWORD)
+            password_field.send_keys(self.password)
             print("✓ Password entered successfully")
             time.sleep(1)
             
@@ -470,11 +540,16 @@ class SLCMScraper:
             for captcha_guess in range(1, 4):
                 print(f"\n--- ENHANCED CAPTCHA GUESS {captcha_guess}/3 ---")
                 
-                captcha_text = self.solve_captcha_comprehensive_enhanced()
+                if self.captcha_prefetcher:
+                    captcha_text = self.captcha_prefetcher.result()
+                else:
+                    captcha_text = self.solve_captcha_comprehensive_enhanced()
                 
                 if not captcha_text:
                     print(f"Failed to solve captcha on guess {captcha_guess}")
-                    if captcha_guess < 3:
+                    if captcha_guess < 3 and self.captcha_prefetcher:
+                        self.captcha_prefetcher.prefetch(self.driver, refresh=True)
+                    elif captcha_guess < 3:
                         try:
                             refresh_button = self.driver.find_element(By.ID, "txtRefreshCaptcha")
                             refresh_button.click()
@@ -485,26 +560,40 @@ class SLCMScraper:
                     continue
                 
                 print(f"Entering enhanced consensus captcha: {captcha_text}")
-                captcha_field = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "txtCaptcha"))
-                )
+                captcha_field = self.wait_for_login_element('captcha')
                 captcha_field.clear()
                 captcha_field.send_keys(captcha_text)
                 print("✓ Captcha entered successfully")
                 time.sleep(1)
                 
                 print("Clicking login button...")
-                login_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.ID, "btnLogin"))
-                )
-            login_button.click()
+                login_button = self.wait_for_login_element('login_button', accept=clickable)
+                self.portal.before_login()
+                with self.portal.request():
+                    login_button.click()
                 print("✓ Login button clicked")
                 
+                # The wait is not a portal round trip; only its error page feeds the backoff
                 print("Waiting for login response...")
-                time.sleep(5)
-                
-                current_url = self.driver.current_url.lower()
-                page_source = self.driver.page_source.lower()
+                with self.portal.watch():
+                    if self.captcha_prefetcher:
+                        # Return as soon as the portal answers instead of a fixed 5s sleep. If the answer
+                        # carries a new captcha, its solve starts the moment it loads, before the answer is read
+                        def answered(driver):
+                            if captcha_guess < 3:
+                                self.captcha_prefetcher.start_if_new(driver)
+                            return ("loginform" not in driver.current_url.lower()
+                                    or any(e.text.strip() for e in driver.find_elements(By.ID, "labelerror")))
+                        try:
+                            WebDriverWait(self.driver, 10, poll_frequency=0.2).until(answered)
+                        except TimeoutException:
+                            pass
+                    else:
+                        time.sleep(5)
+                    
+                    current_url = self.driver.current_url.lower()
+                    page_source = self.driver.page_source.lower()
+                    raise_for_error_page(page_source)
                 
                 success_indicators = [
                     "studenthomepage.aspx" in current_url,
@@ -533,7 +622,10 @@ class SLCMScraper:
                     
                     if "captcha" in error_text.lower():
                         print(f"Enhanced captcha {captcha_guess}/3 failed, trying next guess...")
-                        if captcha_guess < 3:
+                        if captcha_guess < 3 and self.captcha_prefetcher:
+                            # The rejected postback already carries a new captcha: start on it right away
+                            self.captcha_prefetcher.prefetch(self.driver)
+                        elif captcha_guess < 3:
                             try:
                                 refresh_button = self.driver.find_element(By.ID, "txtRefreshCaptcha")
                                 refresh_button.click()
@@ -541,15 +633,59 @@ class SLCMScraper:
                             except:
                                 pass
                         continue
+                    elif is_credential_rejection(error_text):
+                        raise InvalidCredentialsError(f"Login failed: {error_text}")
                     else:
                         raise LoginError(f"Login failed: {error_text}")
             
-            raise LoginError(f"All 3 enhanced captcha guesses failed for login attempt {self.login_attempts}")
+            raise CaptchaError(f"All 3 enhanced captcha guesses failed for login attempt {self.login_attempts}")
                 
+        except LoginError as e:
+            logger.error(f"Enhanced login attempt {self.login_attempts} failed: {e}")
+            raise
         except Exception as e:
             logger.error(f"Enhanced login attempt {self.login_attempts} failed: {e}")
-            raise LoginError(f"Login error: {e}")
+            raise LoginError(f"Login error: {e}") from e
+        finally:
+            # The solver thread lives for one login attempt; a hung solve must not outlive it
+            if self.captcha_prefetcher:
+                self.captcha_prefetcher.shutdown()
+    
+    def wait_for_login_element(self, name, accept=present, timeout=10):
+        """Login form element via the selector cache, waiting up to timeout for it to appear"""
+        try:
+            return WebDriverWait(self.driver, timeout).until(
+                lambda driver: find_with_cache(driver, self.selectors, 'login', name,
+                                               LOGIN_LOCATORS[name], accept=accept)
+            )
+        except TimeoutException:
+            raise LoginError(f"Login form element '{name}' not found") from None
+    
+    def recover_for_retry(self, kind, error, attempt):
+        """Bring the browser back to a fresh login form, restarting it only if the session is gone"""
+        with self.captcha_lock:
+            self.captcha_attempts = []
+        
+        if kind == FailureKind.SESSION_LOST or not self.is_session_valid():
+            print("[DEBUG] Browser session lost, restarting driver...")
+            try:
+                self.close_browser()
+            except Exception:
+                pass
+            self.setup_driver()
+        
+        # A rejected captcha postback already renders a fresh login form with a new captcha
+        if kind == FailureKind.CAPTCHA and "loginform" in self.driver.current_url.lower():
+            return
+        
+        print("[DEBUG] Navigating back to login page for next attempt...")
+        self.open_portal_page(LOGIN_URL)
+        WebDriverWait(self.driver, PAGE_LOAD_TIMEOUT).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
     
+    @profile_stage('navigate')
+    @recorded_step('navigate')
     def navigate_to_gradesheet(self):
         """Navigate to grade sheet handling new tab opening"""
         try:
@@ -561,21 +697,19 @@ class SLCMScraper:
             all_windows_before = self.driver.window_handles
             print(f"Current windows before navigation: {len(all_windows_before)}")
             
-            # Wait for and click 'Academics Detail' - DISCOVERED ID: rtpchkMenu_lnkbtn2_1
-            academic_link = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.ID, "rtpchkMenu_lnkbtn2_1"))
-            )
-            academic_link.click()
-            print("✓ Clicked Academics Detail")
-            time.sleep(3)
-
-            print("Clicking Grade Sheet/Mark Sheet...")
+            # 'Academics Detail' (DISCOVERED ID: rtpchkMenu_lnkbtn2_1), then the 'Grade Sheet/Mark Sheet' link
+            print("Clicking Academics Detail, then Grade Sheet/Mark Sheet...")
             logger.info("Clicking Grade Sheet/Mark Sheet...")
+            gradesheet_link = self.menu_link(PAGE_EXTRACTORS['gradesheet'].menu)
+            self.gradesheet_response = None
+            if GRADESHEET_NAVIGATION == 'cdp':
+                navigator = CDPNavigator(self.driver)
+                navigator.reset()
+                with self.portal.request():
+                    gradesheet_link.click()
+                    print("✓ Clicked Grade Sheet/Mark Sheet")
+                    return self.follow_gradesheet_target(navigator, all_windows_before)
             
-            # Wait for and click 'Grade Sheet/Mark Sheet' link
-            gradesheet_link = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, "Grade Sheet/Mark Sheet"))
-            )
             gradesheet_link.click()
             print("✓ Clicked Grade Sheet/Mark Sheet")
             
@@ -639,9 +773,86 @@ class SLCMScraper:
             
             raise
     
+    # Shared page navigation (also used by page_extractors.py)
+    def menu_link(self, menu):
+        """
+        Click through a menu path of (by, value) locators and return the final, clickable link.
+        A menu whose next entry is already visible is left alone: clicking it again collapses it.
+        """
+        for (by, value), next_entry in zip(menu[:-1], menu[1:]):
+            if self.menu_entry_visible(next_entry):
+                continue
+            WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((by, value))).click()
+        return WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(menu[-1]))
+    
+    def menu_entry_visible(self, locator):
+        with no_implicit_wait(self.driver):
+            return any(element.is_displayed() for element in self.driver.find_elements(*locator))
+    
+    def find_page_target(self, navigator, windows_before, url_fragment, timeout=15):
+        """
+        (target_id, new_tab) for the page a click just opened: the new tab if one appeared,
+        otherwise the current tab when it already shows the page. Does not wait for loading.
+        """
+        target_id = navigator.wait_for_new_target(windows_before, timeout=timeout)
+        if target_id is not None:
+            return target_id, True
+        if url_fragment in self.driver.current_url.lower():
+            print(f"✓ Already on {url_fragment} page")
+            return self.driver.current_window_handle, False
+        raise Exception(f"{url_fragment} did not open in new tab and current page is not {url_fragment}")
+    
+    def wait_for_page(self, navigator, target_id, ready_js=GRADE_TABLE_READY_JS):
+        """Switch to target_id and return once ready_js holds or its network goes idle"""
+        self.driver.switch_to.window(target_id)
+        started = time.perf_counter()
+        reason = navigator.wait_until_ready(target_id, timeout=PAGE_LOAD_TIMEOUT, ready_js=ready_js)
+        print(f"Page ready ({reason or 'timeout'}) after {time.perf_counter() - started:.2f}s: {self.driver.current_url}")
+        return reason
+    
+    @profile_stage('pages')
+    @recorded_step('pages')
+    def extract_pages(self, names=None, keep_open=()):
+        """Collect the registered pages (see page_extractors.py) from the homepage in one pass"""
+        self.driver.switch_to.window(self.current_window)
+        self.pages = collect_pages(self, names, keep_open=keep_open)
+        return self.pages
+    
+    def follow_gradesheet_target(self, navigator, windows_before):
+        """Switch to the grade sheet tab as soon as it exists and return once its table is ready"""
+        target_id, new_tab = self.find_page_target(navigator, windows_before, 'gradesheet.aspx')
+        if new_tab:
+            self.gradesheet_window = target_id
+            print("✓ Switched to new tab")
+        self.wait_for_page(navigator, target_id)
+        
+        self.gradesheet_response = navigator.response_body(target_id, 'gradesheet.aspx')
+        if self.gradesheet_response:
+            print(f"✓ Captured GradeSheet.aspx response ({len(self.gradesheet_response)} chars)")
+        return True
+    
+    def gradesheet_source(self):
+        """
+        Grade sheet HTML: the captured server response if it already contains the grade table
+        (it does not when the table is filled in by a later postback), else the live DOM.
+        """
+        if self.gradesheet_response and CGPA_LABEL.search(self.gradesheet_response):
+            source = self.gradesheet_response
+        else:
+            source = self.driver.page_source
+        if self.recorder:
+            self.recorder.page('gradesheet', source, self.driver.current_url)
+        return source
+    
     # COMPREHENSIVE CGPA EXTRACTION METHODS FOR NEW TAB
-    def extract_cgpa_from_gradesheet_tab(self):
-        """Extract CGPA from the grade sheet tab using multiple strategies"""
+    @profile_stage('extract_cgpa')
+    @recorded_step('extract_cgpa')
+    def extract_cgpa_from_gradesheet_tab(self, parsed=None):
+        """
+        Extract CGPA from the grade sheet tab. The DOM strategies run together as one reading of the
+        page, checked against the recomputed CGPA (see cgpa_verification.py); OCR, vision and the LLM
+        fallback run only until an independent source confirms a value.
+        """
         try:
             print("Starting CGPA extraction from grade sheet tab...")
             
@@ -649,31 +860,34 @@ class SLCMScraper:
             self.driver.save_screenshot("gradesheet_tab_debug.png")
             print("Debug screenshot saved: gradesheet_tab_debug.png")
             
-            # Strategy 1: Direct element targeting
-            cgpa = self.extract_cgpa_targeted()
-            if cgpa:
-                return cgpa
+            verifier = CGPAVerifier(recomputed=recompute_cgpa(parsed))
+            if parsed and parsed.cgpa:
+                verifier.add('parsed', parsed.cgpa)
             
-            # Strategy 2: Table-based extraction
-            cgpa = self.extract_cgpa_from_table()
-            if cgpa:
-                return cgpa
-            
-            # Strategy 3: OCR on specific sections
-            cgpa = self.extract_cgpa_focused_ocr()
-            if cgpa:
-                return cgpa
-                
-            # Strategy 4: Vision model extraction
-            cgpa = self.extract_cgpa_with_vision()
-            if cgpa:
-                return cgpa
-            
-            # Strategy 5: Screenshot + LLM fallback
-            print("All direct methods failed, using screenshot + LLM fallback...")
-            cgpa = self.extract_cgpa_screenshot_llm_fallback()
-            if cgpa:
-                return cgpa
+            tiers = [
+                [('targeted', self.extract_cgpa_targeted), ('table', self.extract_cgpa_from_table)],
+                [('ocr', self.extract_cgpa_focused_ocr)],
+                [('vision', self.extract_cgpa_with_vision)],
+                [('llm', self.extract_cgpa_screenshot_llm_fallback)],
+            ]
+            verdict = None
+            for tier in tiers:
+                for source, strategy in tier:
+                    verifier.add(source, strategy())
+                verdict = verifier.verdict()
+                print(f"CGPA {verifier.summary()}")
+                if verdict and verdict.verified:
+                    print(f"✓ CGPA {verdict.value} verified by {verdict.reason} "
+                          f"({', '.join(verdict.sources)}; confidence {verdict.confidence})")
+                    self.cgpa_verdict = verdict
+                    return verdict.value
+            
+            if verdict:
+                # Nothing agreed; keep the best supported value but flag it
+                logger.warning(f"Unverified CGPA {verdict.value} ({verdict.reason}); {verifier.summary()}")
+                print(f"⚠ CGPA {verdict.value} could not be verified ({verdict.reason}, confidence {verdict.confidence})")
+                self.cgpa_verdict = verdict
+                return verdict.value
             
             print("All CGPA extraction strategies failed")
             return None
@@ -687,60 +901,13 @@ class SLCMScraper:
         try:
             print("Attempting targeted CGPA extraction...")
             
-            # Enhanced search strategies for grade sheet page
-            cgpa_strategies = [
-                # Direct CGPA text search
-                (By.XPATH, "//*[contains(text(), 'CGPA') or contains(text(), 'cgpa')]"),
-                (By.XPATH, "//*[contains(text(), 'Cumulative') or contains(text(), 'cumulative')]"),
-                (By.XPATH, "//*[contains(text(), 'Grade Point Average')]"),
-                
-                # Common grade sheet element patterns
-                (By.XPATH, "//td[contains(text(), 'CGPA')]/following-sibling::td"),
-                (By.XPATH, "//th[contains(text(), 'CGPA')]/following-sibling::th"),
-                (By.XPATH, "//label[contains(text(), 'CGPA')]/following-sibling::*"),
-                
-                # Summary/total row patterns
-                (By.XPATH, "//tr[contains(@class, 'total') or contains(@class, 'summary')]//td"),
-                (By.XPATH, "//tr[last()]//td"),  # Often CGPA is in the last row
-                (By.XPATH, "//tfoot//td"),  # Footer often contains totals
-                
-                # Generic patterns for grade sheets
-                (By.XPATH, "//span[contains(text(), '.') and string-length(text()) < 10]"),
-                (By.XPATH, "//div[contains(text(), '.') and string-length(text()) < 20]"),
-                (By.XPATH, "//strong[contains(text(), '.')]"),
-                (By.XPATH, "//b[contains(text(), '.')]")
-            ]
-            
-            for strategy_name, locator_type, locator_value in [
-                ("CGPA Text", By.XPATH, "//*[contains(text(), 'CGPA')]"),
-                ("CGPA Cell Following", By.XPATH, "//td[contains(text(), 'CGPA')]/following-sibling::td"),
-                ("Last Row Cells", By.XPATH, "//tr[last()]//td"),
-                ("Summary Spans", By.XPATH, "//span[contains(text(), '.')]")
-            ]:
-                try:
-                    elements = self.driver.find_elements(locator_type, locator_value)
-                    for element in elements:
-                        text = element.text.strip()
-                        if text:
-                            # Look for CGPA values
-                            cgpa_matches = re.findall(r'(\d+\.\d+)', text)
-                            for match in cgpa_matches:
-                                cgpa_value = float(match)
-                                if 0.0 <= cgpa_value <= 10.0:
-                                    # Validate by checking context
-                                    text_lower = text.lower()
-                                    element_context = f"{element.get_attribute('outerHTML')[:200]}"
-                                    
-                                    if any(keyword in text_lower for keyword in ['cgpa', 'cumulative', 'gpa', 'grade point']):
-                                        print(f"✓ Targeted extraction found CGPA: {cgpa_value} using {strategy_name}")
-                                        print(f"  Context: {text}")
-                                        return cgpa_value
-                                    elif any(keyword in element_context.lower() for keyword in ['cgpa', 'cumulative', 'total']):
-                                        print(f"✓ Targeted extraction found CGPA: {cgpa_value} using {strategy_name} (context match)")
-                                        print(f"  Context: {text}")
-                                        return cgpa_value
-                except Exception as e:
-                    continue
+            # Cached locator from the profiler or an earlier run, then the broad scan
+            cgpa_value = find_with_cache(self.driver, self.selectors, 'gradesheet', 'cgpa',
+                                         BROAD_CGPA_LOCATORS, accept=cgpa_from_element)
+            if cgpa_value is not None:
+                entry = self.selectors.get('gradesheet', 'cgpa')
+                print(f"✓ Targeted extraction found CGPA: {cgpa_value} using {entry['label'] if entry else 'scan'}")
+                return cgpa_value
             
             return None
             
@@ -762,7 +929,7 @@ class SLCMScraper:
                     table_text = table.text.lower()
                     
                     # Check if table contains grade-related content
-                    if any(keyword in table_text for keyword in ['cgpa', 'gpa', 'cumulative', 'grade', 'total']):
+                    if GRADE_TABLE.search(table_text):
                         print(f"Analyzing table {i+1} for CGPA...")
                         
                         # Get all cells
@@ -772,37 +939,34 @@ class SLCMScraper:
                             cell_text = cell.text.strip()
                             if cell_text:
                                 # Look for CGPA patterns
-                                cgpa_matches = re.findall(r'(\d+\.\d+)', cell_text)
-                                for match in cgpa_matches:
-                                    cgpa_value = float(match)
-                                    if 0.0 <= cgpa_value <= 10.0:
-                                        # Check if this cell or nearby cells mention CGPA
-                                        cell_context = cell_text.lower()
+                                for cgpa_value in decimals_in_range(cell_text):
+                                    # Check if this cell or nearby cells mention CGPA
+                                    cell_context = cell_text.lower()
+                                    
+                                    # Check previous and next cells for context
+                                    try:
+                                        prev_cell = cells[j-1] if j > 0 else None
+                                        next_cell = cells[j+1] if j < len(cells)-1 else None
+                                        
+                                        prev_text = prev_cell.text.lower() if prev_cell else ""
+                                        next_text = next_cell.text.lower() if next_cell else ""
                                         
-                                        # Check previous and next cells for context
-                                        try:
-                                            prev_cell = cells[j-1] if j > 0 else None
-                                            next_cell = cells[j+1] if j < len(cells)-1 else None
-                                            
-                                            prev_text = prev_cell.text.lower() if prev_cell else ""
-                                            next_text = next_cell.text.lower() if next_cell else ""
-                                            
-                                            context_text = f"{prev_text} {cell_context} {next_text}"
-                                            
-                                            if any(keyword in context_text for keyword in ['cgpa', 'cumulative', 'gpa', 'grade point']):
-                                                print(f"✓ Table extraction found CGPA: {cgpa_value}")
-                                                print(f"  Table: {i+1}, Cell: {j+1}")
-                                                print(f"  Context: {context_text}")
-                                                return cgpa_value
-                                        except:
-                                            pass
+                                        context_text = f"{prev_text} {cell_context} {next_text}"
                                         
-                                        # Also check if it's in a summary/total row
-                                        row = cell.find_element(By.XPATH, "./ancestor::tr[1]")
-                                        row_text = row.text.lower()
-                                        if any(keyword in row_text for keyword in ['total', 'summary', 'overall', 'cgpa']):
-                                            print(f"✓ Table extraction found CGPA in summary row: {cgpa_value}")
+                                        if has_cgpa_context(context_text):
+                                            print(f"✓ Table extraction found CGPA: {cgpa_value}")
+                                            print(f"  Table: {i+1}, Cell: {j+1}")
+                                            print(f"  Context: {context_text}")
                                             return cgpa_value
+                                    except:
+                                        pass
+                                    
+                                    # Also check if it's in a summary/total row
+                                    row = cell.find_element(By.XPATH, "./ancestor::tr[1]")
+                                    row_text = row.text.lower()
+                                    if SUMMARY_ROW.search(row_text):
+                                        print(f"✓ Table extraction found CGPA in summary row: {cgpa_value}")
+                                        return cgpa_value
                 except Exception as e:
                     continue
             
@@ -827,32 +991,22 @@ class SLCMScraper:
             enhanced = enhancer.enhance(2.0)
             
             # OCR with focus on CGPA
-            text = pytesseract.image_to_string(
-                enhanced,
-                config=r'--oem 3 --psm 6'
-            ).strip()
+            ocr_service = get_ocr_service()
+            if ocr_service:
+                text = ocr_service.submit_text(np.asarray(enhanced.convert('L')), r'--oem 3 --psm 6').result().strip()
+            else:
+                text = ocr_backend.image_to_string(
+                    enhanced,
+                    config=r'--oem 3 --psm 6'
+                ).strip()
             
             print(f"OCR extracted text length: {len(text)} characters")
             
             # Look for CGPA patterns in the text
-            cgpa_patterns = [
-                r'CGPA[:\s]*(\d+\.\d+)',
-                r'cgpa[:\s]*(\d+\.\d+)', 
-                r'Cumulative[:\s]*Grade[:\s]*Point[:\s]*Average[:\s]*(\d+\.\d+)',
-                r'Cumulative[:\s]*(\d+\.\d+)',
-                r'Total[:\s]*CGPA[:\s]*(\d+\.\d+)'
-            ]
-            
-            for pattern in cgpa_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        cgpa_value = float(match)
-                        if 0.0 <= cgpa_value <= 10.0:
-                            print(f"✓ Focused OCR found CGPA: {cgpa_value}")
-                            return cgpa_value
-                    except:
-                        continue
+            match = find_cgpa(text)
+            if match:
+                print(f"✓ Focused OCR found CGPA: {match.value} ({match.label}, confidence {match.confidence})")
+                return match.value
             
             # Cleanup
             try:
@@ -869,43 +1023,28 @@ class SLCMScraper:
     def extract_cgpa_with_vision(self):
         """Use Ollama vision to identify CGPA in the grade sheet"""
         try:
-            if not self.ollama_available:
+            if not (self.ollama_available and self.vision.available):
                 return None
             
             print("Attempting vision model CGPA extraction...")
                 
-            # Screenshot the grade sheet page
-            self.driver.save_screenshot("gradesheet_vision.png")
-            
-            enhanced_prompts = [
-                "Look at this grade sheet image. Find the CGPA (Cumulative Grade Point Average) value. It should be a decimal number between 0.0 and 10.0, like 8.74 or 9.25. Return only the CGPA number.",
-                "This is a student grade sheet. Locate the Cumulative GPA or CGPA value displayed somewhere on this page. Return just the decimal number.",
-                "Examine this academic grade sheet. Find the overall CGPA value which should be a number like 8.45 or 9.12. Give me only that number.",
-                "Look for the total CGPA or cumulative grade point average in this grade sheet. Return only the numerical value.",
-                "This grade sheet shows academic performance. Find the CGPA value and return only that decimal number."
-            ]
+            # Just the grade table, at the model's input size (see screenshot_capture.py)
+            capture = capture_grade_table(self.driver, self.vision.input_size('cgpa'))
+            save_capture(capture, "gradesheet_vision")
+            print(f"Vision screenshot: {capture.width}x{capture.height} {capture.format}, {len(capture.data) / 1024:.1f} KB")
+            
+            enhanced_prompts = self.vision.prompts('cgpa')
             
             for i, prompt in enumerate(enhanced_prompts):
                 try:
-                    response = ollama.chat(
-                        model=self.vision_model,
-                        messages=[{
-                            'role': 'user',
-                            'content': prompt,
-                            'images': ['gradesheet_vision.png']
-                        }],
-                        options={'temperature': 0.1}
-                    )
-                    
-                    result = response['message']['content'].strip()
+                    # Goes through the shared batcher so concurrent scrapers share model calls
+                    result = self.vision.submit('cgpa', prompt, capture.data).result()
                     
                     # Extract decimal number from response
-                    cgpa_matches = re.findall(r'(\d+\.\d+)', result)
-                    for match in cgpa_matches:
-                        cgpa_value = float(match)
-                        if 0.0 <= cgpa_value <= 10.0:
-                            print(f"✓ Vision model extracted CGPA: {cgpa_value}")
-                            return cgpa_value
+                    match = parse_model_answer(result)
+                    if match:
+                        print(f"✓ Vision model extracted CGPA: {match.value}")
+                        return match.value
                             
                 except Exception as e:
                     print(f"Vision prompt {i+1} failed: {e}")
@@ -922,59 +1061,26 @@ class SLCMScraper:
         try:
             print("Using screenshot + LLM fallback method...")
             
-            if not self.ollama_available:
+            if not (self.ollama_available and self.vision.available):
                 print("Ollama not available for LLM fallback")
                 return None
             
-            # Take a high-quality screenshot
-            screenshot_path = "gradesheet_llm_fallback.png"
-            self.driver.save_screenshot(screenshot_path)
+            # Grade table at the fallback model's input size
+            capture = capture_grade_table(self.driver, self.vision.input_size('cgpa_fallback'))
+            save_capture(capture, "gradesheet_llm_fallback")
             
-            # Enhanced prompt for LLM fallback
-            fallback_prompt = """You are looking at a student grade sheet from SLCM (Student Life Cycle Management) portal. 
-
-This image contains academic performance data including subjects, grades, credits, and importantly, the CGPA (Cumulative Grade Point Average).
-
-Your task is to find and extract ONLY the CGPA value from this grade sheet. The CGPA is typically:
-- A decimal number between 0.0 and 10.0 (like 8.74, 9.25, 7.89, etc.)
-- Labeled as "CGPA", "Cumulative GPA", "Cumulative Grade Point Average", or similar
-- Usually displayed prominently in a summary section
-- Often found at the bottom or in a totals row
-
-Look carefully at the image and identify the CGPA value. Respond with ONLY the numerical CGPA value, nothing else. For example, if you see CGPA: 8.74, respond with just: 8.74"""
+            # Model-specific prompt for LLM fallback
+            fallback_prompt = self.vision.prompts('cgpa_fallback')[0]
             
             try:
-                response = ollama.chat(
-                    model=self.vision_model,
-                    messages=[{
-                        'role': 'user',
-                        'content': fallback_prompt,
-                        'images': [screenshot_path]
-                    }],
-                    options={'temperature': 0.0}  # Most deterministic
-                )
-                
-                result = response['message']['content'].strip()
+                result = self.vision.ask('cgpa_fallback', fallback_prompt, [capture.data])
                 print(f"LLM fallback response: '{result}'")
                 
                 # Extract decimal number from response
-                cgpa_match = re.search(r'(\d+\.\d+)', result)
-                if cgpa_match:
-                    cgpa_value = float(cgpa_match.group(1))
-                    if 0.0 <= cgpa_value <= 10.0:
-                        print(f"✓ LLM fallback extracted CGPA: {cgpa_value}")
-                        return cgpa_value
-                
-                # If no decimal found, try to extract any number that could be CGPA
-                number_matches = re.findall(r'(\d+\.?\d*)', result)
-                for match in number_matches:
-                    try:
-                        value = float(match)
-                        if 0.0 <= value <= 10.0 and '.' in match:  # Must be decimal
-                            print(f"✓ LLM fallback extracted CGPA (alternative): {value}")
-                            return value
-                    except:
-                        continue
+                match = parse_model_answer(result)
+                if match:
+                    print(f"✓ LLM fallback extracted CGPA: {match.value}")
+                    return match.value
                 
                 print("LLM fallback could not extract valid CGPA")
                 return None
@@ -988,31 +1094,16 @@ Look carefully at the image and identify the CGPA value. Respond with ONLY the n
             return None
     
     def parse_cgpa_from_text(self, text):
-        """Parse CGPA from extracted text using multiple patterns"""
-        patterns = [
-            r'CGPA[:\s]*(\d+\.\d+)',
-            r'cgpa[:\s]*(\d+\.\d+)',
-            r'Cumulative[:\s]*Grade[:\s]*Point[:\s]*Average[:\s]*(\d+\.\d+)',
-            r'Cumulative[:\s]*(\d+\.\d+)',
-            r'Overall[:\s]*(\d+\.\d+)',
-            r'Grade[:\s]*Point[:\s]*Average[:\s]*(\d+\.\d+)',
-            r'Total[:\s]*CGPA[:\s]*(\d+\.\d+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                cgpa = float(match.group(1))
-                    if 0.0 <= cgpa <= 10.0:
-                        logger.info(f"Successfully extracted CGPA: {cgpa}")
-                    return cgpa
-                except ValueError:
-                    continue
+        """Parse CGPA from extracted text (see cgpa_patterns.py)"""
+        match = find_cgpa(text)
+        if match:
+            logger.info(f"Successfully extracted CGPA: {match.value} ({match.label}, confidence {match.confidence})")
+            return match.value
         
         logger.warning("Could not find valid CGPA in extracted text")
         return None
     
+    @profiled_run('scrape')
     def run_scraper(self):
         """Main method to run the scraper with new tab handling"""
         try:
@@ -1020,39 +1111,46 @@ Look carefully at the image and identify the CGPA value. Respond with ONLY the n
             logger.info("Starting Enhanced SLCM CGPA Scraper with New Tab Navigation...")
             
             # Navigate to login page
+            print("[DEBUG] Waiting for a portal session slot...")
+            self.portal.open_session(self.username)
             print("[DEBUG] Navigating to login page...")
-            self.driver.get(LOGIN_URL)
+            self.open_portal_page(LOGIN_URL)
+            self.report_startup()
             print("[DEBUG] Reached login page")
+            if self.recorder:
+                self.recorder.page('login', self.driver.page_source, self.driver.current_url)
             time.sleep(5)
             
             # Take screenshot for debugging
             self.driver.save_screenshot("login_page.png")
             print("[DEBUG] Saved screenshot of login page")
             
-            # Try login up to 3 times
+            # Known-bad credentials would only burn retries (and risk a lockout)
+            if credential_guard.is_blocked(self.username):
+                raise InvalidCredentialsError(f"Credentials for {self.username[:3]}*** were rejected earlier, skipping")
+            
+            # Retry only retryable failures, with backoff, reusing the browser where possible
             login_successful = False
+            login_policy = RetryPolicy(
+                max_attempts=LOGIN_MAX_ATTEMPTS,
+                base_delay=RETRY_BASE_DELAY,
+                max_delay=RETRY_MAX_DELAY,
+                budget_seconds=RETRY_BUDGET_SECONDS,
+            )
             
-            while self.login_attempts < 3 and not login_successful:
-                try:
-                    print(f"\n[DEBUG] Attempting enhanced login {self.login_attempts + 1}/3...")
-                    self.login()
-                    login_successful = True
-                    print("[DEBUG] Enhanced login successful!")
-                    
-                except LoginError as e:
-                    print(f"[DEBUG] Enhanced login attempt {self.login_attempts} failed: {e}")
-                    if self.login_attempts >= 3:
-                        break
-                    
-                    # Reset captcha attempts for next login attempt
-                    self.captcha_attempts = []
-                    
-                    # Navigate back to login page for next attempt
-                    print("[DEBUG] Navigating back to login page for next attempt...")
-                    self.driver.get(LOGIN_URL)
-                    time.sleep(3)
+            try:
+                login_policy.run(self.login, on_retry=self.recover_for_retry)
+                login_successful = True
+                print("[DEBUG] Enhanced login successful!")
+            except InvalidCredentialsError as e:
+                credential_guard.mark_bad(self.username, str(e))
+                raise
+            except LoginError as e:
+                print(f"[DEBUG] Enhanced login attempt {self.login_attempts} failed: {e}")
             
             if not login_successful:
+                if not self.interactive:
+                    raise LoginError(f"All {self.login_attempts} login attempts failed")
                 print("[DEBUG] All enhanced login attempts failed, requesting manual login...")
                 print("=== MANUAL LOGIN REQUIRED ===")
                 print("All automatic login attempts have failed.")
@@ -1067,16 +1165,47 @@ Look carefully at the image and identify the CGPA value. Respond with ONLY the n
                 print("✓ Manual login verified successfully")
                 self.current_window = self.driver.current_window_handle
             
-            # Navigate to grade sheet (with new tab handling)
-            print("[DEBUG] Navigating to grade sheet with new tab support...")
-            self.navigate_to_gradesheet()
+            # Other pages load in tabs alongside the grade sheet, which is kept open for CGPA extraction
+            gradesheet_tab = None
+            if EXTRA_PAGES:
+                pages = ['gradesheet'] + [name for name in EXTRA_PAGES if name != 'gradesheet']
+                print(f"[DEBUG] Collecting pages in parallel tabs: {', '.join(pages)}")
+                self.extract_pages(pages, keep_open=('gradesheet',))
+                gradesheet_tab = self.tabs.get('gradesheet')
+            
+            if gradesheet_tab:
+                self.gradesheet_window = gradesheet_tab.handle
+                self.gradesheet_response = None
+                self.driver.switch_to.window(gradesheet_tab.handle)
+            else:
+                # Navigate to grade sheet (with new tab handling)
+                print("[DEBUG] Navigating to grade sheet with new tab support...")
+                self.navigate_to_gradesheet()
+            
+            # Skip extraction entirely when the grade sheet has not changed since the last run
+            page_source = self.gradesheet_source()
+            if self.change_detector and self.change_detector.is_unchanged(self.username, page_source):
+                cgpa = self.change_detector.previous_cgpa(self.username)
+                self.last_changes = []
+                print(f"✓ Grade sheet unchanged since last run, skipping extraction. CGPA: {cgpa}")
+                return cgpa
             
-            # Extract CGPA from the new tab
+            # Extract CGPA from the new tab, cross-checked against the parsed semester rows
             print("[DEBUG] Extracting CGPA from grade sheet tab...")
-            cgpa = self.extract_cgpa_from_gradesheet_tab()
+            result = parse_gradesheet(page_source, student_id=self.username)
+            cgpa = self.extract_cgpa_from_gradesheet_tab(parsed=result)
             
             if cgpa:
                 print(f"[DEBUG] Successfully extracted CGPA: {cgpa}")
+                if self.change_detector or self.result_store:
+                    result.cgpa = cgpa
+                    if self.change_detector:
+                        self.last_changes = self.change_detector.record(self.username, page_source, result)
+                        for change in self.last_changes:
+                            print(f"  Change: {change}")
+                    if self.result_store:
+                        self.result_store.write(result)
+                        print(f"✓ Result saved to {RESULT_DB_PATH}")
                 return cgpa
             else:
                 print("[DEBUG] Failed to extract CGPA with all methods")
@@ -1088,10 +1217,22 @@ Look carefully at the image and identify the CGPA value. Respond with ONLY the n
             raise
         
         finally:
+            self.portal.close_session(self.username)
+            if self.result_store:
+                self.result_store.close()
+                self.result_store = None
+            if self.recorder:
+                try:
+                    self.recorder.save()
+                except Exception as e:
+                    logger.warning(f"Saving session recording failed: {e}")
+            if self.captcha_prefetcher:
+                self.captcha_prefetcher.shutdown()
             if self.driver:
                 try:
-                    input("Press Enter to close the browser...")
-                self.driver.quit()
+                    if self.interactive:
+                        input("Press Enter to close the browser...")
+                    self.close_browser()
                     print("[DEBUG] Driver cleanup completed")
                 except Exception as cleanup_error:
                     print(f"[DEBUG] Driver cleanup error: {cleanup_error}")
@@ -1114,7 +1255,7 @@ if __name__ == "__main__":
     finally:
         if scraper and hasattr(scraper, 'driver') and scraper.driver:
             try:
-                scraper.driver.quit()
+                scraper.close_browser()
                 print("[DEBUG] Final driver cleanup completed")
             except Exception as cleanup_error:
                 print(f"[DEBUG] Final cleanup error: {cleanup_error}")
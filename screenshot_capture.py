@@ -0,0 +1,125 @@
+# screenshot_capture.py
+# Screenshots for the vision models: only the grade table, rendered by Chrome at the model's input
+# size and encoded as JPEG/WebP, instead of a full-window PNG
+import time
+import base64
+import logging
+import threading
+from dataclasses import dataclass
+from config import SCREENSHOT_FORMAT, SCREENSHOT_QUALITY, SCREENSHOT_PADDING
+
+logger = logging.getLogger(__name__)
+
+# Page-coordinate box of the smallest table mentioning the CGPA (the summary, not the page layout
+# table around it), or null when there is none
+GRADE_TABLE_RECT_JS = """
+var best = null;
+var tables = document.getElementsByTagName('table');
+for (var i = 0; i < tables.length; i++) {
+    if (!/C\\.?\\s*G\\.?\\s*P\\.?\\s*A/i.test(tables[i].innerText)) { continue; }
+    var r = tables[i].getBoundingClientRect();
+    if (r.width < 1 || r.height < 1) { continue; }
+    if (best === null || r.width * r.height < best.width * best.height) {
+        best = {x: r.left + window.scrollX, y: r.top + window.scrollY, width: r.width, height: r.height};
+    }
+}
+return best;
+"""
+
+
+@dataclass
+class Capture:
+    data: bytes
+    format: str
+    width: int  # encoded image size in pixels
+    height: int
+    source_width: int  # CSS pixels of the captured region before downscaling
+    source_height: int
+    element: bool  # False when the visible viewport was captured instead of the grade table
+    seconds: float
+
+    @property
+    def decoded_bytes(self):
+        """Memory the image takes once decoded to RGB (what the model server holds per image)"""
+        return self.width * self.height * 3
+
+
+class CaptureStats:
+    """Running totals of capture sizes, for spotting oversized screenshots"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.captures = 0
+        self.encoded_bytes = 0
+        self.decoded_bytes = 0
+        self.largest = 0
+
+    def add(self, capture):
+        with self.lock:
+            self.captures += 1
+            self.encoded_bytes += len(capture.data)
+            self.decoded_bytes += capture.decoded_bytes
+            self.largest = max(self.largest, len(capture.data))
+
+    def summary(self):
+        with self.lock:
+            return {'captures': self.captures, 'encoded_kb': round(self.encoded_bytes / 1024, 1),
+                    'decoded_mb': round(self.decoded_bytes / 1024 / 1024, 2), 'largest_kb': round(self.largest / 1024, 1)}
+
+
+capture_stats = CaptureStats()
+
+
+def _viewport(driver):
+    metrics = driver.execute_cdp_cmd('Page.getLayoutMetrics', {})
+    viewport = metrics.get('cssVisualViewport') or metrics['layoutViewport']
+    return {'x': viewport.get('pageX', 0), 'y': viewport.get('pageY', 0),
+            'width': viewport['clientWidth'], 'height': viewport['clientHeight']}
+
+
+def capture_grade_table(driver, max_side, image_format=SCREENSHOT_FORMAT, quality=SCREENSHOT_QUALITY,
+                        padding=SCREENSHOT_PADDING):
+    """
+    Screenshot of the grade table (the visible viewport if there is none) whose longest side is at
+    most max_side pixels. Chrome crops, scales and encodes the image itself, so no full-size
+    bitmap is ever transferred or decoded here.
+    """
+    started = time.perf_counter()
+    rect = driver.execute_script(GRADE_TABLE_RECT_JS)
+    element = rect is not None
+    if element:
+        rect = {'x': max(rect['x'] - padding, 0), 'y': max(rect['y'] - padding, 0),
+                'width': rect['width'] + 2 * padding, 'height': rect['height'] + 2 * padding}
+    else:
+        logger.info("Grade table not found, capturing the viewport")
+        rect = _viewport(driver)
+
+    # clip.scale multiplies the device pixel ratio, so divide it out to get max_side image pixels
+    pixel_ratio = driver.execute_script("return window.devicePixelRatio") or 1
+    scale = min(1.0, max_side / max(rect['width'], rect['height'])) / pixel_ratio
+    params = {
+        'format': image_format,
+        'clip': {**rect, 'scale': scale},
+        'captureBeyondViewport': True,  # the table may extend below the fold
+        'fromSurface': True,
+    }
+    if image_format in ('jpeg', 'webp'):
+        params['quality'] = quality
+    data = base64.b64decode(driver.execute_cdp_cmd('Page.captureScreenshot', params)['data'])
+
+    pixels = scale * pixel_ratio
+    capture = Capture(data, image_format, round(rect['width'] * pixels), round(rect['height'] * pixels),
+                      round(rect['width']), round(rect['height']), element, time.perf_counter() - started)
+    capture_stats.add(capture)
+    logger.info(f"Captured {'grade table' if element else 'viewport'} {capture.source_width}x{capture.source_height} "
+                f"-> {capture.width}x{capture.height} {image_format}, {len(data) / 1024:.1f} KB "
+                f"in {capture.seconds:.2f}s")
+    return capture
+
+
+def save_capture(capture, stem):
+    """Write a capture to <stem>.<format> for debugging and return the path"""
+    path = f"{stem}.{'jpg' if capture.format == 'jpeg' else capture.format}"
+    with open(path, 'wb') as f:
+        f.write(capture.data)
+    return path
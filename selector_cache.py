@@ -0,0 +1,208 @@
+# selector_cache.py
+# Locators learned by the discovery profilers (or by a runtime fallback scan), tried first on every run
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from selenium.webdriver.common.by import By
+from config import SELECTOR_CACHE_PATH, IMPLICIT_WAIT
+from cgpa_patterns import find_cgpa, decimals_in_range, MARKUP_CONTEXT, NOT_CGPA_CONTEXT
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_CACHE_VERSION = 1
+
+# (label, by, value) in the order they are tried when nothing is cached
+LOGIN_LOCATORS = {
+    'username': [
+        ("ID txtUserid", By.ID, "txtUserid"),
+        ("ID txtUserId", By.ID, "txtUserId"),
+        ("Name txtUserid", By.NAME, "txtUserid"),
+        ("ID username", By.ID, "username"),
+        ("User text input", By.CSS_SELECTOR, "input[type='text'][id*='user' i]"),
+    ],
+    'password': [
+        ("ID txtpassword", By.ID, "txtpassword"),
+        ("ID txtPassword", By.ID, "txtPassword"),
+        ("ID password", By.ID, "password"),
+        ("Password input", By.CSS_SELECTOR, "input[type='password']"),
+    ],
+    'captcha': [
+        ("ID txtCaptcha", By.ID, "txtCaptcha"),
+        ("ID captcha", By.ID, "captcha"),
+        ("Captcha text input", By.CSS_SELECTOR, "input[type='text'][id*='captcha' i]"),
+    ],
+    'login_button': [
+        ("ID btnLogin", By.ID, "btnLogin"),
+        ("ID login", By.ID, "login"),
+        ("Submit input", By.CSS_SELECTOR, "input[type='submit']"),
+        ("Submit button", By.CSS_SELECTOR, "button[type='submit']"),
+    ],
+}
+
+# Every CGPA locator the profiler evaluates
+CGPA_LOCATORS = [
+    ("CGPA Text", By.XPATH, "//*[contains(text(), 'CGPA')]"),
+    ("CGPA Cell Following", By.XPATH, "//td[contains(text(), 'CGPA')]/following-sibling::td"),
+    ("Last Row Cells", By.XPATH, "//tr[last()]//td"),
+    ("Summary Spans", By.XPATH, "//span[contains(text(), '.')]"),
+    ("CGPA Any Case", By.XPATH, "//*[contains(text(), 'CGPA') or contains(text(), 'cgpa')]"),
+    ("Cumulative Text", By.XPATH, "//*[contains(text(), 'Cumulative') or contains(text(), 'cumulative')]"),
+    ("Grade Point Average Text", By.XPATH, "//*[contains(text(), 'Grade Point Average')]"),
+    ("CGPA Header Following", By.XPATH, "//th[contains(text(), 'CGPA')]/following-sibling::th"),
+    ("CGPA Label Following", By.XPATH, "//label[contains(text(), 'CGPA')]/following-sibling::*"),
+    ("Summary Row Cells", By.XPATH, "//tr[contains(@class, 'total') or contains(@class, 'summary')]//td"),
+    ("Footer Cells", By.XPATH, "//tfoot//td"),
+    ("Short Decimal Spans", By.XPATH, "//span[contains(text(), '.') and string-length(text()) < 10]"),
+    ("Short Decimal Divs", By.XPATH, "//div[contains(text(), '.') and string-length(text()) < 20]"),
+    ("Decimal Strong", By.XPATH, "//strong[contains(text(), '.')]"),
+    ("Decimal Bold", By.XPATH, "//b[contains(text(), '.')]"),
+    ("CGPA Id", By.XPATH, "//*[contains(@id, 'cgpa') or contains(@id, 'CGPA')]"),
+    ("CGPA Same Element", By.XPATH, "//*[contains(text(), 'CGPA') and contains(text(), '.')]"),
+]
+
+# The cheap subset scanned at runtime when the cached locator misses
+BROAD_CGPA_LOCATORS = CGPA_LOCATORS[:4]
+
+
+def cgpa_from_element(element):
+    """
+    CGPA in an element's text: a labelled value first, otherwise an unlabelled decimal whose
+    markup mentions the CGPA. Text about SGPA, semesters or credits is never read as the CGPA.
+    """
+    text = element.text.strip()
+    if not text:
+        return None
+    match = find_cgpa(text)
+    if match:
+        return match.value
+    if NOT_CGPA_CONTEXT.search(text):
+        return None
+    values = decimals_in_range(text)
+    if values and MARKUP_CONTEXT.search((element.get_attribute('outerHTML') or '')[:200]):
+        return values[0]
+    return None
+
+
+def present(element):
+    return element
+
+
+def clickable(element):
+    return element if element.is_displayed() and element.is_enabled() else None
+
+
+@contextmanager
+def no_implicit_wait(driver):
+    """Misses during a scan should cost nothing, not IMPLICIT_WAIT seconds each"""
+    driver.implicitly_wait(0)
+    try:
+        yield
+    finally:
+        driver.implicitly_wait(IMPLICIT_WAIT)
+
+
+class SelectorCache:
+    """
+    JSON file of page -> name -> locator. An entry is replaced only when it stops matching;
+    each replacement bumps the entry's revision and keeps the previous locator for reference.
+    """
+
+    def __init__(self, path=SELECTOR_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pages = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if data.get('version') != SELECTOR_CACHE_VERSION:
+            logger.info(f"Ignoring selector cache version {data.get('version')} (expected {SELECTOR_CACHE_VERSION})")
+            return {}
+        return data.get('pages', {})
+
+    def save(self):
+        with self.lock:
+            data = {'version': SELECTOR_CACHE_VERSION, 'pages': self.pages}
+            temp_path = None
+            try:
+                # A temp file of our own: other scraper processes save the same cache concurrently
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(os.path.abspath(self.path)),
+                                                 prefix=f"{os.path.basename(self.path)}.", suffix='.tmp',
+                                                 delete=False) as f:
+                    temp_path = f.name
+                    json.dump(data, f, indent=2)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save selector cache: {e}")
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def get(self, page, name):
+        return self.pages.get(page, {}).get(name)
+
+    def record(self, page, name, label, by, value, index=0, source='runtime'):
+        with self.lock:
+            entries = self.pages.setdefault(page, {})
+            previous = entries.get(name)
+            if previous and (previous['by'], previous['value'], previous['index']) == (by, value, index):
+                return
+            entries[name] = {
+                'label': label,
+                'by': by,
+                'value': value,
+                'index': index,
+                'source': source,
+                'revision': previous['revision'] + 1 if previous else 1,
+                'previous': {'by': previous['by'], 'value': previous['value']} if previous else None,
+                'recorded_at': time.time(),
+            }
+        logger.info(f"Selector cache: {page}.{name} -> {label} ({by}={value}, index {index})")
+        self.save()
+
+
+def _try_locator(driver, by, value, accept, preferred_index=0):
+    """(result, index) for the first accepted element, checking preferred_index first"""
+    elements = driver.find_elements(by, value)
+    order = list(range(len(elements)))
+    if 0 <= preferred_index < len(elements):
+        order.remove(preferred_index)
+        order.insert(0, preferred_index)
+    for index in order:
+        try:
+            result = accept(elements[index])
+        except Exception:
+            continue
+        if result is not None:
+            return result, index
+    return None, None
+
+
+def find_with_cache(driver, cache, page, name, candidates, accept=present):
+    """
+    Resolve `name` on `page`: the cached locator first, then a scan of `candidates`. A scan hit
+    is written back to the cache. Returns accept(element) for the matching element, or None.
+    """
+    with no_implicit_wait(driver):
+        entry = cache.get(page, name) if cache else None
+        if entry:
+            result, _ = _try_locator(driver, entry['by'], entry['value'], accept, entry.get('index', 0))
+            if result is not None:
+                return result
+
+        for label, by, value in candidates:
+            try:
+                result, index = _try_locator(driver, by, value, accept)
+            except Exception:
+                continue
+            if result is not None:
+                if cache:
+                    cache.record(page, name, label, by, value, index)
+                return result
+    return None
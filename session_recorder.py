@@ -0,0 +1,530 @@
+# session_recorder.py
+# Record a live run (page sources, captcha images, step timings, vision model answers) into a
+# compressed bundle, and replay bundles offline through SLCMScraper's captcha and extraction code
+import io
+import os
+import re
+import sys
+import json
+import base64
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import zipfile
+import argparse
+import tempfile
+import functools
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from config import SESSION_DIR
+from vision_backend import VisionService, VisionBackend
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_VERSION = 1
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def image_digest(image):
+    """Digest of an image given as bytes or a file path"""
+    if isinstance(image, (bytes, bytearray)):
+        return _digest(bytes(image))
+    with open(image, 'rb') as f:
+        return _digest(f.read())
+
+
+def _json_safe(value):
+    """value as it will read back from manifest.json; anything json cannot encode becomes its repr"""
+    return json.loads(json.dumps(value, default=repr))
+
+
+class SessionRecorder:
+    """
+    Collects one run in memory and writes it as a zip bundle: manifest.json, pages/<name>.html
+    and captchas/<digest>.png. Bundles hold the account's grade data; keep them private.
+    """
+
+    def __init__(self, account='', directory=SESSION_DIR):
+        self.directory = directory
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.manifest = {
+            'version': BUNDLE_VERSION,
+            'account': f"{account[:3]}***" if account else '',
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'models': {},
+            'steps': [],
+            'pages': [],
+            'captchas': [],
+            'model_responses': [],
+        }
+        self.files = {}  # path in bundle -> bytes
+
+    def _offset(self):
+        return round(time.perf_counter() - self.started, 3)
+
+    def step(self, name, seconds, ok=True, result=None, url=''):
+        with self.lock:
+            self.manifest['steps'].append({'name': name, 'at': self._offset(), 'seconds': round(seconds, 3),
+                                           'ok': ok, 'result': _json_safe(result), 'url': url})
+
+    def page(self, name, html, url=''):
+        with self.lock:
+            index = sum(1 for p in self.manifest['pages'] if p['name'] == name)
+            path = f"pages/{name}{'' if index == 0 else f'_{index}'}.html"
+            self.files[path] = (html or '').encode('utf-8')
+            self.manifest['pages'].append({'name': name, 'path': path, 'url': url, 'at': self._offset()})
+
+    def captcha(self, image_bytes):
+        digest = _digest(image_bytes)
+        with self.lock:
+            self.files[f"captchas/{digest}.png"] = image_bytes
+        return digest
+
+    def captcha_solved(self, image_path, attempts_before, answer, seconds):
+        """The consensus answer for a captcha image, with the earlier guesses it was combined with"""
+        with self.lock:
+            self.manifest['captchas'].append({'digest': image_digest(image_path), 'attempts_before': list(attempts_before),
+                                              'answer': answer, 'seconds': round(seconds, 3), 'at': self._offset()})
+
+    def model_response(self, task, prompt, images, answer, seconds):
+        with self.lock:
+            self.manifest['model_responses'].append({
+                'task': task, 'prompt': prompt, 'images': [image_digest(i) for i in images],
+                'answer': answer, 'seconds': round(seconds, 3),
+            })
+
+    def save(self, path=None):
+        os.makedirs(self.directory, exist_ok=True)
+        path = path or os.path.join(self.directory, f"session-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}.zip")
+        with self.lock, zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as bundle:
+            bundle.writestr('manifest.json', json.dumps(self.manifest, indent=2))
+            for name, data in self.files.items():
+                bundle.writestr(name, data)
+        print(f"✓ Session recorded to {path}")
+        return path
+
+
+def recorded_step(name):
+    """Record the decorated SLCMScraper method's duration and result when self.recorder is set"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            recorder = getattr(self, 'recorder', None)
+            if recorder is None:
+                return func(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                result = func(self, *args, **kwargs)
+            except Exception as e:
+                recorder.step(name, time.perf_counter() - started, ok=False, result=str(e))
+                raise
+            url = ''
+            try:
+                url = self.driver.current_url
+            except Exception:
+                pass
+            recorder.step(name, time.perf_counter() - started, result=result, url=url)
+            return result
+        return wrapper
+    return decorate
+
+
+class RecordingVision:
+    """VisionService wrapper that records every answer (per image, before batching) to a recorder"""
+
+    def __init__(self, vision, recorder):
+        self.vision = vision
+        self.recorder = recorder
+        recorder.manifest['models'] = dict(vision.models)
+
+    def __getattr__(self, name):
+        return getattr(self.vision, name)
+
+    def submit(self, task, prompt, image):
+        started = time.perf_counter()
+        future = self.vision.submit(task, prompt, image)
+
+        def record(done):
+            if not done.exception():
+                self.recorder.manifest['models'] = dict(self.vision.models)  # may change once the benchmark finishes
+                self.recorder.model_response(task, prompt, [image], done.result(), time.perf_counter() - started)
+        future.add_done_callback(record)
+        return future
+
+    def ask(self, task, prompt, images):
+        started = time.perf_counter()
+        answer = self.vision.ask(task, prompt, images)
+        self.recorder.manifest['models'] = dict(self.vision.models)
+        self.recorder.model_response(task, prompt, images, answer, time.perf_counter() - started)
+        return answer
+
+
+class SessionBundle:
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as bundle:
+            self.manifest = json.loads(bundle.read('manifest.json'))
+            if self.manifest.get('version') != BUNDLE_VERSION:
+                raise ValueError(f"Unsupported bundle version {self.manifest.get('version')}")
+            self.files = {name: bundle.read(name) for name in bundle.namelist() if name != 'manifest.json'}
+
+    def page(self, entry):
+        return self.files[entry['path']].decode('utf-8')
+
+    def captcha_bytes(self, digest):
+        return self.files[f"captchas/{digest}.png"]
+
+    def step(self, name):
+        """Last recorded step with that name, or None"""
+        return next((s for s in reversed(self.manifest['steps']) if s['name'] == name), None)
+
+
+class ReplayBackend(VisionBackend):
+    def __init__(self, models):
+        self.models = models
+
+    def list_models(self):
+        return sorted(set(self.models.values()))
+
+    def chat(self, model, prompt, images, options=None):
+        raise RuntimeError("Replay answers come from ReplayVision.submit/ask")
+
+
+class ReplayVision(VisionService):
+    """
+    Answers vision calls from a bundle. A call is matched on task, prompt and image digests; when
+    the image differs (e.g. a re-rendered screenshot) the recorded answers for that task and prompt
+    are handed out in their original order.
+    """
+
+    def __init__(self, bundle):
+        models = bundle.manifest.get('models', {})
+        super().__init__(backend=ReplayBackend(models))
+        self.models = dict(models)
+        self.installed = self.backend.list_models()
+        self.available = bool(self.models)
+        self.answers = []  # recorded answers; exact and in_order refer to them by index
+        self.exact = {}
+        self.in_order = {}
+        for index, response in enumerate(bundle.manifest['model_responses']):
+            key = (response['task'], response['prompt'])
+            self.answers.append(response['answer'])
+            self.exact.setdefault(key + (tuple(response['images']),), (response['answer'], index))
+            self.in_order.setdefault(key, []).append(index)
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def answer(self, task, prompt, images):
+        digests = tuple(image_digest(i) for i in images)
+        with self.lock:
+            queue = self.in_order.get((task, prompt), [])
+            exact = self.exact.get((task, prompt, digests))
+            if exact is not None:
+                answer, order = exact
+                if order in queue:
+                    queue.remove(order)  # not handed out again to a call with a different image
+                return answer
+            if queue:
+                return self.answers[queue.pop(0)]
+            self.misses += 1
+            return ''
+
+    def submit(self, task, prompt, image):
+        future = Future()
+        future.set_result(self.answer(task, prompt, [image]))
+        return future
+
+    def ask(self, task, prompt, images):
+        return self.answer(task, prompt, images)
+
+
+_XPATH_STEP = re.compile(r"(?:(?P<axis>[a-z-]+)::)?(?P<test>\*|[a-zA-Z][\w-]*)(?P<preds>(?:\[[^\]]*\])*)$")
+_XPATH_TERM = re.compile(r"contains\((?P<subject>text\(\)|@[\w-]+), '(?P<needle>[^']*)'\)"
+                         r"|string-length\(text\(\)\) < (?P<length>\d+)")
+
+
+def _own_text(tag):
+    """XPath text() in a string context: the element's first text node"""
+    return next((str(c) for c in tag.children if isinstance(c, str)), '')
+
+
+def _attribute(tag, name):
+    value = tag.get(name)
+    return ' '.join(value) if isinstance(value, list) else (value or '')
+
+
+class RecordedElement:
+    """WebElement stand-in for one tag of a recorded page"""
+
+    def __init__(self, driver, tag):
+        self.driver = driver
+        self.tag = tag
+
+    @property
+    def tag_name(self):
+        return self.tag.name
+
+    @property
+    def text(self):
+        return ' '.join(self.tag.get_text(' ').split())
+
+    def get_attribute(self, name):
+        if name == 'outerHTML':
+            return str(self.tag)
+        if name == 'innerHTML':
+            return self.tag.decode_contents()
+        if name in ('textContent', 'innerText'):
+            return self.tag.get_text()
+        return _attribute(self.tag, name) or None
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def find_elements(self, by, value):
+        return self.driver._find(self.tag, by, value)
+
+    def find_element(self, by, value):
+        return self.driver._first(self.tag, by, value)
+
+
+class RecordedPageDriver:
+    """
+    WebDriver stand-in serving a recorded page, so SLCMScraper's extraction code runs unchanged in
+    replay. Locators are evaluated against the HTML (XPath limited to the forms the scraper uses);
+    nothing is rendered, so screenshots are blank and there is no layout to measure.
+    """
+
+    def __init__(self, html, url=''):
+        from bs4 import BeautifulSoup
+        self.page_source = html
+        self.current_url = url
+        self.soup = BeautifulSoup(html, 'html.parser')
+        self.title = self.soup.title.get_text() if self.soup.title else ''
+        self.order = {id(tag): i for i, tag in enumerate(self.soup.find_all(True))}
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def find_elements(self, by, value):
+        return self._find(self.soup, by, value)
+
+    def find_element(self, by, value):
+        return self._first(self.soup, by, value)
+
+    def _first(self, root, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        found = self._find(root, by, value)
+        if not found:
+            raise NoSuchElementException(f"{by}={value}")
+        return found[0]
+
+    def _find(self, root, by, value):
+        from selenium.common.exceptions import InvalidSelectorException
+        from selenium.webdriver.common.by import By
+        if by == By.XPATH:
+            tags = self._xpath(root, value)
+        elif by == By.TAG_NAME:
+            tags = root.find_all(value)
+        elif by == By.ID:
+            tags = root.find_all(id=value)
+        elif by == By.NAME:
+            tags = root.find_all(attrs={'name': value})
+        elif by == By.CLASS_NAME:
+            tags = root.find_all(class_=value)
+        elif by == By.CSS_SELECTOR:
+            tags = root.select(value)
+        else:
+            raise InvalidSelectorException(f"Unsupported locator {by}")
+        return [RecordedElement(self, t) for t in tags]
+
+    def _xpath(self, root, expression):
+        """Union of location paths: //, /, ./ and .// steps, the child, following-sibling and ancestor axes"""
+        from selenium.common.exceptions import InvalidSelectorException
+        found = []
+        for path in expression.split(' | '):
+            path = path.strip()
+            if path.startswith('.'):
+                path, nodes = path[1:], [root]
+            else:
+                nodes = [self.soup]
+            for separator, step in re.findall(r"(//|/)((?:[^/\[]|\[[^\]]*\])+)", path):
+                match = _XPATH_STEP.match(step)
+                if not match:
+                    raise InvalidSelectorException(f"Unsupported XPath step {step!r}")
+                nodes = self._step(nodes, separator, match)
+            found += nodes
+        unique = {id(tag): tag for tag in found}  # Tag equality compares markup, not identity
+        return sorted(unique.values(), key=lambda tag: self.order.get(id(tag), -1))
+
+    def _step(self, nodes, separator, match):
+        from selenium.common.exceptions import InvalidSelectorException
+        axis, test = match.group('axis') or 'child', match.group('test')
+        predicates = re.findall(r"\[([^\]]*)\]", match.group('preds'))
+        name = None if test == '*' else test
+        groups = []  # predicates count positions within each context node's candidates
+        for node in nodes:
+            if axis == 'child':
+                parents = [node] + node.find_all(True) if separator == '//' else [node]
+                groups += [p.find_all(name, recursive=False) for p in parents]
+            elif axis == 'following-sibling':
+                groups.append(node.find_next_siblings(name))
+            elif axis == 'ancestor':
+                groups.append([p for p in node.find_parents(name) if p is not self.soup])
+            else:
+                raise InvalidSelectorException(f"Unsupported XPath axis {axis}")
+        result = []
+        for group in groups:
+            for predicate in predicates:
+                group = [t for i, t in enumerate(group, start=1) if self._matches(t, predicate, i, len(group))]
+            result += group
+        return list({id(tag): tag for tag in result}.values())
+
+    def _matches(self, tag, predicate, position, size):
+        from selenium.common.exceptions import InvalidSelectorException
+        if predicate == 'last()':
+            return position == size
+        if predicate.isdigit():
+            return position == int(predicate)
+        alternatives = []
+        for alternative in predicate.split(' or '):
+            terms = []
+            for term in alternative.split(' and '):
+                match = _XPATH_TERM.fullmatch(term.strip())
+                if not match:
+                    raise InvalidSelectorException(f"Unsupported XPath predicate {predicate!r}")
+                if match.group('length'):
+                    terms.append(len(_own_text(tag)) < int(match.group('length')))
+                else:
+                    subject = match.group('subject')
+                    haystack = _own_text(tag) if subject == 'text()' else _attribute(tag, subject[1:])
+                    terms.append(match.group('needle') in haystack)
+            alternatives.append(all(terms))
+        return any(alternatives)
+
+    def save_screenshot(self, filename):
+        return False  # nothing is rendered
+
+    def get_screenshot_as_png(self):
+        return self._blank_png(1024, 768)
+
+    def execute_script(self, script, *args):
+        return None  # no layout: the grade table has no box and the device pixel ratio defaults to 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Page.getLayoutMetrics':
+            return {'layoutViewport': {'pageX': 0, 'pageY': 0, 'clientWidth': 1024, 'clientHeight': 768}}
+        if cmd == 'Page.captureScreenshot':
+            clip = params.get('clip', {'width': 1024, 'height': 768, 'scale': 1})
+            png = self._blank_png(max(1, round(clip['width'] * clip['scale'])), max(1, round(clip['height'] * clip['scale'])))
+            return {'data': base64.b64encode(png).decode('ascii')}
+        return {}
+
+    @staticmethod
+    def _blank_png(width, height):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), 'white').save(buffer, format='PNG')
+        return buffer.getvalue()
+
+
+def replay(path, repeat=1):
+    """
+    Feed a bundle through an offline SLCMScraper (no browser, no Ollama): every recorded captcha
+    through solve_captcha_image, the grade sheet through extract_cgpa_from_gradesheet_tab on a
+    RecordedPageDriver, and the extra pages through their parsers. Returns True when every answer
+    matches the recording.
+    """
+    from scraper import SLCMScraper
+    from page_extractors import PAGE_EXTRACTORS
+    from selector_cache import SelectorCache
+    from gradesheet_parser import parse_gradesheet
+
+    bundle = SessionBundle(path)
+    workdir = Path(tempfile.mkdtemp(prefix='slcm-replay-'))
+    scraper = SLCMScraper(username='replay', password='replay', interactive=False, offline=True)
+    scraper.check_tesseract()  # OCR runs live
+    scraper.vision = ReplayVision(bundle)
+    scraper.ollama_available = scraper.vision.available
+    scraper.vision_model = scraper.vision.model_for('captcha')
+    scraper.cgpa_vision_model = scraper.vision.model_for('cgpa')
+    scraper.selectors = SelectorCache(str(workdir / 'selectors.json'))  # scan afresh; the live cache stays untouched
+    scraper.extract_cgpa_focused_ocr = lambda: None  # nothing is rendered for OCR to read
+
+    rows, all_match = [], True
+    try:
+        for run in range(repeat):
+            for i, captcha in enumerate(bundle.manifest['captchas']):
+                image_path = workdir / f"captcha_{run}_{i}.png"
+                image_path.write_bytes(bundle.captcha_bytes(captcha['digest']))
+                scraper.captcha_attempts = list(captcha['attempts_before'])
+                started = time.perf_counter()
+                answer = scraper.solve_captcha_image(str(image_path))
+                rows.append((f"captcha {i + 1}", captcha['seconds'], time.perf_counter() - started,
+                             answer == captcha['answer'], f"{captcha['answer']} -> {answer}"))
+
+            for entry in bundle.manifest['pages']:
+                html = bundle.page(entry)
+                if entry['name'] == 'gradesheet':
+                    recorded = bundle.step('extract_cgpa')
+                    started = time.perf_counter()
+                    scraper.driver = RecordedPageDriver(html, entry['url'])
+                    cgpa = scraper.extract_cgpa_from_gradesheet_tab(parsed=parse_gradesheet(html, student_id='replay'))
+                    expected = recorded['result'] if recorded else None
+                    rows.append(("gradesheet cgpa", recorded['seconds'] if recorded else None,
+                                 time.perf_counter() - started, expected is None or cgpa == expected,
+                                 f"{expected} -> {cgpa}"))
+                elif entry['name'] in PAGE_EXTRACTORS:
+                    started = time.perf_counter()
+                    data = PAGE_EXTRACTORS[entry['name']].parse(html)
+                    count = len(data) if isinstance(data, list) else 1
+                    rows.append((entry['name'], None, time.perf_counter() - started, True, f"{count} records"))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\nReplay of {path} ({bundle.manifest['recorded_at']}, {repeat}x)")
+    print(f"{'item':<18} {'recorded':>9} {'replay':>9}  match  detail")
+    for name, recorded, replayed, match, detail in rows:
+        recorded_text = f"{recorded:.2f}s" if recorded is not None else '-'
+        print(f"{name:<18} {recorded_text:>9} {replayed:>8.2f}s  {'yes' if match else 'NO':<5}  {detail}")
+        all_match = all_match and match
+    if scraper.vision.misses:
+        print(f"{scraper.vision.misses} vision calls had no recorded answer")
+    return all_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded SLCM sessions offline (record with SESSION_RECORD=true)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    replay_cmd = commands.add_parser('replay', help="run captcha and extraction code against a bundle")
+    replay_cmd.add_argument('bundles', nargs='+')
+    replay_cmd.add_argument('--repeat', type=int, default=1, help="replay each bundle this many times (benchmarking)")
+    show = commands.add_parser('show', help="print a bundle's steps and contents")
+    show.add_argument('bundle')
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        bundle = SessionBundle(args.bundle)
+        manifest = bundle.manifest
+        print(f"{args.bundle}: account {manifest['account']}, recorded {manifest['recorded_at']}, models {manifest['models']}")
+        for step in manifest['steps']:
+            print(f"  {step['at']:>8.2f}s  {step['name']:<14} {step['seconds']:>7.2f}s  {'ok' if step['ok'] else 'failed'}  {step['result']}")
+        print(f"  {len(manifest['pages'])} pages, {len(manifest['captchas'])} captchas, "
+              f"{len(manifest['model_responses'])} model responses")
+        return 0
+
+    results = [replay(path, args.repeat) for path in args.bundles]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
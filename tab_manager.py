@@ -0,0 +1,102 @@
+# tab_manager.py
+# Several portal pages open in tabs of one browser session, waited on together and handed out
+# in the order they become ready
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional
+from cdp_navigation import CDPNavigator, POLL_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# A tab whose events never show it quiet (e.g. its load event fired before chromedriver attached)
+# is still checked directly this often
+CHECK_INTERVAL = 0.5
+
+
+@dataclass
+class Tab:
+    name: str
+    handle: str
+    ready_js: Optional[str] = None
+    opened_at: float = 0.0
+    ready_at: Optional[float] = None
+    reason: Optional[str] = None  # table | idle, or None when the wait timed out
+
+    @property
+    def seconds(self):
+        """Open-to-ready time (open-to-now while still loading)"""
+        return (self.ready_at or time.monotonic()) - self.opened_at
+
+
+class TabManager:
+    """
+    Tabs opened from one home tab. as_ready() waits on all of them in a single loop: load and
+    network events for every tab arrive through the shared performance log without switching,
+    and a tab is only switched to (to run its ready_js) once its network is quiet or every
+    CHECK_INTERVAL, so a slow page never holds up the ones behind it.
+    """
+
+    def __init__(self, driver, navigator=None):
+        self.driver = driver
+        self.navigator = navigator or CDPNavigator(driver)
+        self.home = driver.current_window_handle
+        self.tabs = {}  # name -> Tab
+
+    def add(self, name, handle, ready_js=None, opened_at=None):
+        """Track a tab the caller opened (e.g. by clicking a link that opens a new tab)"""
+        tab = Tab(name, handle, ready_js, opened_at or time.monotonic())
+        self.tabs[name] = tab
+        return tab
+
+    def get(self, name):
+        return self.tabs.get(name)
+
+    def as_ready(self, timeout=20, idle_seconds=0.5):
+        """
+        Yield each pending tab as soon as it is ready, with the driver switched to it. Tabs still
+        loading at the timeout are yielded last with reason None.
+        """
+        pending = [tab for tab in self.tabs.values() if tab.ready_at is None]
+        last_checked = {}
+        deadline = time.monotonic() + timeout
+        while pending and time.monotonic() < deadline:
+            self.navigator.drain()
+            now = time.monotonic()
+            for tab in list(pending):
+                quiet = self.navigator.is_quiet(tab.handle, idle_seconds)
+                if not quiet and now - last_checked.get(tab.handle, 0.0) < CHECK_INTERVAL:
+                    continue
+                last_checked[tab.handle] = now
+                self.driver.switch_to.window(tab.handle)
+                reason = self.navigator.check_ready(tab.handle, tab.ready_js, idle_seconds)
+                if reason:
+                    tab.ready_at, tab.reason = time.monotonic(), reason
+                    pending.remove(tab)
+                    yield tab
+            if pending:
+                time.sleep(POLL_INTERVAL)
+
+        for tab in pending:
+            logger.warning(f"Tab {tab.name} not ready after {timeout}s")
+            tab.ready_at = time.monotonic()
+            self.driver.switch_to.window(tab.handle)
+            yield tab
+
+    def close(self, name):
+        tab = self.tabs.pop(name, None)
+        if tab is None:
+            return
+        try:
+            self.driver.switch_to.window(tab.handle)
+            self.driver.close()
+        except Exception as e:
+            logger.debug(f"Closing tab {name} failed: {e}")
+        self.switch_home()
+
+    def close_all(self, keep=()):
+        for name in [name for name in self.tabs if name not in keep]:
+            self.close(name)
+
+    def switch_home(self):
+        self.driver.switch_to.window(self.home)
@@ -0,0 +1,57 @@
+# Tests import the top-level modules directly; every file the modules write goes to a temp dir
+import os
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_scratch = tempfile.mkdtemp(prefix='slcm-tests-')
+for name, value in {
+    'SLCM_USERNAME': '', 'SLCM_PASSWORD': '',
+    'SNAPSHOT_DIR': os.path.join(_scratch, 'snapshots'),
+    'RESULT_DB_PATH': os.path.join(_scratch, 'results.db'),
+    'VISION_SELECTION_CACHE': os.path.join(_scratch, 'vision_models.json'),
+    'BROWSER_TEMPLATE_DIR': os.path.join(_scratch, 'browser_template'),
+    'DRIVER_CACHE_FILE': os.path.join(_scratch, 'chromedriver_path.json'),
+    'SELECTOR_CACHE_PATH': os.path.join(_scratch, 'selector_cache.json'),
+    'JOB_DB_PATH': os.path.join(_scratch, 'jobs.db'),
+    'SLCM_ACCOUNTS_FILE': os.path.join(_scratch, 'accounts.json'),
+    'PROFILE_MODE': 'off',
+    'PROFILE_DIR': os.path.join(_scratch, 'profiles'),
+    'SESSION_DIR': os.path.join(_scratch, 'sessions'),
+}.items():
+    os.environ[name] = value
+
+GRADESHEET_HTML = """
+<html><body>
+<table id="summary"><tr><td>Name</td><td>Test Student</td></tr><tr><td>CGPA</td><td>8.50</td></tr></table>
+<p>Semester I</p>
+<table>
+  <tr><th>Code</th><th>Subject</th><th>Credits</th><th>Grade</th><th>Points</th></tr>
+  <tr><td>MAT1101</td><td>Engineering Mathematics</td><td>4</td><td>A</td><td>9</td></tr>
+  <tr><td>PHY1001</td><td>Engineering Physics</td><td>4</td><td>B</td><td>8</td></tr>
+  <tr><td>SGPA</td><td>8.50</td></tr>
+</table>
+</body></html>
+"""
+
+
+@pytest.fixture
+def gradesheet_html():
+    return GRADESHEET_HTML
+
+
+@pytest.fixture
+def make_result():
+    """StudentResult factory: semesters given as {semester: [(code, credits, grade, points), ...]}"""
+    from data_models import StudentResult, SemesterResult, StudentGrade
+
+    def build(student_id, cgpa, semesters):
+        return StudentResult(student_id, f"Student {student_id}", cgpa, [
+            SemesterResult(number, 0.0, sum(row[1] for row in rows),
+                           [StudentGrade(code, code.title(), credits, grade, points) for code, credits, grade, points in rows])
+            for number, rows in semesters.items()
+        ])
+    return build
@@ -0,0 +1,46 @@
+import math
+import numpy as np
+import pytest
+from analytics import (load_cohort, recompute_cgpa, recompute_sgpa, percentile_ranks, credit_weighted_trend,
+                       subject_grade_distribution, cgpa_mismatches)
+from result_store import ResultStore
+
+
+@pytest.fixture
+def cohort(tmp_path, make_result):
+    path = str(tmp_path / 'results.db')
+    with ResultStore(path) as store:
+        store.write(make_result('s1', 7.0, {1: [('MAT1101', 4, 'B', 8)]}), scraped_at=1.0)  # superseded
+        store.write(make_result('s1', 8.5, {1: [('MAT1101', 4, 'A', 9), ('PHY1001', 4, 'B', 8)]}), scraped_at=2.0)
+        store.write(make_result('s2', 9.0, {1: [('MAT1101', 4, 'A', 9)], 2: [('CSE2001', 2, 'C', 7)]}), scraped_at=3.0)
+        store.write(make_result('s3', 0.0, {}), scraped_at=4.0)
+    return load_cohort(path)
+
+
+def test_latest_results_only(cohort):
+    assert list(cohort.student_ids) == ['s1', 's2', 's3']
+
+
+def test_recomputed_gpas(cohort):
+    cgpa = recompute_cgpa(cohort)
+    assert cgpa[:2].tolist() == [8.5, 8.33] and math.isnan(cgpa[2])
+
+    sgpa, semesters = recompute_sgpa(cohort)
+    assert semesters.tolist() == [1, 2]
+    assert sgpa[0, 0] == 8.5 and math.isnan(sgpa[0, 1])
+    assert sgpa[1].tolist() == [9.0, 7.0]
+
+    semesters, trend = credit_weighted_trend(cohort)
+    assert trend.tolist() == [8.67, 7.0]
+
+
+def test_percentile_ranks_keep_missing_values():
+    ranks = percentile_ranks([7.0, np.nan, 9.0, 8.0])
+    assert ranks[[0, 2, 3]].tolist() == pytest.approx([100 / 3, 100.0, 200 / 3])
+    assert math.isnan(ranks[1])
+
+
+def test_distribution_and_mismatches(cohort):
+    assert subject_grade_distribution(cohort)['MAT1101'] == {'A': 2}
+    # s2 reports 9.0 but its rows give 8.33; s3 has no rows and no reported CGPA to check
+    assert cgpa_mismatches(cohort) == [('s2', 9.0, 8.33)]
@@ -0,0 +1,47 @@
+import os
+import shutil
+import browser_pool
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+def _fake_chrome(user_data_dir):
+    """Writes what a real first run leaves behind, plus per-user state that must not be kept"""
+    for path in ('Local State', 'Default/Preferences', 'Default/Cookies', 'Default/Network/Cookies',
+                 'Default/History', 'Default/Local Storage/leveldb/000003.log', 'Default/Sessions/Session_1',
+                 'SingletonLock'):
+        full = os.path.join(user_data_dir, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w') as f:
+            f.write('x')
+    return FakeDriver()
+
+
+def test_template_holds_first_run_setup_only(tmp_path, monkeypatch):
+    template = tmp_path / 'template'
+    monkeypatch.setattr(browser_pool, 'BROWSER_TEMPLATE_DIR', str(template))
+    monkeypatch.setattr(browser_pool, '_start_driver', _fake_chrome)
+
+    browser_pool.ensure_template()
+
+    kept = sorted(os.path.relpath(os.path.join(root, name), template)
+                  for root, _, files in os.walk(template) for name in files)
+    assert kept == ['Default/Preferences', 'Local State']
+
+
+def test_profiles_are_seeded_without_user_state(tmp_path, monkeypatch):
+    template = tmp_path / 'template'
+    _fake_chrome(str(template))  # e.g. a template saved by an older version from a used profile
+    monkeypatch.setattr(browser_pool, 'BROWSER_TEMPLATE_DIR', str(template))
+
+    directory = browser_pool._new_user_data_dir()
+    try:
+        assert os.path.exists(os.path.join(directory, 'Default', 'Preferences'))
+        assert not os.path.exists(os.path.join(directory, 'Default', 'Cookies'))
+        assert not os.path.exists(os.path.join(directory, 'Default', 'Network'))
+        assert not os.path.exists(os.path.join(directory, 'Default', 'Sessions'))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,32 @@
+from fnmatch import fnmatch
+from browser_profile import BLOCKED_URL_PATTERNS, enable_request_blocking
+
+
+class FakeDriver:
+    def __init__(self, url_patterns_supported=True):
+        self.url_patterns_supported = url_patterns_supported
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if 'urlPatterns' in params and not self.url_patterns_supported:
+            raise Exception("Invalid parameters")
+        self.commands.append((cmd, params))
+
+
+def test_stylesheets_are_not_blocked():
+    for url in ('https://slcm.manipal.edu/css/site.css', 'https://slcm.manipal.edu/site.css?v=3'):
+        assert not any(fnmatch(url, p) for p in BLOCKED_URL_PATTERNS)
+
+
+def test_captcha_is_allowed_ahead_of_the_block_list():
+    driver = FakeDriver()
+    assert enable_request_blocking(driver, ['*.aspx*'])
+    cmd, params = driver.commands[-1]
+    assert cmd == 'Network.setBlockedURLs' and params['urls'] == ['*.aspx*']
+    assert {'urlPattern': '*://*/*Captcha*', 'block': False} in params['urlPatterns']
+
+
+def test_older_chrome_gets_the_block_list_alone():
+    driver = FakeDriver(url_patterns_supported=False)
+    assert enable_request_blocking(driver)
+    assert driver.commands[-1] == ('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
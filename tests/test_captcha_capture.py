@@ -0,0 +1,94 @@
+import base64
+import pytest
+import captcha_capture
+from captcha_capture import read_captcha_bytes, _CANVAS_JS, _FETCH_JS
+
+
+class FakeCaptchaPage:
+    """Driver stand-in: canvas and fetch answers are configurable, the element screenshot is fixed"""
+
+    current_url = 'https://slcm.manipal.edu/loginForm.aspx'
+
+    def __init__(self, canvas=b'canvas-bytes', fetch=b'fetch-bytes'):
+        self.canvas = canvas
+        self.fetch = fetch
+        self.calls = []
+
+    def _answer(self, value):
+        if isinstance(value, Exception):
+            raise value
+        return base64.b64encode(value).decode() if value else None
+
+    def execute_script(self, script):
+        if script == _CANVAS_JS:
+            self.calls.append('canvas')
+            return self._answer(self.canvas)
+        return 'test-agent'
+
+    def execute_async_script(self, script):
+        assert script == _FETCH_JS
+        self.calls.append('fetch')
+        return self._answer(self.fetch)
+
+    def find_element(self, by, value):
+        assert value == 'imgCaptcha'
+        return self
+
+    @property
+    def screenshot_as_png(self):
+        self.calls.append('screenshot')
+        return b'screenshot-bytes'
+
+    def get_attribute(self, name):
+        return 'https://slcm.manipal.edu/Captcha.aspx'
+
+    def get_cookies(self):
+        return [{'name': 'ASP.NET_SessionId', 'value': 'abc', 'domain': 'slcm.manipal.edu'}]
+
+
+@pytest.mark.parametrize('mode, expected', [('canvas', b'canvas-bytes'), ('fetch', b'fetch-bytes'),
+                                            ('screenshot', b'screenshot-bytes')])
+def test_each_mode_reads_its_own_source(mode, expected):
+    page = FakeCaptchaPage()
+    assert read_captcha_bytes(page, mode) == expected
+    assert page.calls == [mode]
+
+
+def test_cookies_mode_downloads_with_the_browser_session(monkeypatch):
+    sent = {}
+
+    class Response:
+        content = b'download-bytes'
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def __init__(self):
+            self.cookies = self
+
+        def set(self, name, value, domain=None):
+            sent['cookie'] = (name, value, domain)
+
+        def get(self, url, headers, timeout):
+            sent.update(url=url, headers=headers)
+            return Response()
+    monkeypatch.setattr(captcha_capture.requests, 'Session', Session)
+
+    assert read_captcha_bytes(FakeCaptchaPage(), 'cookies') == b'download-bytes'
+    assert sent['cookie'] == ('ASP.NET_SessionId', 'abc', 'slcm.manipal.edu')
+    assert sent['url'].endswith('Captcha.aspx')
+    assert sent['headers'] == {'User-Agent': 'test-agent', 'Referer': FakeCaptchaPage.current_url}
+
+
+@pytest.mark.parametrize('canvas', [None, RuntimeError("tainted canvas")])
+def test_failed_canvas_falls_back_to_screenshot(canvas, caplog):
+    page = FakeCaptchaPage(canvas=canvas)
+    assert read_captcha_bytes(page, 'canvas') == b'screenshot-bytes'
+    assert page.calls == ['canvas', 'screenshot']
+    assert "using element screenshot" in caplog.text
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unknown captcha capture mode"):
+        read_captcha_bytes(FakeCaptchaPage(), 'clipboard')
@@ -0,0 +1,84 @@
+import threading
+import pytest
+from captcha_pipeline import CaptchaPrefetcher
+
+
+class FakeLoginPage:
+    """Driver stand-in: execute_script answers the captcha fingerprint check, `image` is the current captcha"""
+
+    def __init__(self, image=b'captcha-1', loaded=True):
+        self.image = image
+        self.loaded = loaded
+
+    def execute_script(self, script):
+        return f"token|0|{self.image!r}" if self.loaded else None
+
+
+@pytest.fixture
+def capture(tmp_path):
+    counter = iter(range(1000))
+
+    def capture_fn(driver):
+        path = tmp_path / f"captcha_{next(counter)}.png"
+        path.write_bytes(driver.image)
+        return str(path)
+    return capture_fn
+
+
+def test_solves_in_background_and_restarts_after_shutdown(capture):
+    prefetcher = CaptchaPrefetcher(capture, lambda path: '123', poll_interval=0.01)
+    page = FakeLoginPage()
+
+    prefetcher.prefetch(page)
+    assert prefetcher.result() == '123'
+    prefetcher.shutdown()
+
+    # A second login on the same scraper gets a new solver thread
+    page.image = b'captcha-2'
+    prefetcher.prefetch(page)
+    assert prefetcher.result() == '123'
+    prefetcher.shutdown()
+
+
+def test_start_if_new_waits_for_a_different_captcha(capture):
+    solved = []
+    prefetcher = CaptchaPrefetcher(capture, lambda path: solved.append(path) or '456')
+    page = FakeLoginPage()
+    prefetcher.prefetch(page)
+    prefetcher.result()
+
+    assert not prefetcher.start_if_new(page)  # still the captcha that was just submitted
+    page.loaded = False
+    page.image = b'captcha-2'
+    assert not prefetcher.start_if_new(page)  # new page, image not loaded yet
+    page.loaded = True
+    assert prefetcher.start_if_new(page)
+    assert prefetcher.prefetch(page) is prefetcher.pending  # the early solve is kept
+    assert prefetcher.result() == '456'
+    assert len(solved) == 2
+    prefetcher.shutdown()
+
+
+def test_hung_solve_times_out(capture):
+    release = threading.Event()
+    prefetcher = CaptchaPrefetcher(capture, lambda path: release.wait(5), solve_timeout=0.05)
+    prefetcher.prefetch(FakeLoginPage())
+    try:
+        assert prefetcher.result() is None
+        assert prefetcher.pending is None
+    finally:
+        release.set()
+        prefetcher.shutdown()
+
+
+def test_unchanged_captcha_is_not_captured_again(capture):
+    captures = []
+    prefetcher = CaptchaPrefetcher(lambda driver: captures.append(1) or capture(driver), lambda path: '789')
+    page = FakeLoginPage()
+    prefetcher.prefetch(page)
+    prefetcher.result()
+
+    for _ in range(20):  # polled while the portal answers
+        assert not prefetcher.start_if_new(page)
+    assert len(captures) == 1
+    prefetcher.shutdown()
@@ -0,0 +1,76 @@
+import json
+import base64
+import cdp_navigation
+from cdp_navigation import CDPNavigator
+
+
+class FakePerformanceLog:
+    """Driver stand-in: get_log('performance') hands out queued DevTools events once, like chromedriver"""
+
+    def __init__(self):
+        self.entries = []
+        self.bodies = {}
+
+    def event(self, target, method, **params):
+        self.entries.append({'message': json.dumps({'webview': target, 'message': {'method': method, 'params': params}})})
+
+    def get_log(self, kind):
+        entries, self.entries = self.entries, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, params):
+        return self.bodies[params['requestId']]
+
+
+def test_requests_in_flight_and_load_events_per_target():
+    log = FakePerformanceLog()
+    navigator = CDPNavigator(log)
+    log.event('tab1', 'Page.frameStartedLoading')
+    log.event('tab1', 'Network.requestWillBeSent', requestId='1')
+    log.event('tab1', 'Network.requestWillBeSent', requestId='2')
+    log.event('tab2', 'Page.loadEventFired')
+    log.event('tab1', 'Page.loadEventFired')
+    log.event('tab1', 'Network.loadingFinished', requestId='1')
+    log.entries.append({'message': 'not json'})
+    navigator.drain()
+
+    assert navigator.targets['tab1'].inflight == {'2'}
+    assert not navigator.is_quiet('tab1', idle_seconds=0)
+    assert navigator.is_quiet('tab2', idle_seconds=0)
+
+    log.event('tab1', 'Network.loadingFailed', requestId='2')
+    navigator.drain()
+    assert navigator.is_quiet('tab1', idle_seconds=0)
+    assert not navigator.is_quiet('tab1', idle_seconds=60)  # activity just now
+
+
+def test_quiet_only_after_idle_period(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cdp_navigation.time, 'monotonic', lambda: now[0])
+    log = FakePerformanceLog()
+    navigator = CDPNavigator(log)
+    log.event('tab', 'Page.loadEventFired')
+    navigator.drain()
+    assert not navigator.is_quiet('tab', idle_seconds=0.5)
+    now[0] += 0.6
+    assert navigator.is_quiet('tab', idle_seconds=0.5)
+
+    # An unrelated event does not count as activity; a new navigation resets the load state
+    log.event('tab', 'Runtime.consoleAPICalled')
+    navigator.drain()
+    assert navigator.is_quiet('tab', idle_seconds=0.5)
+    log.event('tab', 'Page.frameStartedLoading')
+    navigator.drain()
+    assert not navigator.targets['tab'].loaded
+
+
+def test_latest_matching_response_body():
+    log = FakePerformanceLog()
+    navigator = CDPNavigator(log)
+    for request_id, url in (('a', 'https://slcm/GradeSheet.aspx'), ('b', 'https://slcm/style.css'),
+                            ('c', 'https://slcm/GradeSheet.aspx?postback')):
+        log.event('tab', 'Network.responseReceived', requestId=request_id, response={'url': url, 'status': 200})
+    log.bodies['c'] = {'body': base64.b64encode(b'<table>CGPA 8.5</table>').decode(), 'base64Encoded': True}
+
+    assert navigator.response_body('tab', 'gradesheet.aspx') == '<table>CGPA 8.5</table>'
+    assert navigator.response_body('tab', 'attendance') is None
@@ -0,0 +1,40 @@
+import pytest
+from cgpa_patterns import find_cgpa, iter_cgpa_matches, decimals_in_range, parse_model_answer, has_cgpa_context
+
+
+@pytest.mark.parametrize('text, value, label', [
+    ("CGPA: 8.74", 8.74, 'cgpa'),
+    ("C.G.P.A = 9.1", 9.1, 'cgpa'),
+    ("Cumulative Grade Point Average 7.85", 7.85, 'cumulative'),
+    ("GPA 8.0", 8.0, 'gpa'),
+    ("Overall (9.25)", 9.25, 'overall'),
+    ("cgpa 8,74", 8.74, 'cgpa'),  # OCR comma for the decimal point
+])
+def test_labelled_values(text, value, label):
+    match = find_cgpa(text)
+    assert (match.value, match.label) == (value, label)
+
+
+def test_best_label_wins_and_out_of_range_is_dropped():
+    assert find_cgpa("GPA 7.5 ... CGPA 8.25").value == 8.25
+    assert find_cgpa("CGPA 12.5") is None
+    assert find_cgpa("cgpa 8,74").confidence < find_cgpa("cgpa 8.74").confidence
+    assert [m.value for m in iter_cgpa_matches("GPA 7.5, CGPA 8.25, CGPA 11.0")] == [7.5, 8.25]
+    assert find_cgpa(None) is None
+
+
+def test_sgpa_is_not_a_cgpa():
+    assert find_cgpa("SGPA 9.5") is None
+
+
+def test_model_answers():
+    assert parse_model_answer(" 8.74 ").value == 8.74
+    assert parse_model_answer("The CGPA is 9.12.").value == 9.12
+    assert parse_model_answer("I think it is 7.5 out of 10").label == 'decimal'
+    assert parse_model_answer("no number here") is None
+    assert parse_model_answer("42.5") is None
+
+
+def test_helpers():
+    assert decimals_in_range("8.5 and 12.25 and 1.234 and 9.0") == [8.5, 9.0]
+    assert has_cgpa_context("Cumulative") and not has_cgpa_context("Semester credits")
@@ -0,0 +1,62 @@
+from cgpa_verification import CGPAVerifier, recompute_cgpa
+from gradesheet_parser import parse_gradesheet
+
+
+def test_two_agreeing_strategies_verify_a_value():
+    verifier = CGPAVerifier()
+    verifier.add('targeted', 8.5)
+    verifier.add('ocr', '8.50')
+    verifier.add('vision', None)
+    verdict = verifier.verdict()
+    assert (verdict.value, verdict.verified, verdict.reason) == (8.5, True, 'agreement')
+    assert verdict.sources == ['ocr', 'targeted']
+
+
+def test_dom_strategies_count_as_one_vote():
+    verifier = CGPAVerifier()
+    for source in ('parsed', 'targeted', 'table'):
+        verifier.add(source, 8.5)
+    verdict = verifier.verdict()
+    assert (verdict.verified, verdict.reason) == (False, 'single-source')
+    assert verdict.sources == ['parsed', 'table', 'targeted']
+    assert verdict.confidence == 0.9  # the most trusted DOM reading, not three compounded
+
+    verifier.add('ocr', 8.5)
+    assert verifier.verdict().verified
+
+
+def test_repeated_dom_readings_do_not_outvote_an_independent_one():
+    verifier = CGPAVerifier()
+    verifier.add('targeted', 7.25)
+    verifier.add('table', 7.25)
+    verifier.add('ocr', 8.5)
+    verifier.add('vision', 8.5)
+    assert verifier.verdict().value == 8.5
+
+
+def test_a_single_source_is_not_verified():
+    verifier = CGPAVerifier()
+    assert verifier.verdict() is None
+    verifier.add('vision', 8.1)
+    verdict = verifier.verdict()
+    assert not verdict.verified and verdict.reason == 'single-source'
+
+
+def test_disagreement_is_settled_by_the_recomputed_cgpa(gradesheet_html):
+    recomputed = recompute_cgpa(parse_gradesheet(gradesheet_html))
+    assert recomputed == 8.5
+    verifier = CGPAVerifier(recomputed=recomputed)
+    verifier.add('targeted', 8.05)
+    verifier.add('ocr', 8.5)
+    verdict = verifier.verdict()
+    assert (verdict.value, verdict.verified, verdict.reason) == (8.5, True, 'recomputed')
+
+
+def test_unresolved_disagreement_keeps_the_most_trusted_value():
+    verifier = CGPAVerifier()
+    verifier.add('parsed', 8.74)
+    verifier.add('llm', 7.48)
+    verdict = verifier.verdict()
+    assert (verdict.value, verdict.verified, verdict.reason) == (8.74, False, 'disagreement')
+    assert 0 < verdict.confidence < 1
+    assert recompute_cgpa(None) is None
@@ -0,0 +1,43 @@
+from change_detection import ChangeDetector, SnapshotStore, page_fingerprint
+from gradesheet_parser import parse_gradesheet
+
+
+class CountingStore(SnapshotStore):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.loads = 0
+
+    def load(self, account):
+        self.loads += 1
+        return super().load(account)
+
+
+def test_volatile_markup_does_not_change_the_fingerprint(gradesheet_html):
+    noisy = gradesheet_html.replace('<table', '<input type="hidden" value="x1"><!-- t=1 --><table', 1)
+    assert page_fingerprint(noisy) == page_fingerprint(gradesheet_html)
+
+
+def test_unchanged_page_reads_the_snapshot_once(tmp_path, gradesheet_html):
+    store = CountingStore(str(tmp_path))
+    detector = ChangeDetector(store)
+    assert not detector.is_unchanged('acct', gradesheet_html)
+    changes = detector.record('acct', gradesheet_html, parse_gradesheet(gradesheet_html))
+    assert {c.kind for c in changes} == {'new_semester', 'cgpa_changed'}
+    assert store.loads == 1
+
+    store.loads = 0
+    assert detector.is_unchanged('acct', gradesheet_html)
+    assert detector.previous_cgpa('acct') == 8.5
+    assert store.loads == 1
+
+
+def test_grade_change_is_reported(tmp_path, gradesheet_html):
+    detector = ChangeDetector(SnapshotStore(str(tmp_path)))
+    detector.record('acct', gradesheet_html, parse_gradesheet(gradesheet_html))
+
+    regraded = gradesheet_html.replace('>B<', '>A<')
+    assert not ChangeDetector(SnapshotStore(str(tmp_path))).is_unchanged('acct', regraded)
+    changes = detector.record('acct', regraded, parse_gradesheet(regraded))
+    assert [(c.kind, c.subject_code, c.old, c.new) for c in changes if c.kind == 'grade_changed'] == [
+        ('grade_changed', 'PHY1001', 'B', 'A')
+    ]
@@ -0,0 +1,56 @@
+import dataclasses
+import numpy as np
+import pytest
+from compact_models import Grade, CompactResult, CohortColumns, GRADE_POINTS_TABLE
+
+
+@pytest.fixture
+def cohort(make_result):
+    return [
+        make_result('S1', 8.5, {1: [('MAT1101', 4, 'A', 9), ('PHY1001', 4, 'B', 8)]}),
+        make_result('S2', 7.0, {1: [('MAT1101', 4, 'C', 7)], 2: [('CSE2101', 3, 'A+', 10)]}),
+    ]
+
+
+def test_grades_round_trip_through_labels():
+    assert Grade.from_label(' a+ ') is Grade.A_PLUS and Grade.A_PLUS.label == 'A+'
+    assert all(Grade.from_label(g.label) is g for g in Grade)
+    assert all(GRADE_POINTS_TABLE[g] == g.points for g in Grade)
+
+
+def test_compact_result_round_trips_and_is_frozen(cohort):
+    compact = CompactResult.from_result(cohort[1])
+    assert compact.to_result() == cohort[1]
+    grade = compact.semesters[1].grades[0]
+    assert grade.grade is Grade.A_PLUS and isinstance(compact.semesters, tuple)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        compact.cgpa = 9.9
+    assert not hasattr(grade, '__dict__')  # slotted
+
+
+def test_subject_codes_are_interned(cohort):
+    first, second = (CompactResult.from_result(r) for r in cohort)
+    assert first.semesters[0].grades[0].subject_code is second.semesters[0].grades[0].subject_code
+
+
+def test_cohort_columns_from_objects_and_compact_results(cohort):
+    columns = CohortColumns.from_results(cohort)
+    assert len(columns) == 2 and columns.num_rows == 4
+    assert columns.subjects == ['MAT1101', 'PHY1001', 'CSE2101']
+    assert columns.row_student.tolist() == [0, 0, 1, 1]
+    assert columns.row_semester.tolist() == [1, 1, 1, 2]
+    assert columns.row_grade.tolist() == [Grade.A, Grade.B, Grade.C, Grade.A_PLUS]
+    assert columns.row_points.dtype == np.float32 and columns.row_credits.tolist() == [4, 4, 4, 3]
+    assert columns.cgpa.tolist() == pytest.approx([8.5, 7.0])
+    assert columns.nbytes == 2 * 4 + 4 * (4 + 2 + 4 + 1 + 1 + 4)
+
+    compact = CohortColumns.from_results(CompactResult.from_result(r) for r in cohort)
+    assert compact.row_grade.tolist() == columns.row_grade.tolist()
+
+
+def test_cohort_histograms(cohort):
+    columns = CohortColumns.from_results(cohort)
+    assert columns.subject_histogram('MAT1101') == {'A': 1, 'C': 1}
+    assert columns.subject_grade_histogram().shape == (3, len(Grade))
+    counts, edges = columns.cgpa_distribution(bins=10)
+    assert counts.sum() == 2 and counts[7] == 1 and counts[8] == 1 and edges[-1] == 10.0
@@ -0,0 +1,193 @@
+import time
+import pytest
+from config import JOB_AFFINITY_GRACE
+from job_queue import MemoryBroker, SQLiteBroker, StageWorker
+from rate_limiter import PortalScheduler
+
+
+class FakeScraper:
+    captcha_prefetcher = None
+
+    def __init__(self):
+        self.closed = False
+        self.logins = 0
+
+    def close_browser(self):
+        self.closed = True
+
+    def open_portal_page(self, url):
+        pass
+
+    def login(self):
+        self.logins += 1
+
+    def recover_for_retry(self, error):
+        pass
+
+    def is_session_valid(self):
+        return not self.closed
+
+    def navigate_to_gradesheet(self):
+        pass
+
+    def gradesheet_source(self):
+        return '<html></html>'
+
+    def extract_cgpa_from_gradesheet_tab(self, parsed=None):
+        return 8.5
+
+    cgpa_verdict = None
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def broker(request, tmp_path):
+    return MemoryBroker() if request.param == 'memory' else SQLiteBroker(str(tmp_path / 'jobs.db'))
+
+
+def browser_worker(broker, portal, name):
+    worker = StageWorker(broker, stages=('login', 'extract'), worker_id=name, credentials={})
+    worker.portal = portal
+    worker.change_detector = None
+    return worker
+
+
+def fake_browsers(worker):
+    """Give the worker FakeScrapers instead of browsers; returns the list of those it made"""
+    made = []
+
+    def new_scraper(account):
+        worker.portal.open_session(worker._slot(account))
+        made.append(FakeScraper())
+        return made[-1]
+    worker._new_scraper = new_scraper
+    return made
+
+
+def test_job_moves_through_stages(broker):
+    job_id = broker.enqueue('acct')
+    for stage in ('login', 'extract', 'post_process'):
+        job = broker.lease([stage], 'w1')
+        assert job.stage == stage
+        assert broker.advance(job.id, 'w1', {'stage': stage})
+    job = broker.get(job_id)
+    assert job.status == 'done' and job.payload == {'stage': 'post_process'}
+
+
+def test_failed_job_is_retried_then_dead(broker):
+    job_id = broker.enqueue('acct')
+    for _ in range(broker.max_attempts):
+        job = broker.lease(['login'], 'w1')
+        broker.fail(job.id, 'w1', 'boom')
+    assert broker.get(job_id).status == 'dead'
+    assert broker.lease(['login'], 'w1') is None
+
+
+def test_affinity_reserves_job_for_owning_worker(broker):
+    broker.enqueue('acct')
+    job = broker.lease(['login'], 'w1')
+    broker.advance(job.id, 'w1', {}, affinity='w1')
+    assert broker.lease(['extract'], 'w2') is None
+    assert broker.lease(['extract'], 'w1').id == job.id
+
+
+def test_expired_lease_is_requeued(broker):
+    job_id = broker.enqueue('acct')
+    broker.lease(['login'], 'w1', lease_seconds=-1)
+    assert broker.recover_expired() == (1, 0)
+    assert broker.get(job_id).status == 'queued'
+
+
+def test_closing_a_session_keeps_other_workers_slots(broker):
+    portal = PortalScheduler(max_sessions=2)
+    owner, thief = browser_worker(broker, portal, 'w1'), browser_worker(broker, portal, 'w2')
+    portal.open_session(owner._slot('acct'))
+    owner.sessions['acct'] = scraper = FakeScraper()
+
+    thief.close_session('acct')
+
+    assert portal.stats()['active_sessions'] == 1
+    assert not scraper.closed
+
+
+def test_parked_session_closed_after_affinity_grace(broker):
+    portal = PortalScheduler(max_sessions=2)
+    worker = browser_worker(broker, portal, 'w1')
+    for account, parked_at in (('stale', time.time() - JOB_AFFINITY_GRACE - 1), ('fresh', time.time())):
+        portal.open_session(worker._slot(account))
+        worker.sessions[account] = FakeScraper()
+        worker.parked[account] = parked_at
+    stale = worker.sessions['stale']
+
+    worker.close_stale_sessions()
+
+    assert stale.closed
+    assert list(worker.sessions) == ['fresh']
+    assert portal.stats()['active_sessions'] == 1
+
+
+def test_post_process_job_stores_result_from_worker_thread(tmp_path, monkeypatch, gradesheet_html):
+    import job_queue
+    from concurrent.futures import ThreadPoolExecutor
+    from result_store import ResultStore
+    monkeypatch.setattr(job_queue, 'RESULT_STORE_ENABLED', True)
+    monkeypatch.setattr(job_queue, 'RESULT_DB_PATH', str(tmp_path / 'results.db'))
+    broker = SQLiteBroker(str(tmp_path / 'jobs.db'))
+    job_id = broker.enqueue('acct', {'cgpa': 8.5, 'page_source': gradesheet_html}, stage='post_process')
+
+    # Constructed on this thread and run on a pool thread, as `job_queue.py work` does
+    worker = StageWorker(broker, stages=('post_process',), credentials={})
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(worker.run, exit_when_idle=True).result() == 1
+
+    job = broker.get(job_id)
+    assert job.status == 'done', job.error
+    assert 'page_source' not in job.payload
+    with ResultStore(str(tmp_path / 'results.db')) as store:
+        latest = store.latest('acct')
+    assert latest.cgpa == 8.5
+    assert [g.subject_code for g in latest.semesters[0].grades] == ['MAT1101', 'PHY1001']
+
+
+def test_login_keeps_the_session_on_the_worker(broker):
+    portal = PortalScheduler(max_sessions=2)
+    worker = browser_worker(broker, portal, 'w1')
+    browsers = fake_browsers(worker)
+    job_id = broker.enqueue('acct', {'batch': 1})
+
+    assert worker.run_once() and worker.run_once()
+
+    job = broker.get(job_id)
+    assert job.stage == 'post_process' and job.payload['cgpa'] == 8.5
+    assert 'cookies' not in job.payload and job.payload['batch'] == 1
+    assert len(browsers) == 1 and browsers[0].logins == 1  # extract reused the logged-in browser
+    assert browsers[0].closed and portal.stats()['active_sessions'] == 0
+
+
+def test_extract_on_another_worker_logs_in_again(broker, monkeypatch):
+    import job_queue
+    monkeypatch.setattr(job_queue, 'JOB_AFFINITY_GRACE', 0)
+    portal = PortalScheduler(max_sessions=2)
+    owner, other = browser_worker(broker, portal, 'w1'), browser_worker(broker, portal, 'w2')
+    fake_browsers(owner)
+    other_browsers = fake_browsers(other)
+    job_id = broker.enqueue('acct')
+    job = broker.lease(['login'], 'w1')
+    payload, affinity = owner.run_login(job)
+    broker.advance(job.id, 'w1', payload, affinity)
+
+    assert other.run_once()
+
+    assert broker.get(job_id).stage == 'post_process'
+    assert other_browsers[0].logins == 1
+
+
+def test_job_scrapers_skip_persistence(monkeypatch):
+    import scraper
+    made = {}
+    monkeypatch.setattr(scraper, 'SLCMScraper', lambda **kwargs: made.update(kwargs) or FakeScraper())
+    worker = StageWorker(MemoryBroker(), stages=('login',), credentials={'acct': 'secret'})
+    worker.portal = PortalScheduler(max_sessions=1)
+
+    worker._new_scraper('acct')
+
+    assert made == {'username': 'acct', 'password': 'secret', 'interactive': False, 'persist': False}
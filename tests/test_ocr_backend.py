@@ -0,0 +1,72 @@
+import threading
+import numpy as np
+import pytest
+import ocr_backend
+from ocr_backend import parse_config, image_to_string
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    """Fresh per-thread engine cache and availability for each test"""
+    monkeypatch.setattr(ocr_backend, '_local', threading.local())
+    monkeypatch.setattr(ocr_backend, '_unavailable', set())
+    calls = []
+    monkeypatch.setattr(ocr_backend.pytesseract, 'image_to_string',
+                        lambda image, config='': calls.append(config) or 'from pytesseract')
+    return calls
+
+
+def engine_class(label, error=None, created=None):
+    class Engine:
+        def __init__(self, oem, lang):
+            if created is not None:
+                created.append((label, oem, lang))
+            if error:
+                raise error
+
+        def recognize(self, gray, psm, variables):
+            return f"{label} psm={psm} {sorted(variables.items())}"
+
+        def close(self):
+            pass
+    return Engine
+
+
+def test_parse_config_reads_pytesseract_options():
+    assert parse_config(r'--oem 1 --psm 8 -l eng+hin -c tessedit_char_whitelist=0123456789') == \
+        (1, 8, 'eng+hin', {'tessedit_char_whitelist': '0123456789'})
+    assert parse_config('') == (3, 3, 'eng', {})
+    assert parse_config('--dpi 300 --psm 7') == (3, 7, 'eng', {})  # unknown flags are skipped
+
+
+def test_tesserocr_is_preferred(engines, monkeypatch):
+    monkeypatch.setattr(ocr_backend, '_TesserocrEngine', engine_class('tesserocr'))
+    monkeypatch.setattr(ocr_backend, '_CApiEngine', engine_class('capi'))
+    text = image_to_string(np.zeros((4, 4), np.uint8), config='--psm 8 -c a=1')
+    assert text == "tesserocr psm=8 [('a', '1')]"
+    assert engines == []
+
+
+def test_c_api_when_tesserocr_is_not_installed(engines, monkeypatch):
+    created = []
+    monkeypatch.setattr(ocr_backend, '_TesserocrEngine', engine_class('tesserocr', ImportError(), created))
+    monkeypatch.setattr(ocr_backend, '_CApiEngine', engine_class('capi', created=created))
+    assert image_to_string(np.zeros((4, 4), np.uint8), config='--oem 1').startswith('capi')
+    assert image_to_string(np.zeros((4, 4), np.uint8), config='--oem 0').startswith('capi')
+    assert created == [('tesserocr', 1, 'eng'), ('capi', 1, 'eng'), ('capi', 0, 'eng')]  # tesserocr tried once
+
+
+def test_pytesseract_when_no_engine_loads(engines, monkeypatch):
+    monkeypatch.setattr(ocr_backend, '_TesserocrEngine', engine_class('tesserocr', ImportError()))
+    monkeypatch.setattr(ocr_backend, '_CApiEngine', engine_class('capi', OSError("libtesseract not found")))
+    assert image_to_string(np.zeros((4, 4), np.uint8), config='--psm 7') == 'from pytesseract'
+    assert engines == ['--psm 7']
+    assert ocr_backend._unavailable == {ocr_backend._TesserocrEngine, ocr_backend._CApiEngine}
+
+
+def test_pytesseract_when_the_engine_fails(engines, monkeypatch):
+    failing = engine_class('capi')
+    failing.recognize = lambda self, gray, psm, variables: 1 / 0
+    monkeypatch.setattr(ocr_backend, '_TesserocrEngine', engine_class('tesserocr', ImportError()))
+    monkeypatch.setattr(ocr_backend, '_CApiEngine', failing)
+    assert image_to_string(np.zeros((4, 4), np.uint8)) == 'from pytesseract'
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import pytesseract
+from multiprocessing import shared_memory
+import ocr_service
+from exceptions import ModelUnavailableError
+from ocr_service import OCRService, _attach, run_captcha_strategy
+
+
+def block_exists(name):
+    try:
+        shared_memory.SharedMemory(name=name).close()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+@pytest.fixture
+def shared_names(monkeypatch):
+    """Names of the shared memory blocks OCRService creates"""
+    names = []
+    share = OCRService._share
+
+    def recording(image):
+        block, spec = share(image)
+        names.append(block.name)
+        return block, spec
+    monkeypatch.setattr(OCRService, '_share', staticmethod(recording))
+    return names
+
+
+def test_every_job_reads_one_shared_block(shared_names):
+    image = np.arange(120, dtype=np.uint8).reshape(8, 15)
+    service = OCRService(2)
+    try:
+        futures = service._submit(_attach, image, [()] * 4)
+        for future in futures:
+            assert np.array_equal(future.result(timeout=60), image)
+    finally:
+        service.shutdown()
+    assert len(shared_names) == 1
+    assert not block_exists(shared_names[0])
+
+
+def test_shutdown_unlinks_blocks_of_cancelled_jobs(shared_names):
+    service = OCRService(1)
+    futures = [f for _ in range(5) for f in service._submit(_attach, np.zeros((200, 200), np.uint8), [()] * 3)]
+    service.shutdown()
+    assert all(f.done() for f in futures)
+    assert len(shared_names) == 5
+    assert not any(block_exists(name) for name in shared_names)
+    with pytest.raises(RuntimeError):
+        service._submit(_attach, np.zeros((2, 2), np.uint8), [()])
+    assert not block_exists(shared_names[-1])
+
+
+def test_missing_tesseract_is_not_read_as_no_digits(monkeypatch):
+    def missing(image, config=''):
+        raise pytesseract.TesseractNotFoundError()
+    monkeypatch.setattr(ocr_service.ocr_backend, 'image_to_string', missing)
+    with pytest.raises(ModelUnavailableError, match="Tesseract not found"):
+        run_captcha_strategy(np.full((40, 120), 255, np.uint8), 2.0)
@@ -0,0 +1,70 @@
+from selenium.webdriver.common.by import By
+from data_models import AttendanceRecord
+from page_extractors import ACADEMICS_MENU, PAGE_EXTRACTORS, parse_table_rows
+from scraper import SLCMScraper
+
+ATTENDANCE_HTML = """
+<table><tr><td>Welcome, student</td><td><a href="#">Logout</a></td></tr></table>
+<table>
+  <tr><th>Subject Code</th><th>Subject Name</th><th>Classes Held</th><th>Attended</th><th>%</th></tr>
+  <tr><td>MAT1101</td><td>Engineering Mathematics</td><td>40</td><td>36</td><td>90.0</td></tr>
+</table>
+"""
+
+
+def test_attendance_rows_come_from_the_data_table_only():
+    columns = {
+        'subject_code': ('subject code',), 'subject_name': ('subject name',),
+        'classes_attended': ('attended',), 'classes_held': ('held',), 'percentage': ('%',),
+    }
+    assert parse_table_rows(ATTENDANCE_HTML, AttendanceRecord, columns) == [
+        AttendanceRecord('MAT1101', 'Engineering Mathematics', 40, 36, 90.0)
+    ]
+
+
+def test_each_table_page_waits_for_its_own_headers():
+    ready = {name: extractor.ready_js for name, extractor in PAGE_EXTRACTORS.items()}
+    assert '"attended"' in ready['attendance'] and '"attended"' not in ready['fees']
+    assert '"component"' in ready['marks']
+    assert len(set(ready.values())) == len(ready)
+
+
+class FakeMenuEntry:
+    def __init__(self, page, name):
+        self.page, self.name = page, name
+
+    def is_displayed(self):
+        return self.name != 'link' or self.page.expanded
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        if self.name == 'menu':
+            self.page.expanded = not self.page.expanded
+
+
+class FakeHomePage:
+    """Academics menu that toggles its submenu on every click"""
+
+    def __init__(self, expanded):
+        self.expanded = expanded
+        self.entries = {ACADEMICS_MENU: FakeMenuEntry(self, 'menu'),
+                        (By.PARTIAL_LINK_TEXT, "Attendance"): FakeMenuEntry(self, 'link')}
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def find_element(self, by, value):
+        return self.entries[(by, value)]
+
+    def find_elements(self, by, value):
+        return [self.entries[(by, value)]]
+
+
+def test_an_expanded_menu_is_not_clicked_shut():
+    for expanded in (False, True):
+        scraper = object.__new__(SLCMScraper)
+        scraper.driver = FakeHomePage(expanded)
+        link = scraper.menu_link(PAGE_EXTRACTORS['attendance'].menu)
+        assert link.name == 'link' and scraper.driver.expanded
@@ -0,0 +1,37 @@
+import os
+import profiling
+from profiling import profile_run, profile_stage, merge_runs, read_folded, write_folded
+
+
+@profile_stage('solve')
+def solve():
+    return sum(range(1000))
+
+
+def test_quick_runs_get_their_own_directories(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_MODE', 'cprofile')
+    directories = []
+    for _ in range(2):
+        with profile_run('login') as profiler:
+            solve()
+        directories.append(profiler.directory)
+
+    assert directories[0] != directories[1]
+    assert all(os.path.exists(os.path.join(d, 'run.pstats')) for d in directories)
+    merged = merge_runs(directories, str(tmp_path / 'batch'))
+    assert merged['runs'] == 2
+    assert merged['stages']['solve']['calls'] == 2
+    assert os.path.exists(tmp_path / 'batch.pstats')
+
+
+def test_profiling_off_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_MODE', 'off')
+    with profile_run('login') as profiler:
+        assert solve() == 499500
+    assert profiler is None
+
+
+def test_folded_stacks_round_trip(tmp_path):
+    path = str(tmp_path / 'stacks.folded')
+    write_folded(path, {'run;solve;main.py:f': 3, 'run;login': 1})
+    assert read_folded(path) == {'run;solve;main.py:f': 3, 'run;login': 1}
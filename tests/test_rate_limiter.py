@@ -0,0 +1,80 @@
+import threading
+import pytest
+from exceptions import PortalError
+from rate_limiter import TokenBucket, PortalScheduler, looks_like_portal_error, raise_for_error_page
+
+
+def test_token_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 1.0
+    assert not bucket.acquire(timeout=0.01)
+
+
+def test_error_pages_are_recognised():
+    assert looks_like_portal_error("<h1>Server Error in '/' Application.</h1>")
+    assert not looks_like_portal_error("<table><tr><td>CGPA</td><td>8.5</td></tr></table>")
+    with pytest.raises(PortalError):
+        raise_for_error_page("<title>503 Service Unavailable</title>")
+
+
+def test_session_slots_are_limited_and_idempotent():
+    scheduler = PortalScheduler(max_sessions=1)
+    assert scheduler.open_session('a')
+    assert scheduler.open_session('a')
+    assert not scheduler.open_session('b', timeout=0.01)
+    scheduler.close_session('a')
+    assert scheduler.open_session('b', timeout=0.01)
+
+
+def test_closing_a_session_wakes_a_waiter():
+    scheduler = PortalScheduler(max_sessions=1)
+    scheduler.open_session('a')
+    opened = []
+    waiter = threading.Thread(target=lambda: opened.append(scheduler.open_session('b', timeout=5)))
+    waiter.start()
+    scheduler.close_session('a')
+    waiter.join(5)
+    assert opened == [True]
+
+
+def test_slow_responses_slow_requests_down():
+    scheduler = PortalScheduler(requests_per_second=2.0, target_response=1.0, max_slowdown=4.0)
+    scheduler.record_response(3.0)
+    assert scheduler.slowdown == 3.0
+    assert scheduler.requests.rate == pytest.approx(2.0 / 3.0)
+    scheduler.record_response(100.0)
+    assert scheduler.slowdown == 4.0
+
+
+def test_portal_errors_back_off_until_a_success():
+    scheduler = PortalScheduler(backoff_base=10.0, backoff_max=60.0)
+    with pytest.raises(PortalError):
+        with scheduler.request():
+            raise PortalError("error page")
+    stats = scheduler.stats()
+    assert stats['errors'] == 1 and stats['errors_in_a_row'] == 1
+    assert scheduler.paused_until > 0
+
+    scheduler.record_response(0.1)
+    assert scheduler.paused_until == 0.0 and scheduler.errors_in_a_row == 0
+
+
+def test_non_portal_failures_do_not_back_off():
+    scheduler = PortalScheduler()
+    with pytest.raises(ValueError):
+        with scheduler.request():
+            raise ValueError("bad captcha")
+    assert scheduler.stats()['errors'] == 0
+
+
+def test_watch_backs_off_on_errors_without_timing_a_response():
+    scheduler = PortalScheduler()
+    with scheduler.watch():
+        pass
+    assert scheduler.stats()['response_ewma'] is None
+    with pytest.raises(PortalError):
+        with scheduler.watch():
+            raise_for_error_page("<title>503 Service Unavailable</title>")
+    assert scheduler.stats()['errors_in_a_row'] == 1
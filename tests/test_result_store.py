@@ -0,0 +1,53 @@
+import csv
+import json
+import pytest
+from result_store import ResultStore, FLAT_COLUMNS
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(str(tmp_path / 'results.db'), batch_size=2) as store:
+        yield store
+
+
+def test_history_and_latest_per_account(store, make_result):
+    store.write(make_result('s1', 8.0, {1: [('MAT1101', 4, 'B', 8)]}), scraped_at=100.0)
+    store.write(make_result('s1', 8.5, {1: [('MAT1101', 4, 'A', 9)]}), scraped_at=200.0)
+    store.write(make_result('s2', 7.0, {}), scraped_at=150.0)
+
+    assert store.accounts() == ['s1', 's2']
+    assert [(at, r.cgpa) for at, r in store.history('s1')] == [(100.0, 8.0), (200.0, 8.5)]
+    latest = store.latest('s1')
+    assert latest.semesters[0].grades[0].grade == 'A'
+    assert store.latest('nobody') is None
+    assert [(a, r.cgpa) for a, _, r in store.iter_results(latest_only=True)] == [('s1', 8.5), ('s2', 7.0)]
+
+
+def test_write_many_streams_in_batches(store, make_result):
+    results = (make_result(f"s{i}", 8.0, {}) for i in range(5))
+    assert store.write_many(results) == 5
+    assert len(list(store.iter_results())) == 5
+
+
+def test_exports(store, make_result, tmp_path):
+    store.write(make_result('s1', 8.5, {1: [('MAT1101', 4, 'A', 9), ('PHY1001', 4, 'B', 8)]}), scraped_at=1.0)
+    store.write(make_result('s2', 7.0, {}), scraped_at=2.0)
+
+    assert store.export_jsonl(str(tmp_path / 'out.jsonl')) == 2
+    with open(tmp_path / 'out.jsonl', encoding='utf-8') as f:
+        first = json.loads(f.readline())
+    assert first['account'] == 's1' and first['semesters'][0]['grades'][1]['subject_code'] == 'PHY1001'
+
+    # One row per subject, and one empty row for a result without grades
+    assert store.export_csv(str(tmp_path / 'out.csv')) == 3
+    with open(tmp_path / 'out.csv', newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == FLAT_COLUMNS
+    assert [row['subject_code'] for row in rows] == ['MAT1101', 'PHY1001', '']
+
+
+def test_parquet_export(store, make_result, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    store.write_many(make_result(f"s{i}", 8.0, {1: [('MAT1101', 4, 'A', 9)]}) for i in range(3))
+    assert store.export_parquet(str(tmp_path / 'out.parquet')) == 3
+    assert pq.read_table(str(tmp_path / 'out.parquet')).num_rows == 3
@@ -0,0 +1,109 @@
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from exceptions import CaptchaError, InvalidCredentialsError, LoginError, PortalError
+from retry_policy import RetryPolicy, FailureKind, classify_failure, is_credential_rejection, CredentialGuard
+
+
+def fast_policy(**kwargs):
+    return RetryPolicy(base_delay=0.0, max_delay=0.0, **kwargs)
+
+
+@pytest.mark.parametrize('message', [
+    "Invalid Username or Password",
+    "Invalid User Id / Password",
+    "Incorrect password",
+    "Your account has been locked",
+    "Password is incorrect",
+])
+def test_credential_rejections(message):
+    assert is_credential_rejection(message)
+    assert classify_failure(LoginError(f"Login failed: {message}")) == FailureKind.CREDENTIALS
+
+
+@pytest.mark.parametrize('message', [
+    "user session expired",
+    "Invalid captcha",
+    "User not found in session, please login again",
+    "invalid element state",
+])
+def test_other_messages_are_not_credential_rejections(message):
+    assert not is_credential_rejection(message)
+    assert classify_failure(LoginError(message)) != FailureKind.CREDENTIALS
+
+
+def test_classification_by_type_and_cause():
+    assert classify_failure(CaptchaError("x")) == FailureKind.CAPTCHA
+    assert classify_failure(InvalidCredentialsError("x")) == FailureKind.CREDENTIALS
+    assert classify_failure(TimeoutException("x")) == FailureKind.TIMEOUT
+    assert classify_failure(WebDriverException("x")) == FailureKind.SESSION_LOST
+    try:
+        try:
+            raise PortalError("error page")
+        except PortalError as cause:
+            raise LoginError("Login error") from cause
+    except LoginError as e:
+        assert classify_failure(e) == FailureKind.PORTAL
+
+
+def test_retries_until_success():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise CaptchaError("wrong captcha")
+        return 'ok'
+
+    recoveries = []
+    assert fast_policy(max_attempts=3).run(flaky, on_retry=lambda *a: recoveries.append(a[0])) == 'ok'
+    assert recoveries == [FailureKind.CAPTCHA, FailureKind.CAPTCHA]
+
+
+def test_credential_failures_are_not_retried():
+    calls = []
+
+    def rejected():
+        calls.append(1)
+        raise InvalidCredentialsError("Invalid Username or Password")
+
+    with pytest.raises(InvalidCredentialsError):
+        fast_policy(max_attempts=3).run(rejected)
+    assert len(calls) == 1
+
+
+def test_failed_recovery_counts_as_an_attempt():
+    calls, recoveries = [], []
+
+    def login():
+        calls.append(1)
+        if len(calls) == 1:
+            raise CaptchaError("wrong captcha")
+        return 'ok'
+
+    def recover(kind, error, attempt):
+        recoveries.append(kind)
+        if len(recoveries) == 1:
+            raise PortalError("error page while reloading the login form")
+
+    assert fast_policy(max_attempts=3).run(login, on_retry=recover) == 'ok'
+    assert recoveries == [FailureKind.CAPTCHA, FailureKind.PORTAL]
+    assert len(calls) == 2
+
+
+def test_failed_recovery_on_the_last_attempt_raises_its_error():
+    def login():
+        raise CaptchaError("wrong captcha")
+
+    def recover(kind, error, attempt):
+        raise WebDriverException("chrome not reachable")
+
+    with pytest.raises(WebDriverException):
+        fast_policy(max_attempts=2).run(login, on_retry=recover)
+
+
+def test_credential_guard():
+    guard = CredentialGuard()
+    guard.mark_bad('acct', 'rejected')
+    assert guard.is_blocked('acct')
+    guard.clear('acct')
+    assert not guard.is_blocked('acct')
@@ -0,0 +1,65 @@
+import base64
+import pytest
+from screenshot_capture import capture_grade_table, CaptureStats, GRADE_TABLE_RECT_JS
+import screenshot_capture
+
+
+class FakeDevTools:
+    """Driver stand-in: the grade table rect and device pixel ratio come from execute_script"""
+
+    def __init__(self, rect, pixel_ratio=1, viewport=None):
+        self.rect = rect
+        self.pixel_ratio = pixel_ratio
+        self.viewport = viewport or {'pageX': 0, 'pageY': 300, 'clientWidth': 1280, 'clientHeight': 720}
+        self.params = None
+
+    def execute_script(self, script):
+        return self.rect if script == GRADE_TABLE_RECT_JS else self.pixel_ratio
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == 'Page.getLayoutMetrics':
+            return {'cssVisualViewport': self.viewport}
+        assert cmd == 'Page.captureScreenshot'
+        self.params = params
+        return {'data': base64.b64encode(b'x' * 1000).decode()}
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    fresh = CaptureStats()
+    monkeypatch.setattr(screenshot_capture, 'capture_stats', fresh)
+    return fresh
+
+
+def test_table_is_clipped_with_padding_and_scaled_for_the_pixel_ratio(stats):
+    driver = FakeDevTools({'x': 100, 'y': 4, 'width': 784, 'height': 392}, pixel_ratio=2)
+    capture = capture_grade_table(driver, 448, image_format='jpeg', quality=80, padding=8)
+
+    # Padding grows the box (clamped at the page edge); 800 CSS px -> 448 image px at DPR 2
+    assert driver.params == {
+        'format': 'jpeg', 'quality': 80, 'captureBeyondViewport': True, 'fromSurface': True,
+        'clip': {'x': 92, 'y': 0, 'width': 800, 'height': 408, 'scale': 448 / 800 / 2},
+    }
+    assert (capture.width, capture.height) == (448, 228)
+    assert (capture.source_width, capture.source_height) == (800, 408)
+    assert capture.element and capture.data == b'x' * 1000
+    assert capture.decoded_bytes == 448 * 228 * 3
+    assert stats.summary() == {'captures': 1, 'encoded_kb': 1.0, 'decoded_mb': 0.29, 'largest_kb': 1.0}
+
+
+def test_small_table_is_not_upscaled():
+    driver = FakeDevTools({'x': 10, 'y': 10, 'width': 200, 'height': 100}, pixel_ratio=1.5)
+    capture = capture_grade_table(driver, 1024, image_format='png', padding=0)
+    assert driver.params['clip']['scale'] == pytest.approx(1 / 1.5)
+    assert 'quality' not in driver.params  # png has no quality setting
+    assert (capture.width, capture.height) == (200, 100)
+
+
+def test_viewport_when_no_grade_table(stats):
+    driver = FakeDevTools(None, pixel_ratio=None)
+    capture = capture_grade_table(driver, 640, image_format='webp', quality=70)
+    assert driver.params['clip'] == {'x': 0, 'y': 300, 'width': 1280, 'height': 720, 'scale': 0.5}
+    assert not capture.element
+    assert (capture.width, capture.height) == (640, 360)
+    capture_grade_table(driver, 640, image_format='webp')
+    assert stats.summary()['captures'] == 2
@@ -0,0 +1,40 @@
+import json
+import threading
+from selenium.webdriver.common.by import By
+from selector_cache import SelectorCache
+
+
+def test_entries_survive_a_reload_and_keep_their_history(tmp_path):
+    path = str(tmp_path / 'selectors.json')
+    cache = SelectorCache(path)
+    cache.record('login', 'username', 'ID txtUserid', By.ID, 'txtUserid')
+    cache.record('login', 'username', 'ID txtUserId', By.ID, 'txtUserId')
+
+    entry = SelectorCache(path).get('login', 'username')
+    assert entry['value'] == 'txtUserId' and entry['revision'] == 2
+    assert entry['previous'] == {'by': By.ID, 'value': 'txtUserid'}
+
+
+def test_concurrent_scrapers_save_without_clobbering_temp_files(tmp_path, caplog):
+    path = str(tmp_path / 'selectors.json')
+    caches = [SelectorCache(path) for _ in range(8)]
+    errors = []
+
+    def save_many(cache, n):
+        try:
+            for i in range(50):
+                cache.record('login', f"field{n}", 'label', By.ID, f"id{i}")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_many, args=(cache, n)) for n, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert 'Could not save selector cache' not in caplog.text  # a shared temp file gets renamed away
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['version'] == 1
+    assert [p.name for p in tmp_path.iterdir()] == ['selectors.json']
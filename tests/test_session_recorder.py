@@ -0,0 +1,85 @@
+import io
+import pytest
+from PIL import Image
+from selenium.webdriver.common.by import By
+from session_recorder import SessionRecorder, SessionBundle, ReplayVision, RecordedPageDriver, image_digest, replay
+from vision_backend import profile_for
+
+MODELS = {'captcha': 'llava', 'cgpa': 'llava', 'cgpa_fallback': 'llava'}
+
+
+@pytest.fixture
+def captcha_png():
+    buffer = io.BytesIO()
+    Image.new('RGB', (120, 40), 'white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def record_run(directory, captcha_png, gradesheet_html):
+    recorder = SessionRecorder('student01', directory=str(directory))
+    recorder.manifest['models'] = dict(MODELS)
+    recorder.captcha(captcha_png)
+    image_path = directory / 'captcha.png'
+    image_path.write_bytes(captcha_png)
+    for prompt in profile_for('llava').prompts['captcha']:
+        recorder.model_response('captcha', prompt, [captcha_png], '472', 0.5)
+    recorder.captcha_solved(str(image_path), [], '472', 2.0)
+    recorder.page('gradesheet', gradesheet_html, 'https://slcm.manipal.edu/GradeSheet.aspx')
+    recorder.step('extract_cgpa', 1.2, result=8.5)
+    recorder.step('pages', 0.8, result={'attendance': 3, 'fees': {'due': 0}})
+    return recorder.save()
+
+
+def test_bundle_round_trip(tmp_path, captcha_png, gradesheet_html):
+    bundle = SessionBundle(record_run(tmp_path, captcha_png, gradesheet_html))
+    assert bundle.manifest['account'] == 'stu***'
+    assert bundle.page(bundle.manifest['pages'][0]) == gradesheet_html
+    assert bundle.captcha_bytes(image_digest(captcha_png)) == captcha_png
+    assert bundle.step('pages')['result'] == {'attendance': 3, 'fees': {'due': 0}}
+    assert bundle.step('extract_cgpa')['result'] == 8.5
+
+
+def test_exact_hits_are_not_handed_out_again(tmp_path, captcha_png, gradesheet_html):
+    bundle = SessionBundle(record_run(tmp_path, captcha_png, gradesheet_html))
+    bundle.manifest['model_responses'] = [
+        {'task': 'cgpa', 'prompt': 'p', 'images': ['aaa'], 'answer': '8.1', 'seconds': 0.1},
+        {'task': 'cgpa', 'prompt': 'p', 'images': [image_digest(b'second')], 'answer': '8.2', 'seconds': 0.1},
+    ]
+    vision = ReplayVision(bundle)
+    assert vision.ask('cgpa', 'p', [b'second']) == '8.2'
+    assert vision.ask('cgpa', 'p', [b're-rendered']) == '8.1'
+    assert vision.ask('cgpa', 'p', [b'another']) == ''
+    assert vision.misses == 1
+
+
+def test_replay_runs_without_a_browser(tmp_path, captcha_png, gradesheet_html, monkeypatch):
+    import scraper
+    monkeypatch.setattr(scraper, 'acquire_browser', lambda: pytest.fail("replay launched a browser"))
+    assert replay(record_run(tmp_path, captcha_png, gradesheet_html))
+
+
+def test_replay_reports_a_broken_extractor(tmp_path, captcha_png, gradesheet_html, monkeypatch):
+    import scraper
+    import gradesheet_parser
+    parse = gradesheet_parser.parse_gradesheet
+
+    def misread(html, **kwargs):
+        result = parse(html, **kwargs)
+        result.cgpa = 7.25
+        return result
+    monkeypatch.setattr(gradesheet_parser, 'parse_gradesheet', misread)
+    monkeypatch.setattr(scraper, 'recompute_cgpa', lambda parsed: None)
+    monkeypatch.setattr(scraper.SLCMScraper, 'extract_cgpa_from_table', lambda self: 7.25)
+    monkeypatch.setattr(scraper.SLCMScraper, 'extract_cgpa_targeted', lambda self: 7.25)
+    assert not replay(record_run(tmp_path, captcha_png, gradesheet_html))
+
+
+def test_recorded_page_driver_evaluates_scraper_locators(gradesheet_html):
+    driver = RecordedPageDriver(gradesheet_html, 'https://slcm.manipal.edu/GradeSheet.aspx')
+    value = driver.find_element(By.XPATH, "//td[contains(text(), 'CGPA')]/following-sibling::td")
+    assert value.text == '8.50'
+    assert value.find_element(By.XPATH, "./ancestor::tr[1]").text == 'CGPA 8.50'
+    assert [e.text for e in driver.find_elements(By.XPATH, "//tr[last()]//td")] == ['CGPA', '8.50', 'SGPA', '8.50']
+    table = driver.find_elements(By.TAG_NAME, 'table')[1]
+    assert [e.text for e in table.find_elements(By.XPATH, ".//td | .//th")][:3] == ['Code', 'Subject', 'Credits']
+    assert driver.save_screenshot('unused.png') is False
@@ -0,0 +1,70 @@
+import tab_manager
+from tab_manager import TabManager
+
+
+class FakeBrowser:
+    """Driver stand-in recording tab switches and closes"""
+
+    def __init__(self):
+        self.current_window_handle = 'home'
+        self.switches = []
+        self.closed = []
+        self.switch_to = self
+
+    def window(self, handle):
+        self.current_window_handle = handle
+        self.switches.append(handle)
+
+    def close(self):
+        self.closed.append(self.current_window_handle)
+
+
+class FakeNavigator:
+    """Each handle becomes ready on its n-th readiness check (None: never)"""
+
+    def __init__(self, ready_after):
+        self.ready_after = ready_after
+        self.checks = {}
+
+    def drain(self):
+        pass
+
+    def is_quiet(self, handle, idle_seconds):
+        return True
+
+    def check_ready(self, handle, ready_js, idle_seconds):
+        self.checks[handle] = self.checks.get(handle, 0) + 1
+        after = self.ready_after[handle]
+        return 'table' if after is not None and self.checks[handle] >= after else None
+
+
+def test_tabs_are_handed_out_as_they_become_ready(monkeypatch):
+    monkeypatch.setattr(tab_manager, 'POLL_INTERVAL', 0)
+    driver = FakeBrowser()
+    tabs = TabManager(driver, FakeNavigator({'t-slow': 3, 't-fast': 1, 't-hung': None}))
+    for name in ('slow', 'fast', 'hung'):
+        tabs.add(name, f"t-{name}", ready_js='return true')
+
+    order = []
+    for tab in tabs.as_ready(timeout=0.2):
+        assert driver.current_window_handle == tab.handle  # switched to the tab it yields
+        order.append((tab.name, tab.reason))
+
+    assert order == [('fast', 'table'), ('slow', 'table'), ('hung', None)]
+    assert all(tab.ready_at is not None for tab in tabs.tabs.values())
+    assert list(tabs.as_ready()) == []  # nothing left pending
+
+
+def test_close_all_keeps_named_tabs_and_returns_home():
+    driver = FakeBrowser()
+    tabs = TabManager(driver, FakeNavigator({}))
+    for name in ('gradesheet', 'attendance', 'fees'):
+        tabs.add(name, f"t-{name}")
+
+    tabs.close_all(keep=('gradesheet',))
+
+    assert driver.closed == ['t-attendance', 't-fees']
+    assert list(tabs.tabs) == ['gradesheet'] and tabs.get('fees') is None
+    assert driver.current_window_handle == 'home'
+    tabs.close('missing')  # unknown names are ignored
+    assert driver.closed == ['t-attendance', 't-fees']
@@ -0,0 +1,74 @@
+import io
+import threading
+import time
+import numpy as np
+import pytest
+from PIL import Image
+from variant_store import VariantStore, image_key, read_image
+
+
+def gray(value, side=10):
+    return np.full((side, side), value, dtype=np.uint8)
+
+
+def test_variants_are_computed_once_and_read_only():
+    store = VariantStore()
+    calls = []
+    first = store.get('img', 'threshold', (127,), lambda: calls.append(1) or gray(5))
+    second = store.get('img', 'threshold', (127,), lambda: calls.append(1) or gray(6))
+    assert first is second and len(calls) == 1
+    with pytest.raises(ValueError):
+        first.array[0, 0] = 1
+    assert store.get('img', 'threshold', (100,), lambda: gray(7)) is not first  # other params, other variant
+
+
+def test_concurrent_requests_share_one_computation():
+    store = VariantStore()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return gray(1)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get('img', 'blur', (3,), slow)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and len({id(v) for v in results}) == 1
+
+
+def test_least_recently_used_variants_are_evicted():
+    store = VariantStore(max_bytes=250)  # room for two 10x10 arrays
+    store.get('a', 'v', (), lambda: gray(1))
+    store.get('b', 'v', (), lambda: gray(2))
+    store.get('a', 'v', (), lambda: gray(1))  # a is now the most recent
+    store.get('c', 'v', (), lambda: gray(3))
+    assert set(key[0] for key in store.entries) == {'a', 'c'}
+    assert store.summary()['evictions'] == 1
+
+
+def test_png_is_encoded_once(tmp_path):
+    store = VariantStore()
+    png = store.png('img', 'gray', (), lambda: gray(200))
+    assert store.png('img', 'gray', (), lambda: gray(0)) is png
+    assert store.summary()['encodes'] == 1
+    assert np.array_equal(np.asarray(Image.open(io.BytesIO(png))), gray(200))
+
+    path = tmp_path / 'captcha.png'
+    path.write_bytes(png)
+    assert read_image(str(path)) == (image_key(png), png)
+
+
+def test_failed_computation_is_not_stored():
+    store = VariantStore()
+
+    def broken():
+        raise RuntimeError("bad image")
+
+    with pytest.raises(RuntimeError):
+        store.get('img', 'v', (), broken)
+    assert store.get('img', 'v', (), lambda: gray(1)).array[0, 0] == 1
@@ -0,0 +1,107 @@
+import pytest
+import vision_backend
+from exceptions import ModelUnavailableError
+from vision_backend import VisionBackend, VisionService
+
+
+class FakeBackend(VisionBackend):
+    """Every model answers '472' except those listed in `broken`, which raise"""
+
+    def __init__(self, models, broken=()):
+        self.models = models
+        self.broken = set(broken)
+        self.calls = []
+
+    def list_models(self):
+        return list(self.models)
+
+    def chat(self, model, prompt, images, options=None):
+        self.calls.append(model)
+        if model in self.broken:
+            raise ConnectionError(f"{model} is not loaded")
+        return '472'
+
+
+@pytest.fixture(autouse=True)
+def no_overrides(monkeypatch, tmp_path):
+    monkeypatch.setattr(vision_backend, 'VISION_SELECTION_CACHE', str(tmp_path / 'vision_models.json'))
+    for name in ('VISION_MODEL', 'CAPTCHA_VISION_MODEL', 'CGPA_VISION_MODEL', 'VISION_BENCHMARK_DIR'):
+        monkeypatch.setattr(vision_backend, name, None)
+    monkeypatch.setattr(vision_backend, 'VISION_MODEL_CANDIDATES', ['moondream', 'llava'])
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        VisionBackend()
+
+
+def test_broken_candidates_are_skipped_and_the_choice_cached():
+    backend = FakeBackend(['moondream:latest', 'llava:7b'], broken=['moondream:latest'])
+    service = VisionService(backend)
+    assert service.initialize(wait=True)
+    assert service.model_for('captcha') == 'llava:7b'
+    assert service.model_for('cgpa_fallback') == 'llava:7b'
+
+    again = VisionService(FakeBackend(['moondream:latest', 'llava:7b']))
+    again.initialize()
+    assert again.selection is None  # nothing left to benchmark
+    assert again.model_for('cgpa') == 'llava:7b'
+
+
+def test_no_working_candidate_is_reported():
+    service = VisionService(FakeBackend(['moondream', 'llava'], broken=['moondream', 'llava']))
+    service.installed = service.backend.list_models()
+    with pytest.raises(ModelUnavailableError):
+        service.select_model('captcha')
+
+    assert not service.initialize(wait=True)
+
+
+def test_startup_does_not_wait_for_the_benchmark(monkeypatch):
+    backend = FakeBackend(['moondream', 'llava'])
+    service = VisionService(backend)
+    release = vision_backend.threading.Event()
+    monkeypatch.setattr(service, 'measure', lambda model, task: release.wait(5) and (None, 0.1))
+    try:
+        assert service.initialize()
+        assert service.model_for('captcha') == 'moondream'  # first candidate while benchmarking
+    finally:
+        release.set()
+        service.selection.join(5)
+
+
+def test_without_labelled_samples_the_fastest_model_wins(monkeypatch):
+    service = VisionService(FakeBackend(['moondream', 'llava']))
+    service.installed = service.backend.list_models()
+    latencies = {'moondream': 2.0, 'llava': 0.5}
+    monkeypatch.setattr(service, 'measure', lambda model, task: (None, latencies[model]))
+    assert service.select_model('captcha') == 'llava'
+
+
+def test_labelled_samples_make_accuracy_count(monkeypatch, tmp_path):
+    for name in ('472.png', '472_2.png'):
+        (tmp_path / 'captcha').mkdir(exist_ok=True)
+        (tmp_path / 'captcha' / name).write_bytes(b'')
+    monkeypatch.setattr(vision_backend, 'VISION_BENCHMARK_DIR', str(tmp_path))
+
+    class SlowButRight(FakeBackend):
+        def chat(self, model, prompt, images, options=None):
+            return '472' if model == 'llava' else '999'
+
+    service = VisionService(SlowButRight(['moondream', 'llava']))
+    service.installed = service.backend.list_models()
+    assert service.measure('llava', 'captcha')[0] == 1.0
+    assert service.measure('moondream', 'captcha')[0] == 0.0
+    assert service.select_model('captcha') == 'llava'
+    assert service._selection_key('captcha').startswith('captcha:labelled:')
+
+
+def test_one_vision_service_per_process(monkeypatch):
+    backend = FakeBackend(['llava'])
+    monkeypatch.setattr(vision_backend, '_service', None)
+    monkeypatch.setattr(vision_backend, 'OllamaBackend', lambda: backend)
+    first = vision_backend.get_vision_service()
+    first.selection.join(5)
+    calls = len(backend.calls)
+    assert vision_backend.get_vision_service() is first
+    assert first.available and len(backend.calls) == calls  # no second benchmark
@@ -0,0 +1,56 @@
+import threading
+from vision_batcher import VisionBatcher, parse_multi_image_answer
+
+
+class FakeModel:
+    """chat_fn stand-in: answers each image with its own label, batched answers optionally wrong"""
+
+    def __init__(self, batched_wrong=False):
+        self.batched_wrong = batched_wrong
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, model, prompt, images, options=None):
+        with self.lock:
+            self.calls.append(len(images))
+        if len(images) == 1:
+            return images[0]
+        return '\n'.join(f"{n}: {'999' if self.batched_wrong else image}" for n, image in enumerate(images, start=1))
+
+
+def submit_together(batcher, images):
+    futures = [batcher.submit('Read the digits', image) for image in images]
+    return [f.result(timeout=5) for f in futures]
+
+
+def test_parse_multi_image_answer():
+    assert parse_multi_image_answer("1: 123\nImage 2) 456\nnoise\n5: 1", 3) == {1: '123', 2: '456'}
+
+
+def test_single_image_models_get_one_image_per_request():
+    model = FakeModel()
+    batcher = VisionBatcher('llava', max_images=1, max_wait=0.2, chat_fn=model)
+    assert submit_together(batcher, ['111', '222', '333']) == ['111', '222', '333']
+    assert model.calls == [1, 1, 1]
+
+
+def test_multi_image_batch_is_verified_against_a_single_answer():
+    model = FakeModel()
+    batcher = VisionBatcher('qwen2.5vl', max_images=3, max_wait=0.5, chat_fn=model, verify_every=5)
+    assert submit_together(batcher, ['111', '222', '333']) == ['111', '222', '333']
+    assert model.calls == [3, 1]  # one batch plus the check on its first image
+    assert batcher.checks == {'verified': 1, 'agreed': 1}
+    assert batcher.max_images == 3
+
+
+def test_batching_switched_off_when_batched_answers_disagree():
+    model = FakeModel(batched_wrong=True)
+    batcher = VisionBatcher('qwen2.5vl', max_images=2, max_wait=0.5, chat_fn=model, verify_every=1)
+    for _ in range(3):
+        submit_together(batcher, ['111', '222'])
+    assert batcher.checks == {'verified': 3, 'agreed': 0}
+    assert batcher.max_images == 1
+
+    model.calls.clear()
+    assert submit_together(batcher, ['444', '555']) == ['444', '555']
+    assert model.calls == [1, 1]
@@ -1,21 +1,20 @@
 # utils.py
-import time
 import logging
 from functools import wraps
+from retry_policy import RetryPolicy
+
+def retry_on_failure(max_attempts=3, delay=2, policy=None):
+    """
+    Decorator for retrying failed operations.
+    Backed by retry_policy.RetryPolicy: only retryable failures are retried, with
+    exponential backoff and jitter starting at `delay` seconds.
+    """
+    policy = policy or RetryPolicy(max_attempts=max_attempts, base_delay=delay)
 
-def retry_on_failure(max_attempts=3, delay=2):
-    """Decorator for retrying failed operations"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            for attempt in range(max_attempts):
-                try:
-                    return func(*args, **kwargs)
-                except Exception as e:
-                    if attempt == max_attempts - 1:
-                        raise e
-                    time.sleep(delay)
-            return None
+            return policy.run(func, *args, **kwargs)
         return wrapper
     return decorator
 
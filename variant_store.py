@@ -0,0 +1,136 @@
+# variant_store.py
+# Memory-bounded LRU store of preprocessed image variants (arrays and their PNG encodings), keyed by
+# the source image's hash plus the preprocessing parameters and shared by every captcha solver
+import io
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from PIL import Image
+from config import VARIANT_STORE_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+
+def image_key(image_bytes):
+    return hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+
+
+def read_image(path):
+    """(image_key, bytes) of an image file"""
+    with open(path, 'rb') as f:
+        image_bytes = f.read()
+    return image_key(image_bytes), image_bytes
+
+
+@dataclass
+class Variant:
+    array: np.ndarray  # read-only: the same array is handed to every solver
+    png: Optional[bytes] = None
+
+    @property
+    def nbytes(self):
+        return self.array.nbytes + len(self.png or b'')
+
+
+class VariantStore:
+    """
+    (image_key, name, params) -> Variant. Each variant is computed once even when several threads
+    ask for it at the same time, and PNG-encoded at most once. The least recently used variants are
+    evicted when the total size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes=VARIANT_STORE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.key_locks = {}  # per-key locks so one thread computes while the others wait
+        self.stats = {'hits': 0, 'misses': 0, 'encodes': 0, 'evictions': 0}
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def _lookup(self, key):
+        with self.lock:
+            variant = self.entries.get(key)
+            if variant is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+            return variant
+
+    def _evict(self, keep):
+        """Drop least recently used entries until under max_bytes (the entry `keep` always stays)"""
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            key, variant = next(iter(self.entries.items()))
+            if key == keep:
+                self.entries.move_to_end(key)
+                continue
+            del self.entries[key]
+            self.key_locks.pop(key, None)
+            self.size -= variant.nbytes
+            self.stats['evictions'] += 1
+
+    def get(self, image_key, name, params, compute):
+        """The variant, running compute() (-> ndarray or PIL image) only if it is not stored yet"""
+        key = (image_key, name, params)
+        variant = self._lookup(key)
+        if variant is not None:
+            return variant
+
+        with self._key_lock(key):
+            variant = self._lookup(key)
+            if variant is not None:
+                return variant
+            try:
+                array = np.ascontiguousarray(np.asarray(compute()))
+            except Exception:
+                with self.lock:
+                    self.key_locks.pop(key, None)
+                raise
+            array.setflags(write=False)
+            variant = Variant(array)
+            with self.lock:
+                self.entries[key] = variant
+                self.size += variant.nbytes
+                self.stats['misses'] += 1
+                self._evict(keep=key)
+        return variant
+
+    def png(self, image_key, name, params, compute):
+        """PNG bytes of the variant, encoded on first use"""
+        key = (image_key, name, params)
+        variant = self.get(image_key, name, params, compute)
+        if variant.png is None:
+            with self._key_lock(key):
+                if variant.png is None:
+                    buffer = io.BytesIO()
+                    Image.fromarray(variant.array).save(buffer, format='PNG')
+                    variant.png = buffer.getvalue()
+                    with self.lock:
+                        self.stats['encodes'] += 1
+                        if self.entries.get(key) is variant:
+                            self.size += len(variant.png)
+                            self._evict(keep=key)
+        return variant.png
+
+    def summary(self):
+        with self.lock:
+            return {**self.stats, 'entries': len(self.entries), 'megabytes': round(self.size / 1024 / 1024, 2)}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_variant_store():
+    """The process-wide variant store shared by all solvers"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VariantStore()
+        return _store
@@ -0,0 +1,333 @@
+# vision_backend.py
+# Pluggable vision backend: model profiles with per-task prompts, and latency/accuracy-based model selection
+import os
+import io
+import json
+import time
+import logging
+import threading
+import statistics
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List
+import ollama
+from PIL import Image, ImageDraw
+from config import (VISION_MODEL, CAPTCHA_VISION_MODEL, CGPA_VISION_MODEL, VISION_MODEL_CANDIDATES,
+                    VISION_BENCHMARK_DIR, VISION_SELECTION_CACHE, VISION_LATENCY_WEIGHT)
+from exceptions import ModelUnavailableError
+from vision_batcher import get_vision_batcher, ollama_chat
+
+logger = logging.getLogger(__name__)
+
+TASKS = ('captcha', 'cgpa', 'cgpa_fallback')
+
+LLAVA_PROMPTS = {
+    'captcha': [
+        "This image shows a 3-digit security code. Look carefully at each digit from left to right. The digits are numbers 0-9. Respond with exactly 3 digits, like 123 or 456 or 789.",
+        "Extract the 3-digit verification code from this captcha. Focus on the numbers only. Ignore any background noise. Return just the 3 consecutive numbers.",
+        "I need the 3-digit captcha code from this image. Each position contains one digit (0-9). Read from left to right and give me the 3-digit number.",
+        "This security image contains exactly 3 numerical digits. Identify each digit carefully. Respond with only the 3-digit code.",
+        "Look at this 3-digit captcha. What numbers do you see? Give me the complete 3-digit code as one number."
+    ],
+    'cgpa': [
+        "Look at this grade sheet image. Find the CGPA (Cumulative Grade Point Average) value. It should be a decimal number between 0.0 and 10.0, like 8.74 or 9.25. Return only the CGPA number.",
+        "This is a student grade sheet. Locate the Cumulative GPA or CGPA value displayed somewhere on this page. Return just the decimal number.",
+        "Examine this academic grade sheet. Find the overall CGPA value which should be a number like 8.45 or 9.12. Give me only that number.",
+        "Look for the total CGPA or cumulative grade point average in this grade sheet. Return only the numerical value.",
+        "This grade sheet shows academic performance. Find the CGPA value and return only that decimal number."
+    ],
+    'cgpa_fallback': ["""You are looking at a student grade sheet from SLCM (Student Life Cycle Management) portal.
+
+This image contains academic performance data including subjects, grades, credits, and importantly, the CGPA (Cumulative Grade Point Average).
+
+Your task is to find and extract ONLY the CGPA value from this grade sheet. The CGPA is typically:
+- A decimal number between 0.0 and 10.0 (like 8.74, 9.25, 7.89, etc.)
+- Labeled as "CGPA", "Cumulative GPA", "Cumulative Grade Point Average", or similar
+- Usually displayed prominently in a summary section
+- Often found at the bottom or in a totals row
+
+Look carefully at the image and identify the CGPA value. Respond with ONLY the numerical CGPA value, nothing else. For example, if you see CGPA: 8.74, respond with just: 8.74"""],
+}
+
+# Small models follow short, literal instructions better than long ones
+SMALL_MODEL_PROMPTS = {
+    'captcha': [
+        "What 3-digit number is shown in this image? Answer with the 3 digits only.",
+        "Read the digits in this image from left to right. Reply with exactly 3 digits.",
+        "Captcha digits:",
+    ],
+    'cgpa': [
+        "What is the CGPA value on this grade sheet? Answer with the number only.",
+        "Find the text 'CGPA' and reply with the decimal number next to it.",
+    ],
+    'cgpa_fallback': [
+        "This is a university grade sheet. Reply with only the CGPA, a decimal number between 0 and 10.",
+    ],
+}
+
+
+@dataclass
+class ModelProfile:
+    """Prompts and options tuned for one model family"""
+    family: str
+    prompts: Dict[str, List[str]]
+    options: Dict[str, dict] = field(default_factory=lambda: {
+        'captcha': {'temperature': 0.1, 'top_p': 0.9},
+        'cgpa': {'temperature': 0.1},
+        'cgpa_fallback': {'temperature': 0.0},
+    })
+    input_size: int = 672  # native vision encoder resolution (longest side)
+    multi_image: bool = False  # answers about several images in one request (see vision_batcher.py)
+
+
+MODEL_PROFILES = [
+    ModelProfile('moondream', SMALL_MODEL_PROMPTS, input_size=378),
+    ModelProfile('llava-phi3', SMALL_MODEL_PROMPTS, input_size=336),
+    ModelProfile('llama3.2-vision', LLAVA_PROMPTS, input_size=560),
+    ModelProfile('llava', LLAVA_PROMPTS, input_size=672),
+    ModelProfile('qwen2.5vl', LLAVA_PROMPTS, input_size=672, multi_image=True),
+    ModelProfile('minicpm-v', LLAVA_PROMPTS, input_size=448, multi_image=True),
+    ModelProfile('gemma3', LLAVA_PROMPTS, input_size=896, multi_image=True),
+]
+DEFAULT_PROFILE = ModelProfile('default', LLAVA_PROMPTS)
+
+
+def profile_for(model):
+    name = model.lower()
+    return next((p for p in MODEL_PROFILES if p.family in name), DEFAULT_PROFILE)
+
+
+class VisionBackend(ABC):
+    """Interface for a vision model provider"""
+
+    @abstractmethod
+    def list_models(self):
+        """Names of the installed vision-capable models"""
+
+    @abstractmethod
+    def chat(self, model, prompt, images, options=None):
+        """Send one prompt with one or more images (paths or bytes) and return the answer text"""
+
+
+class OllamaBackend(VisionBackend):
+    VISION_MARKERS = ['llava', 'vision', 'moondream', 'bakllava', 'minicpm-v', 'qwen2.5vl', 'qwen2-vl', 'gemma3']
+
+    def list_models(self):
+        models = ollama.list()
+        names = []
+        for model in models.get('models', []):
+            name = model.get('name') or model.get('model')
+            if name and any(marker in name.lower() for marker in self.VISION_MARKERS):
+                names.append(name)
+        return names
+
+    def chat(self, model, prompt, images, options=None):
+        return ollama_chat(model, prompt, images, options)
+
+
+def _probe_image():
+    """Tiny synthetic captcha-like image used to measure latency when no labelled samples exist"""
+    image = Image.new('RGB', (120, 40), 'white')
+    ImageDraw.Draw(image).text((40, 12), "472", fill='black')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _benchmark_samples(task):
+    """Labelled samples from VISION_BENCHMARK_DIR/<task>/<expected>[_n].png"""
+    directory = os.path.join(VISION_BENCHMARK_DIR, task) if VISION_BENCHMARK_DIR else None
+    if not directory or not os.path.isdir(directory):
+        return []
+    samples = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+            expected = os.path.splitext(filename)[0].split('_')[0]
+            samples.append((os.path.join(directory, filename), expected))
+    return samples
+
+
+class VisionService:
+    """
+    One entry point for captcha and CGPA vision calls: picks a model per task, supplies the
+    prompt set for that model and routes requests through the shared batcher. Models without
+    a cached selection are benchmarked on a background thread; until it finishes the first
+    candidate is used, so startup does not wait on the benchmark.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or OllamaBackend()
+        self.available = False
+        self.models = {}
+        self.installed = []
+        self.selection = None  # background benchmark thread, see initialize()
+
+    def initialize(self, wait=False):
+        try:
+            self.installed = self.backend.list_models()
+        except Exception as e:
+            logger.warning(f"Vision backend not available: {e}")
+            self.installed = []
+        self.available = bool(self.installed)
+        if self.available:
+            overrides = {'captcha': CAPTCHA_VISION_MODEL or VISION_MODEL, 'cgpa': CGPA_VISION_MODEL or VISION_MODEL}
+            unmeasured = []
+            for task in ('captcha', 'cgpa'):
+                model = overrides[task] or self.cached_selection(task)
+                if model is None:
+                    unmeasured.append(task)
+                    model = self._candidates()[0]
+                self._use(task, model)
+            if unmeasured:
+                self.selection = threading.Thread(target=self._select_in_background, args=(unmeasured,),
+                                                  name='vision-model-selection', daemon=True)
+                self.selection.start()
+                if wait:
+                    self.selection.join()
+        return self.available
+
+    def _use(self, task, model):
+        self.models[task] = model
+        if task == 'cgpa':
+            self.models['cgpa_fallback'] = model
+
+    def _select_in_background(self, tasks):
+        for task in tasks:
+            try:
+                model = self.select_model(task)
+            except ModelUnavailableError as e:
+                logger.error(str(e))
+                print(f"✗ {e}; vision extraction disabled")
+                self.available = False
+                return
+            if model != self.models.get(task):
+                print(f"✓ Vision model for {task}: {model} (was {self.models.get(task)} while benchmarking)")
+            self._use(task, model)
+
+    def _candidates(self):
+        ordered = []
+        for preferred in VISION_MODEL_CANDIDATES:
+            ordered += [m for m in self.installed if preferred in m and m not in ordered]
+        return ordered or list(self.installed)
+
+    def measure(self, model, task):
+        """(accuracy or None, median latency in seconds) of a model on a task"""
+        samples = _benchmark_samples(task)
+        profile = profile_for(model)
+        prompt = profile.prompts[task][0]
+        options = profile.options.get(task, {})
+        latencies = []
+        correct = 0
+
+        for path, expected in samples or [(_probe_image(), None)]:
+            started = time.perf_counter()
+            try:
+                answer = self.backend.chat(model, prompt, [path], options)
+            except Exception as e:
+                logger.warning(f"Benchmark call to {model} failed: {e}")
+                return 0.0, float('inf')
+            latencies.append(time.perf_counter() - started)
+            if expected is not None and expected in answer.replace(' ', ''):
+                correct += 1
+
+        accuracy = correct / len(samples) if samples else None
+        return accuracy, statistics.median(latencies)
+
+    def _selection_key(self, task):
+        # Adding labelled samples changes the mode, so the next run benchmarks again with accuracy
+        mode = 'labelled' if _benchmark_samples(task) else 'latency'
+        return f"{task}:{mode}:{','.join(sorted(self.installed))}"
+
+    def cached_selection(self, task):
+        """Model picked for the task by an earlier run with the same installed models, or None"""
+        entry = self._load_selection_cache().get(self._selection_key(task))
+        return entry['model'] if entry else None
+
+    def select_model(self, task):
+        """
+        Best installed model for the task by accuracy minus a latency penalty, cached across runs.
+        Accuracy only counts when VISION_BENCHMARK_DIR has labelled samples for the task; without
+        them every model answers an unlabelled probe and the fastest one wins.
+        Raises ModelUnavailableError when no candidate answers at all.
+        """
+        cached = self.cached_selection(task)
+        if cached:
+            return cached
+
+        if not _benchmark_samples(task):
+            print(f"  No labelled {task} samples under VISION_BENCHMARK_DIR; choosing the vision model by latency only")
+        scores, failed = {}, []
+        for model in self._candidates():
+            accuracy, latency = self.measure(model, task)
+            if latency == float('inf'):
+                failed.append(model)
+                continue
+            score = (accuracy or 0.0) - VISION_LATENCY_WEIGHT * latency
+            scores[model] = {'accuracy': accuracy, 'latency': latency, 'score': score}
+            print(f"  Vision model {model} on {task}: accuracy={accuracy}, latency={latency:.2f}s")
+        if failed:
+            logger.warning(f"Vision models failed the {task} benchmark: {', '.join(failed)}")
+        if not scores:
+            raise ModelUnavailableError(f"No vision model answered the {task} benchmark (tried {', '.join(failed)})")
+
+        best = max(scores, key=lambda m: scores[m]['score'])
+        cache = self._load_selection_cache()
+        cache[self._selection_key(task)] = {'model': best, 'scores': scores, 'failed': failed, 'measured_at': time.time()}
+        self._save_selection_cache(cache)
+        return best
+
+    @staticmethod
+    def _load_selection_cache():
+        try:
+            with open(VISION_SELECTION_CACHE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def _save_selection_cache(cache):
+        try:
+            with open(VISION_SELECTION_CACHE, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2, default=str)
+        except OSError as e:
+            logger.warning(f"Could not save vision model selection: {e}")
+
+    def model_for(self, task):
+        return self.models.get(task)
+
+    def prompts(self, task):
+        return profile_for(self.models[task]).prompts[task]
+
+    def options(self, task):
+        return profile_for(self.models[task]).options.get(task, {})
+
+    def input_size(self, task):
+        return profile_for(self.models[task]).input_size
+
+    def submit(self, task, prompt, image):
+        """Queue a request on the shared batcher for the task's model; returns a Future[str]"""
+        model = self.models[task]
+        batcher = get_vision_batcher(model, self.backend.chat, multi_image=profile_for(model).multi_image)
+        return batcher.submit(prompt, image, self.options(task))
+
+    def ask(self, task, prompt, images):
+        """Direct (unbatched) call for prompts that must see several images together"""
+        return self.backend.chat(self.models[task], prompt, images, self.options(task))
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_vision_service():
+    """
+    The process-wide vision service shared by all scrapers, so the installed models are
+    listed and benchmarked once per process. Listing is retried until a backend answers.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = VisionService()
+        if not _service.installed:
+            _service.initialize()
+        return _service
@@ -0,0 +1,189 @@
+# vision_batcher.py
+# Micro-batching for vision model calls: several images answered by one multi-image request
+import re
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+import ollama
+from config import (VISION_BATCH_MAX_IMAGES, VISION_BATCH_MAX_WAIT_MS, VISION_BATCH_VERIFY_EVERY,
+                    VISION_BATCH_MIN_AGREEMENT)
+
+logger = logging.getLogger(__name__)
+
+_ANSWER_LINE = re.compile(r'^\s*(?:image\s*)?#?(\d+)\s*[:.)\-]\s*(.*?)\s*$', re.IGNORECASE)
+# Agreement needs this many checked batches before batching can be switched off
+MIN_VERIFIED_BATCHES = 3
+
+
+def ollama_chat(model, prompt, images, options=None):
+    """Default chat function: one Ollama request, answer text returned"""
+    response = ollama.chat(
+        model=model,
+        messages=[{'role': 'user', 'content': prompt, 'images': list(images)}],
+        options=options or {},
+    )
+    return response['message']['content'].strip()
+
+
+def multi_image_prompt(prompt, count):
+    return (f"You are given {count} separate images, numbered 1 to {count} in the order provided. "
+            f"Answer the following task for EACH image independently.\n\n{prompt}\n\n"
+            f"Respond with exactly {count} lines, one per image, in the form '<image number>: <answer>'.")
+
+
+def parse_multi_image_answer(text, count):
+    """Map image number (1-based) -> answer text for every well-formed line"""
+    answers = {}
+    for line in text.splitlines():
+        match = _ANSWER_LINE.match(line)
+        if match and 1 <= int(match.group(1)) <= count:
+            answers.setdefault(int(match.group(1)), match.group(2))
+    return answers
+
+
+def _same_answer(a, b):
+    return re.sub(r'[\W_]', '', a).lower() == re.sub(r'[\W_]', '', b).lower()
+
+
+class _Request:
+    __slots__ = ('prompt', 'image', 'options', 'future')
+
+    def __init__(self, prompt, image, options):
+        self.prompt = prompt
+        self.image = image
+        self.options = options or {}
+        self.future = Future()
+
+    @property
+    def batch_key(self):
+        return self.prompt, tuple(sorted(self.options.items()))
+
+
+class VisionBatcher:
+    """
+    Requests with the same prompt and options that arrive within max_wait of each other
+    (from one solver or from concurrent logins) are sent as a single multi-image request.
+    With max_images=1 (single-image models) every request is sent on its own. Batched answers
+    are spot-checked against single-image answers, and batching is switched off for the model
+    if they disagree too often.
+    """
+
+    def __init__(self, model, max_images=VISION_BATCH_MAX_IMAGES,
+                 max_wait=VISION_BATCH_MAX_WAIT_MS / 1000.0, chat_fn=None,
+                 verify_every=VISION_BATCH_VERIFY_EVERY, min_agreement=VISION_BATCH_MIN_AGREEMENT):
+        self.model = model
+        self.max_images = max(1, max_images)
+        self.max_wait = max_wait
+        self.chat_fn = chat_fn or ollama_chat  # (model, prompt, images, options) -> str
+        self.verify_every = max(1, verify_every)
+        self.min_agreement = min_agreement
+        self.batches = 0
+        self.checks = {'verified': 0, 'agreed': 0}
+        self.queue = queue.Queue()
+        self.deferred = []  # requests pulled from the queue that did not fit the current batch
+        self.thread = threading.Thread(target=self._run, name=f"vision-batcher-{model}", daemon=True)
+        self.thread.start()
+
+    def submit(self, prompt, image, options=None):
+        """Queue one prompt/image pair; the Future resolves to the model's answer text"""
+        request = _Request(prompt, image, options)
+        self.queue.put(request)
+        return request.future
+
+    def ask_many(self, prompt, images, options=None):
+        """Same prompt over several images, answers returned in order"""
+        futures = [self.submit(prompt, image, options) for image in images]
+        return [f.result() for f in futures]
+
+    def _next_batch(self):
+        first = self.deferred.pop(0) if self.deferred else self.queue.get()
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        # Take compatible requests that were deferred earlier, then wait briefly for more
+        for request in list(self.deferred):
+            if len(batch) < self.max_images and request.batch_key == first.batch_key:
+                self.deferred.remove(request)
+                batch.append(request)
+        while len(batch) < self.max_images:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request.batch_key == first.batch_key:
+                batch.append(request)
+            else:
+                self.deferred.append(request)
+        return batch
+
+    def _chat(self, prompt, images, options):
+        return self.chat_fn(self.model, prompt, images, options)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _dispatch(self, batch):
+        first = batch[0]
+        if len(batch) == 1:
+            first.future.set_result(self._chat(first.prompt, [first.image], first.options))
+            return
+
+        text = self._chat(multi_image_prompt(first.prompt, len(batch)),
+                          [r.image for r in batch], first.options)
+        answers = parse_multi_image_answer(text, len(batch))
+        logger.info(f"Vision batch of {len(batch)} images answered {len(answers)} lines")
+        self.batches += 1
+        if answers and (self.batches - 1) % self.verify_every == 0:
+            self._verify(batch, answers)
+
+        for number, request in enumerate(batch, start=1):
+            if number in answers:
+                request.future.set_result(answers[number])
+            else:
+                # Malformed multi-image answer: ask for this image on its own
+                request.future.set_result(self._chat(request.prompt, [request.image], request.options))
+
+
+    def _verify(self, batch, answers):
+        """Re-ask one batched image alone; its single-image answer is the one returned"""
+        number = min(answers)
+        request = batch[number - 1]
+        single = self._chat(request.prompt, [request.image], request.options)
+        agreed = _same_answer(answers[number], single)
+        answers[number] = single
+        self.checks['verified'] += 1
+        self.checks['agreed'] += int(agreed)
+
+        verified, agreement = self.checks['verified'], self.checks['agreed'] / self.checks['verified']
+        if verified >= MIN_VERIFIED_BATCHES and agreement < self.min_agreement:
+            logger.warning(f"Batched answers from {self.model} matched single-image answers in only "
+                           f"{agreement:.0%} of {verified} checks; sending one image per request")
+            self.max_images = 1
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_vision_batcher(model, chat_fn=None, multi_image=False):
+    """
+    Process-wide batcher per model, shared by every scraper. Only models that accept several
+    images in one request (multi_image) get multi-image batches.
+    """
+    with _batchers_lock:
+        if model not in _batchers:
+            max_images = VISION_BATCH_MAX_IMAGES if multi_image else 1
+            _batchers[model] = VisionBatcher(model, max_images=max_images, chat_fn=chat_fn)
+        return _batchers[model]